@@ -5,9 +5,11 @@
 # list_filter: 支持哪些过滤条件
 # search_fields: 搜索哪些字段
 # prepopulated_fields: 编辑页如何布局（自动填slug）
-# filter_horizontal: 如何吃力多对多字段
+# filter_horizontal / autocomplete_fields: 如何处理多对多字段
 
 from django.contrib import admin
+from core.admin import CounterFieldsAdminMixin
+from core.counting import EstimatedCountPaginator
 # 当前 app（blog）的 models.py 中导入 Post 模型。
 from . import models
 
@@ -22,7 +24,12 @@ class CategoryAdmin(admin.ModelAdmin):
 @admin.register(models.Tag)
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name',)
-    search_fields = ('name',)
+    # '^' 前缀表示 istartswith（前缀匹配），可以命中 UPPER(name) 的 pattern_ops 索引
+    # 同时也是 PostAdmin 中标签自动补全（autocomplete_fields）使用的搜索字段
+    search_fields = ('^name',)
+    # 不再额外执行一次“全部记录数” COUNT(*)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 # 这是一个装饰器（decorator），用于将 PostAdmin 类注册到 Django Admin。
 # 等价写法（旧式）：
@@ -35,16 +42,21 @@ class TagAdmin(admin.ModelAdmin):
 #   所有 Admin 配置类都必须继承它
 # 命名规范：通常以模型名 + Admin 结尾，如 PostAdmin。
 # Django 会自动识别这种命名（但必须通过 @register 显式注册）
-class PostAdmin(admin.ModelAdmin):
+# CounterFieldsAdminMixin：阅读量只读，保存时不写回 views（避免覆盖 core.counters 写入的增量）
+class PostAdmin(CounterFieldsAdminMixin, admin.ModelAdmin):
     # 作用：定义在 Admin 列表页中显示哪些字段（列）。
-    # 效果：在 Admin 后台的文章列表页，会显示标题、作者、创建时间和是否为草稿这四列。
+    # 效果：在 Admin 后台的文章列表页，会显示标题、作者、创建时间、是否为草稿和定时发布时间这五列。
     # 默认行为： 如果不设置，Admin 列表页只显示 __str__ 方法返回的字符串。（即文章标题）
     list_display = (
         'title',
         'author',
         'created_at',
-        'is_draft'
+        'is_draft',
+        'publish_at'
         )
+    # 作用：列表页查询时用 JOIN 一次性取出作者
+    # 如果不设置，每一行显示 author 时都会额外执行一次 User 查询（N+1 问题）
+    list_select_related = ('author',)
     # 作用：添加过滤器，允许管理员按“是否为草稿”筛选文章。
     # 效果：在 Admin 列表页右侧，会出现一个过滤栏，管理员可以点击“是”或“否”来筛选文章。
     # 各字段效果：
@@ -61,12 +73,21 @@ class PostAdmin(admin.ModelAdmin):
     # 为什么不能直接写 'author'？
     # author 是一个 ForeignKey，指向 User 模型（表单）。
     # Django 不知道你到底想搜索 User 的哪个字段（用户名？邮箱？全名？）。
+    # 字段前缀的含义：
+    #   '^title' → istartswith 前缀匹配，可以使用 UPPER(title) 的 pattern_ops 索引（见迁移 0004）
+    #   '=author__username' → iexact 精确匹配
+    # 为什么去掉 content 和 author__email？
+    #   '%关键词%' 形式的 ILIKE 无法使用索引，十万行级别时每次搜索都是全表扫描
     search_fields = (
-        'title',
-        'content',
-        'author__username', 
-        'author__email'
+        '^title',
+        '^slug',
+        '=author__username',
     )
+    # 作用：不再额外执行一次“全部记录数” COUNT(*)
+    # 默认情况下，带搜索/过滤的列表页会同时统计“过滤后数量”和“全部数量”
+    show_full_result_count = False
+    # 作用：大表使用 PostgreSQL 统计信息估算总数，翻页不再每页 COUNT(*)
+    paginator = EstimatedCountPaginator
     # 作用：在 Admin 编辑页，根据其他字段自动生成 slug。
     # 效果：
     #   当你在 Admin 编辑文章时，输入标题后，slug 字段会自动填充
@@ -76,7 +97,11 @@ class PostAdmin(admin.ModelAdmin):
     #    value：元组，表示“根据哪些字段生成 slug”（这里是 ('title',)）
     # 注意：('title',) 是单元素元组，末尾的逗号不能省！后面要加逗号，否否则 Python 会当成字符串。
     prepopulated_fields = {'slug': ('title',)}
-    filter_horizontal = ('tags',)
+    # 作用：分类和标签使用自动补全（AJAX 搜索）控件
+    # 为什么不用 filter_horizontal？
+    #   filter_horizontal 会在编辑页一次性渲染全部标签，标签多时页面又大又慢
+    #   autocomplete 只按输入的关键词查询（依赖 CategoryAdmin/TagAdmin 的 search_fields）
+    autocomplete_fields = ('category', 'tags')
 
 # 技术实现原理：
 # Admin 是一个完整的 Django app：它有自己的 models、views、templates。
@@ -9,3 +9,5 @@ class BlogConfig(AppConfig):
 
     def ready(self):
         register_converter(UnicodeSlugConverter, 'unicode_slug')
+        # 导入信号处理函数（@receiver 在导入时完成注册）
+        from . import signals  # noqa: F401
@@ -0,0 +1,82 @@
+# ============================================================
+# 博客模块 - 按月归档
+# ============================================================
+# MonthlyArchive 表的维护逻辑：
+# - 增量：文章保存/删除时，对受影响月份的计数 ±1（见 blog/signals.py）
+# - 全量：rebuild_monthly_archive() 一次 GROUP BY 重建整张表
+# 月份按当前时区（settings.TIME_ZONE）划分，与 ?year=&month= 过滤保持一致。
+# ============================================================
+
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+
+def month_of(value):
+    """返回时间所在的 (year, month)"""
+    value = timezone.localtime(value)
+    return value.year, value.month
+
+
+def month_range(year, month=None):
+    """
+    返回 [start, end) 时间范围
+    只传 year 时为整年，传 month 时为该月
+    """
+    if month is None:
+        start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    elif month == 12:
+        start, end = datetime(year, 12, 1), datetime(year + 1, 1, 1)
+    else:
+        start, end = datetime(year, month, 1), datetime(year, month + 1, 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def adjust_month(year, month, delta):
+    """对某个月的计数增加 delta（可为负数）"""
+    from .models import MonthlyArchive
+
+    if delta > 0:
+        MonthlyArchive.objects.get_or_create(year=year, month=month)
+    # 使用 F() 表达式在数据库中原子地增减，避免并发保存时互相覆盖
+    # post_count >= -delta：计数已有偏差时不减成负数（PositiveIntegerField 有 CHECK 约束）
+    MonthlyArchive.objects.filter(
+        year=year, month=month, post_count__gte=max(0, -delta)
+    ).update(post_count=F('post_count') + delta)
+
+
+def apply_change(old, new):
+    """
+    根据文章修改前后的状态更新计数
+    old / new 为 (is_draft, created_at)，新建文章 old 为 None，删除文章 new 为 None
+    """
+    old_month = month_of(old[1]) if old and not old[0] else None
+    new_month = month_of(new[1]) if new and not new[0] else None
+    if old_month == new_month:
+        return
+    if old_month:
+        adjust_month(*old_month, -1)
+    if new_month:
+        adjust_month(*new_month, +1)
+
+
+def rebuild_monthly_archive():
+    """全量重建月度归档，返回月份数"""
+    from .models import MonthlyArchive, Post
+
+    rows = Post.objects.filter(is_draft=False).annotate(
+        year=ExtractYear('created_at'),
+        month=ExtractMonth('created_at'),
+    ).values('year', 'month').annotate(post_count=Count('id')).order_by()
+
+    buckets = [
+        MonthlyArchive(year=row['year'], month=row['month'], post_count=row['post_count'])
+        for row in rows
+    ]
+    with transaction.atomic():
+        MonthlyArchive.objects.all().delete()
+        MonthlyArchive.objects.bulk_create(buckets)
+    return len(buckets)
@@ -0,0 +1,52 @@
+# ============================================================
+# 博客模块 - 过滤器
+# ============================================================
+# FilterSet：django-filter 提供的“查询参数 → ORM 过滤条件”声明方式。
+# 比 filterset_fields 更灵活，可以定义自定义参数（如 year / month）。
+# ============================================================
+
+import django_filters
+from django import forms
+
+from core.filters import ManyToManyInFilter, MatchModeFilter
+from . import archive, models
+
+
+class PostFilterForm(forms.Form):
+    def clean(self):
+        cleaned_data = super().clean()
+        # 只有月份没有年份时无法确定时间范围：返回 400，而不是忽略 month 返回全部文章
+        if cleaned_data.get('month') is not None and cleaned_data.get('year') is None:
+            self.add_error('month', 'month 需要配合 year 使用（?year=2025&month=10）')
+        return cleaned_data
+
+
+class PostFilter(django_filters.FilterSet):
+    """
+    文章列表过滤参数：
+    - category: 分类 id（?category=1）
+    - tags: 标签 id，可用逗号分隔多个（?tags=2 / ?tags=1,2,3）
+    - tag_mode: 多个标签时的匹配方式，any（默认，命中任意一个）或 all（同时具有全部）
+      两种方式都是中间表上的一条子查询（all 为 GROUP BY ... HAVING），不会每个标签 JOIN 一次（见 core/filters.py）
+    - year / month: 按发布年月过滤（?year=2025&month=10，month 需配合 year，只传 month 时返回 400）
+    """
+    year = django_filters.NumberFilter(method='filter_year', min_value=1, max_value=9998)
+    month = django_filters.NumberFilter(method='filter_month', min_value=1, max_value=12)
+    tags = ManyToManyInFilter(field_name='tags', mode_param='tag_mode')
+    tag_mode = MatchModeFilter()
+
+    class Meta:
+        model = models.Post
+        fields = ['category', 'tags']
+        form = PostFilterForm
+
+    def filter_year(self, queryset, name, value):
+        # 使用范围查询（>= 月初 AND < 下月初）而不是 created_at__year，
+        # 这样可以直接使用 (is_draft, created_at) 索引
+        month = self.form.cleaned_data.get('month')
+        start, end = archive.month_range(int(value), int(month) if month else None)
+        return queryset.filter(created_at__gte=start, created_at__lt=end)
+
+    def filter_month(self, queryset, name, value):
+        # 月份必须配合年份使用（PostFilterForm 校验），实际过滤在 filter_year 中完成
+        return queryset
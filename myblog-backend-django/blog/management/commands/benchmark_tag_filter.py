@@ -0,0 +1,125 @@
+# ============================================================
+# 管理命令：多标签过滤的性能对比
+# ============================================================
+# 用法：
+#   python manage.py benchmark_tag_filter                      # 50000 篇文章、500 个标签
+#   python manage.py benchmark_tag_filter --posts 10000 --tags 100 --repeat 5
+# 在一个事务中批量生成测试数据，测量完成后整体回滚，不会留下任何数据
+# （也不会触发信号：bulk_create 不发送 post_save / m2m_changed）。
+# 对比的写法（见 core/filters.py）：
+#   chained   .filter(tags=a).filter(tags=b)...  每个标签 JOIN 一次（all，仅对比）
+#   having    ... GROUP BY post_id HAVING COUNT(*) = n（all，本项目使用）
+#   exists    每个标签一个 EXISTS 子查询（all，仅对比）
+#   distinct  .filter(tags__in=[...]).distinct()  JOIN 一次再去重（any，原来的写法）
+#   subquery  id IN (SELECT post_id ... WHERE tag_id IN (...))（any，本项目使用）
+# 每种写法测量“总数 + 第一页 20 个 id”，与分页列表接口的两条查询相同。
+# ============================================================
+
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog.models import Post, Tag
+from core.filters import MODE_ALL, MODE_ANY, match_all_exists, match_all_having, match_all_joins, match_any
+
+PAGE_SIZE = 20
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = '生成测试数据（事务结束后回滚），对比多标签 any / all 过滤的几种 SQL 写法'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=50000, help='文章数量')
+        parser.add_argument('--tags', type=int, default=500, help='标签数量')
+        parser.add_argument('--max-tags-per-post', type=int, default=6, help='每篇文章最多的标签数')
+        parser.add_argument('--repeat', type=int, default=7, help='每种写法的测量次数（取中位数）')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with transaction.atomic():
+            tag_ids = self.generate(options)
+            self.run(tag_ids, options['repeat'])
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('测试数据已回滚'))
+
+    # ======== 生成数据 ========
+
+    def generate(self, options):
+        started = time.monotonic()
+        author, _ = User.objects.get_or_create(username='benchmark-tag-filter')
+        tags = Tag.objects.bulk_create(
+            [Tag(name=f'benchmark-tag-{index}') for index in range(options['tags'])],
+            batch_size=BATCH_SIZE,
+        )
+        tag_ids = [tag.id for tag in tags]
+        # 标签热度不均（少数标签很常用），用 1/(排名+1) 作为权重
+        weights = [1 / (rank + 1) for rank in range(len(tag_ids))]
+        through = Post.tags.through
+
+        for start in range(0, options['posts'], BATCH_SIZE):
+            size = min(BATCH_SIZE, options['posts'] - start)
+            posts = Post.objects.bulk_create([
+                Post(
+                    title=f'benchmark {start + index}', slug=f'benchmark-{start + index}',
+                    summary='', content='', is_draft=False, author=author,
+                )
+                for index in range(size)
+            ])
+            links = []
+            for post in posts:
+                count = random.randint(1, options['max_tags_per_post'])
+                for tag_id in set(random.choices(tag_ids, weights, k=count)):
+                    links.append(through(post_id=post.id, tag_id=tag_id))
+            through.objects.bulk_create(links, batch_size=BATCH_SIZE)
+
+        # 更新统计信息，让查询计划与真实环境一致
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(
+            f"已生成 {options['posts']} 篇文章、{len(tag_ids)} 个标签，"
+            f'中间表 {through.objects.count()} 行，耗时 {time.monotonic() - started:.1f}s'
+        )
+        return tag_ids
+
+    # ======== 测量 ========
+
+    def measure(self, queryset, repeat):
+        """总数 + 第一页 id，返回 (中位耗时 ms, 总数)"""
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            total = queryset.count()
+            list(queryset.values_list('pk', flat=True)[:PAGE_SIZE])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), total
+
+    def run(self, tag_ids, repeat):
+        base = Post.objects.published().order_by('-created_at')
+        # 热门标签组合（结果多）和冷门标签组合（结果少）
+        cases = [
+            ('热门', tag_ids[:2]),
+            ('热门', tag_ids[:3]),
+            ('热门', tag_ids[:5]),
+            ('热门', tag_ids[:10]),
+            ('混合', tag_ids[:5] + tag_ids[-5:]),
+            ('冷门', tag_ids[-3:]),
+        ]
+        self.stdout.write(f"\n{'标签':<14}{'写法':<10}{'模式':<6}{'耗时 ms':>10}{'结果数':>9}")
+        for label, ids in cases:
+            strategies = [
+                ('chained', MODE_ALL, match_all_joins(base, 'tags', ids)),
+                ('having', MODE_ALL, match_all_having(base, 'tags', ids)),
+                ('exists', MODE_ALL, match_all_exists(base, 'tags', ids)),
+                ('distinct', MODE_ANY, base.filter(tags__in=ids).distinct()),
+                ('subquery', MODE_ANY, match_any(base, 'tags', ids)),
+            ]
+            name = f'{label} x{len(ids)}'
+            for strategy, mode, queryset in strategies:
+                elapsed, total = self.measure(queryset, repeat)
+                self.stdout.write(f'{name:<14}{strategy:<10}{mode:<6}{elapsed:>10.1f}{total:>9}')
@@ -0,0 +1,40 @@
+# ============================================================
+# 管理命令：计算相关文章
+# ============================================================
+# 用法：
+#   python manage.py compute_related_posts
+#   python manage.py compute_related_posts --top-k 8 --content-weight 0.5
+# 建议通过 cron 等定时任务在后台定期执行（如每小时一次），
+# 或在批量发布文章后手动执行一次。
+# ============================================================
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.related import compute_related_posts
+
+
+class Command(BaseCommand):
+    help = '按标签/分类（可选正文词项）的加权 Jaccard 相似度预计算每篇文章的相关文章'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=5, help='每篇文章保留的相关文章数量')
+        parser.add_argument('--tag-weight', type=float, default=1.0, help='每个共同标签的权重')
+        parser.add_argument('--category-weight', type=float, default=0.5, help='相同分类的权重（只在有共同标签 / 词项的候选之间加分）')
+        parser.add_argument(
+            '--content-weight', type=float, default=0.0,
+            help='正文词项（TF-IDF）的权重，0 表示不使用正文'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = compute_related_posts(
+            top_k=options['top_k'],
+            tag_weight=options['tag_weight'],
+            category_weight=options['category_weight'],
+            content_weight=options['content_weight'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'已写入 {count} 条相关文章记录，耗时 {time.monotonic() - started:.2f}s'
+        ))
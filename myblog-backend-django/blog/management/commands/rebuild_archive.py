@@ -0,0 +1,18 @@
+# ============================================================
+# 管理命令：全量重建月度归档
+# ============================================================
+# 用法：python manage.py rebuild_archive
+# 日常由信号增量维护；批量导入数据（loaddata）或怀疑计数有偏差时执行一次。
+# ============================================================
+
+from django.core.management.base import BaseCommand
+
+from blog.archive import rebuild_monthly_archive
+
+
+class Command(BaseCommand):
+    help = '按已发布文章全量重建月度归档计数'
+
+    def handle(self, *args, **options):
+        months = rebuild_monthly_archive()
+        self.stdout.write(self.style.SUCCESS(f'月度归档已重建，共 {months} 个月份'))
@@ -0,0 +1,40 @@
+# Admin 前缀搜索（search_fields = '^title' 等）生成的 SQL 为：
+#   UPPER("title"::text) LIKE UPPER('关键词%')
+# PostgreSQL 的普通 B-tree 索引无法用于 LIKE（非 C 排序规则下），
+# 需要在 UPPER(...) 表达式上建立 text_pattern_ops 索引。
+# SQLite 没有对应的操作符类，直接跳过。
+
+from django.db import migrations
+
+PREFIX_INDEXES = [
+    ('blog_post_title_upper_like', 'blog_post', 'title'),
+    ('blog_post_slug_upper_like', 'blog_post', 'slug'),
+    ('blog_tag_name_upper_like', 'blog_tag', 'name'),
+]
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in PREFIX_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" (UPPER("{column}"::text) text_pattern_ops)'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_category_tag_post_category_post_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
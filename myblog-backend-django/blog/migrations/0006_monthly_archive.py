@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:08
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def populate_archive(apps, schema_editor):
+    # 用现有文章初始化月度归档（之后由信号增量维护）
+    # 逻辑与 blog.archive.rebuild_monthly_archive 相同，但写在迁移里：
+    # 迁移只能依赖历史模型，不能导入之后可能改动的应用代码
+    Post = apps.get_model('blog', 'Post')
+    MonthlyArchive = apps.get_model('blog', 'MonthlyArchive')
+    rows = Post.objects.filter(is_draft=False).annotate(
+        year=ExtractYear('created_at'),
+        month=ExtractMonth('created_at'),
+    ).values('year', 'month').annotate(post_count=Count('id')).order_by()
+    MonthlyArchive.objects.bulk_create([
+        MonthlyArchive(year=row['year'], month=row['month'], post_count=row['post_count'])
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_relatedpost'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='年')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='月')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='文章数')),
+            ],
+            options={
+                'verbose_name': '月度归档',
+                'verbose_name_plural': '月度归档',
+                'ordering': ['-year', '-month'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_draft', 'created_at'], name='blog_post_pub_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyarchive',
+            constraint=models.UniqueConstraint(fields=('year', 'month'), name='blog_monthlyarchive_year_month_uniq'),
+        ),
+        migrations.RunPython(populate_archive, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_sync_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='blog_post_pub_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_draft', 'created_at', 'id'], name='blog_post_pub_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['category', 'is_draft', 'created_at', 'id'], name='blog_post_cat_pub_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_neighbor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='list_json',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='list_json_version',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+    ]
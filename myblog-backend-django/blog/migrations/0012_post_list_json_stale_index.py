@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_list_json'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('list_json_version', '')), fields=['id'], name='blog_post_list_json_stale_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # Category类，文章可以属于一个类型
 # 一篇文章只能属于一个分类（一对多）
@@ -15,6 +16,8 @@ class Category(models.Model):
         blank=True,
         verbose_name="描述"
     )
+    # 最后修改时间：增量同步接口（/api/sync/）据此找出变化的分类
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
     
     def __str__(self) -> str:
         # 在 Admin中显示分类名称
@@ -23,6 +26,9 @@ class Category(models.Model):
     class Meta:
         verbose_name = "分类"
         verbose_name_plural = "分类" # 复数形式，中文仍需进行定义
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='blog_category_updated_idx'),
+        ]
 
 # Tag类
 # 一篇文章可以有多个标签（多对多）
@@ -32,12 +38,35 @@ class Tag(models.Model):
         unique=True,
         verbose_name="标签名"
     )
+    # 最后修改时间（增量同步使用）
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
     def __str__(self) -> str:
         return self.name
     
     class Meta:
         verbose_name = "标签"
         verbose_name_plural = "标签"
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='blog_tag_updated_idx'),
+        ]
+
+# PostQuerySet：文章查询集的自定义方法
+# 通过 Post.objects.published() 这样的链式调用复用“公开可见”的过滤条件
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        # 公开可见 = 非草稿
+        # 定时发布的文章在到期前保持草稿状态，由 publish_scheduled 命令按时翻转，
+        # 所以这里不需要和当前时间比较：查询条件不随时间变化，便于缓存
+        return self.filter(is_draft=False)
+
+    def due_for_publishing(self, now=None):
+        # 到期待发布：仍是草稿，且定时发布时间已到（走部分索引 blog_post_publish_due_idx）
+        return self.filter(
+            is_draft=True,
+            publish_at__lte=now or timezone.now()
+        )
+
 
 # Post类：博客文章。继承自models.Model
 # 在 Django 中，每一个继承 models.Model 的类，对应数据库当中的一张表
@@ -78,6 +107,17 @@ class Post(models.Model):
     # 如果不设 default，Django 会要求必须提供值（否则迁移会失败）。
     # 数据库存储：SQLite 用 INTEGER（0/1），PostgreSQL 用 BOOLEAN。
     is_draft = models.BooleanField(default=True)
+    # 作用：定时发布时间（可选）
+    # 设置为将来的时间时，文章保持草稿状态；
+    # 到期后由 `python manage.py publish_scheduled --loop` 自动发布（is_draft=False）
+    publish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="定时发布时间"
+    )
+    # 作用：阅读量
+    # 不在每次访问时直接 UPDATE：由 core.counters 在进程内缓冲后定期批量写入
+    views = models.PositiveBigIntegerField(default=0, verbose_name="阅读量")
     # 作用：记录文章创建时间
     # auto_now_add=True：仅在第一次保存（创建）对象时自动设为当前时间。
     created_at = models.DateTimeField(auto_now_add=True)
@@ -86,6 +126,12 @@ class Post(models.Model):
     #       包括创建和修改。
     # 注意：如果用 save() 方法，这个字段会自动更新；但用 QuerySet.update() 则不会触发。
     updated_at = models.DateTimeField(auto_now=True)
+    # 作用：这篇文章在列表接口中的 JSON（PostListSerializer 的输出，已编码好的文本）
+    # 文章、分类、标签、作者变化时由信号标记为过期，调度进程重新生成，列表接口直接拼接（见 core/listjson.py）
+    # editable=False：不出现在后台表单中；null=True：刚迁移或批量导入的行为空，请求时照常序列化
+    list_json = models.TextField(null=True, blank=True, editable=False)
+    # 生成 list_json 时序列化器的版本，与当前版本不同时视为过期；空字符串表示被信号标记为过期
+    list_json_version = models.CharField(max_length=16, blank=True, default='', editable=False)
     # 作用：建立多对一关系 —— 多篇文章可以属于同一个用户。
     # 字段类型：ForeignKey （外键）
     # User: Django 内置的用户模型，储存在 auth_user 表中。
@@ -120,6 +166,9 @@ class Post(models.Model):
         verbose_name="标签"
     )
 
+    # 作用：替换默认管理器，使 Post.objects 带有 published() 等自定义方法
+    objects = PostQuerySet.as_manager()
+
     # 作用：定义对象的字符串表示
     # 效果：在 Admin 的文章列表里，会看到文章标题，而不是“Post object”。
     # 为什么需要？
@@ -128,4 +177,113 @@ class Post(models.Model):
     # 如果不写，会显示 <Post object (1)>，不直观。
     def __str__(self) -> str:
         # 返回文章标题作为字符串表示
-        return self.title
\ No newline at end of file
+        return self.title
+
+    def save(self, *args, **kwargs):
+        # 定时发布时间还没到：无论是否勾选了发布，都先保持草稿
+        if self.publish_at and self.publish_at > timezone.now():
+            self.is_draft = True
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            # 作用：支撑“已发布文章按时间查询”（列表排序、按年月归档过滤）
+            # 按月过滤使用 created_at 的范围查询（>= 月初 AND < 下月初），可以直接走该索引
+            # 末尾的 id 用于上一篇 / 下一篇（见 blog/neighbors.py）：按 (created_at, id) 排序时
+            # 同一时间的文章也有确定的先后，ORDER BY ... LIMIT 1 只需在索引上定位一次
+            models.Index(
+                fields=['is_draft', 'created_at', 'id'],
+                name='blog_post_pub_created_idx'
+            ),
+            # 作用：同一分类内的上一篇 / 下一篇，以及按分类筛选的文章列表
+            models.Index(
+                fields=['category', 'is_draft', 'created_at', 'id'],
+                name='blog_post_cat_pub_created_idx'
+            ),
+            # 作用：热门文章（按阅读量倒序）
+            models.Index(
+                fields=['is_draft', '-views'],
+                name='blog_post_pub_views_idx'
+            ),
+            # 作用：增量同步（/api/sync/）按 (updated_at, id) 键集分页
+            models.Index(
+                fields=['updated_at', 'id'],
+                name='blog_post_updated_idx'
+            ),
+            # 作用：定时发布任务查找“到期草稿”
+            # 部分索引（condition）只包含设置了定时发布的草稿，体积很小
+            models.Index(
+                fields=['publish_at'],
+                name='blog_post_publish_due_idx',
+                condition=models.Q(is_draft=True, publish_at__isnull=False)
+            ),
+            # 作用：调度进程查找被信号标记为过期的 list_json（见 core/listjson.py）
+            # 部分索引只包含过期的行，平时几乎为空
+            models.Index(
+                fields=['id'],
+                name='blog_post_list_json_stale_idx',
+                condition=models.Q(list_json_version='')
+            ),
+        ]
+
+# RelatedPost类：相关文章（预计算结果表）
+# 由后台任务 `python manage.py compute_related_posts` 定期计算并整表重写，
+# 每篇文章只保存得分最高的 K 篇已发布文章。
+# 详情页的“相关文章”接口只需按 (post_id, rank) 索引查询一次，无需实时多表 JOIN 计算。
+class RelatedPost(models.Model):
+    # 源文章
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_entries'
+    )
+    # 相关文章
+    # related_name='related_from'：某篇文章作为“相关文章”出现的记录
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_from'
+    )
+    # 相似度得分（加权 Jaccard，0~1）
+    score = models.FloatField()
+    # 排名（从 1 开始，得分越高越靠前）
+    rank = models.PositiveSmallIntegerField()
+
+    def __str__(self) -> str:
+        return f'{self.post_id} -> {self.related_id} ({self.score:.3f})'
+
+    class Meta:
+        verbose_name = "相关文章"
+        verbose_name_plural = "相关文章"
+        ordering = ['post', 'rank']
+        constraints = [
+            # 唯一约束同时提供 (post_id, rank) 索引，用于按文章查询相关文章
+            models.UniqueConstraint(
+                fields=['post', 'rank'],
+                name='blog_relatedpost_post_rank_uniq'
+            ),
+        ]
+
+
+# MonthlyArchive类：按月归档计数（预聚合表）
+# 每个月一行，记录该月发布（非草稿）的文章数量，由 Post 的信号增量维护。
+# 归档侧边栏（如 "2025-10 (12)"）只需读取这张表：复杂度与月份数相关，而不是文章数。
+# 如有偏差，可执行 `python manage.py rebuild_archive` 全量重建。
+class MonthlyArchive(models.Model):
+    year = models.PositiveSmallIntegerField(verbose_name="年")
+    month = models.PositiveSmallIntegerField(verbose_name="月")
+    post_count = models.PositiveIntegerField(default=0, verbose_name="文章数")
+
+    def __str__(self) -> str:
+        return f'{self.year}-{self.month:02d} ({self.post_count})'
+
+    class Meta:
+        verbose_name = "月度归档"
+        verbose_name_plural = "月度归档"
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['year', 'month'],
+                name='blog_monthlyarchive_year_month_uniq'
+            ),
+        ]
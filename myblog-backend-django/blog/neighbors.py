@@ -0,0 +1,109 @@
+# ============================================================
+# 博客模块 - 上一篇 / 下一篇
+# ============================================================
+# 文章按 (created_at, id) 排序（加上 id，同一时间发布的文章也有确定的先后）：
+#   previous：比当前文章早的最近一篇      next：比当前文章晚的最近一篇
+#   全站范围（global）和同一分类内（category，系列导航）各一组
+# 每个邻居都是一个 “WHERE 条件 ORDER BY created_at, id LIMIT 1” 子查询，
+# 分别走 (is_draft, created_at, id) 和 (category, is_draft, created_at, id) 索引（见 Post.Meta）：
+# 在索引上定位到当前文章的位置后向前 / 向后取一条即可，与文章总数无关。
+# 只读取索引中已有的列（id），不回表（covering index）。
+# 四个子查询用 OR id IN (...) 合并成一次查询，结果再按内容版本号缓存（core/cache.py），
+# 所以带邻居的详情请求最多只多一次查询，缓存命中时不多查询。
+# 注：SQLite 不支持在 UNION 的子查询中使用 ORDER BY / LIMIT，因此没有用 union()。
+# ============================================================
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from core.cache import content_cache_timeout, versioned_key
+
+from .models import Post
+
+SCOPES = ('global', 'category')
+# 内容变化时版本号改变，旧结果自然失效；缓存不共享时版本号只在本进程生效，超时会被缩短（见 core/cache.py）
+CACHE_TIMEOUT = 3600
+
+
+def parse_scopes(value):
+    """
+    解析 ?neighbors= 参数：1 / true / all 表示全部，
+    也可以用逗号分隔指定 global、category；其他值返回空元组（不返回邻居）
+    """
+    value = (value or '').strip().lower()
+    if value in ('1', 'true', 'all'):
+        return SCOPES
+    return tuple(scope for scope in SCOPES if scope in value.split(','))
+
+
+def _older(queryset, post):
+    # (created_at, id) < (当前时间, 当前 id)
+    # 写成 “created_at <= 当前时间” 的范围条件 + 排除同一时间里 id 更大的：范围条件可以直接用索引
+    return queryset.filter(created_at__lte=post.created_at).exclude(
+        created_at=post.created_at, id__gte=post.id
+    ).order_by('-created_at', '-id').values('id')[:1]
+
+
+def _newer(queryset, post):
+    return queryset.filter(created_at__gte=post.created_at).exclude(
+        created_at=post.created_at, id__lte=post.id
+    ).order_by('created_at', 'id').values('id')[:1]
+
+
+def _summary(post):
+    return {'id': post.id, 'title': post.title, 'slug': post.slug} if post else None
+
+
+def find_neighbors(post, scopes=SCOPES):
+    """
+    返回 {'global': {'previous': ..., 'next': ...}, 'category': {...} 或 None}
+    每篇邻居文章为 {'id', 'title', 'slug'}，没有时为 None；文章没有分类时 category 为 None
+    """
+    scopes = tuple(scope for scope in SCOPES if scope in scopes)
+    if not scopes:
+        return {}
+    key = versioned_key('neighbors', post.pk, *scopes)
+    result = cache.get(key)
+    if result is None:
+        result = _query(post, scopes)
+        cache.set(key, result, content_cache_timeout(CACHE_TIMEOUT))
+    return result
+
+
+def _query(post, scopes):
+    # 等价于 published()：SQLite 把 is_draft=False 写成 “NOT is_draft”，不算索引首列上的等值条件，
+    # 只能扫描后再排序；写成 IN (False) 才能在索引上直接定位（PostgreSQL 两种写法都能用索引）
+    published = Post.objects.filter(is_draft__in=[False])
+    subqueries = {}
+    if 'global' in scopes:
+        subqueries['global'] = (_older(published, post), _newer(published, post))
+    if 'category' in scopes and post.category_id is not None:
+        in_category = published.filter(category_id=post.category_id)
+        subqueries['category'] = (_older(in_category, post), _newer(in_category, post))
+
+    condition = Q()
+    for older, newer in subqueries.values():
+        condition |= Q(id__in=older) | Q(id__in=newer)
+    found = {}
+    if condition:
+        found = {
+            item.id: item
+            for item in Post.objects.filter(condition).only('id', 'title', 'slug', 'created_at', 'category_id')
+        }
+
+    # 一次查询取回的是所有邻居的并集，这里按 (created_at, id) 和分类分回各个位置：
+    # 比当前文章早的最近一篇是 previous，晚的最近一篇是 next
+    position = (post.created_at, post.id)
+    result = {scope: None for scope in scopes}
+    for scope in subqueries:
+        candidates = [
+            item for item in found.values()
+            if scope == 'global' or item.category_id == post.category_id
+        ]
+        older = [item for item in candidates if (item.created_at, item.id) < position]
+        newer = [item for item in candidates if (item.created_at, item.id) > position]
+        result[scope] = {
+            'previous': _summary(max(older, key=lambda item: (item.created_at, item.id), default=None)),
+            'next': _summary(min(newer, key=lambda item: (item.created_at, item.id), default=None)),
+        }
+    return result
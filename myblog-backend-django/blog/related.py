@@ -0,0 +1,168 @@
+# ============================================================
+# 博客模块 - 相关文章计算
+# ============================================================
+# 每篇文章表示为一个稀疏的“特征 → 权重”向量：
+#   标签      tag:<id>      权重 tag_weight
+#   分类      cat:<id>      权重 category_weight
+#   正文词项  term:<词>     权重 content_weight × 归一化 TF-IDF（可选）
+# 两篇文章的相似度为加权 Jaccard：
+#   J(A, B) = Σ min(a_i, b_i) / Σ max(a_i, b_i)
+# 因为 max(a, b) = a + b - min(a, b)，所以
+#   Σ max = |A| + |B| - Σ min（|A| 为向量权重之和）
+# 只需通过倒排索引（特征 → 含该特征的文章）累加 Σ min，
+# 不共享任何特征的文章对完全不会被访问（稀疏计算），
+# 计算量与“共享特征的文章对”数量成正比，而不是文章数的平方。
+# 分类特征只参与打分、不产生候选：同一分类下的所有文章两两共享 cat:<id>，
+# 放进倒排索引会让一个大分类产生 O(n²) 个文章对。
+# 候选文章只来自共同的标签 / 词项，分类相同只在这些候选之间提高得分（同分时优先同分类）；
+# 没有共同标签 / 词项的文章不会仅因为分类相同而成为相关文章。
+# ============================================================
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from . import models
+
+# 英文/数字词（至少 2 个字符）；中文按相邻两字（bigram）切分
+WORD_RE = re.compile(r'[a-z0-9]{2,}')
+CJK_RE = re.compile(r'[\u4e00-\u9fff]+')
+
+# 每篇文章最多保留的正文词项数（控制向量稀疏度）
+MAX_TERMS_PER_POST = 20
+# 出现在超过该比例文章中的词项视为停用词
+MAX_DOCUMENT_FREQUENCY = 0.5
+# 只参与打分、不进入倒排索引的特征前缀
+SCORE_ONLY_PREFIXES = ('cat:',)
+
+
+def tokenize(text):
+    """把文本切分为词项列表"""
+    text = text.lower()
+    terms = WORD_RE.findall(text)
+    for run in CJK_RE.findall(text):
+        if len(run) == 1:
+            terms.append(run)
+        else:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def build_vectors(tag_weight=1.0, category_weight=0.5, content_weight=0.0):
+    """
+    为所有已发布文章构建稀疏特征向量
+    返回 {post_id: {feature: weight}}
+    """
+    published = models.Post.objects.filter(is_draft=False)
+    vectors = {}
+    for post_id, category_id in published.values_list('id', 'category_id').iterator():
+        vector = {}
+        if category_id is not None and category_weight > 0:
+            vector[f'cat:{category_id}'] = category_weight
+        vectors[post_id] = vector
+
+    if tag_weight > 0:
+        through = models.Post.tags.through.objects.filter(post__is_draft=False)
+        for post_id, tag_id in through.values_list('post_id', 'tag_id').iterator():
+            # 各次查询之间文章可能被删除或新发布：只处理第一次查询中出现的文章
+            vector = vectors.get(post_id)
+            if vector is not None:
+                vector[f'tag:{tag_id}'] = tag_weight
+
+    if content_weight > 0 and vectors:
+        _add_content_terms(vectors, published, content_weight)
+    return vectors
+
+
+def _add_content_terms(vectors, published, content_weight):
+    """按 TF-IDF 为每篇文章挑选最重要的若干词项加入向量"""
+    term_counts = {}
+    document_frequency = Counter()
+    for post_id, title, content in published.values_list('id', 'title', 'content').iterator():
+        if post_id not in vectors:
+            # 第一次查询之后才发布的文章，下次计算时再加入
+            continue
+        counts = Counter(tokenize(f'{title} {content}'))
+        term_counts[post_id] = counts
+        document_frequency.update(counts.keys())
+
+    total = len(term_counts)
+    max_df = max(1, int(total * MAX_DOCUMENT_FREQUENCY))
+    for post_id, counts in term_counts.items():
+        scored = [
+            (count * math.log(total / document_frequency[term]), term)
+            for term, count in counts.items()
+            # 只出现在一篇文章里的词对相似度没有贡献
+            if 1 < document_frequency[term] <= max_df
+        ]
+        top = heapq.nlargest(MAX_TERMS_PER_POST, scored)
+        if not top:
+            continue
+        highest = top[0][0]
+        for score, term in top:
+            vectors[post_id][f'term:{term}'] = content_weight * score / highest
+
+
+def rank_related(vectors, top_k=5):
+    """
+    计算每篇文章得分最高的 top_k 篇相关文章
+    返回 {post_id: [(related_id, score), ...]}
+    """
+    # 倒排索引：特征 → [(post_id, weight)]（不包含只参与打分的特征）
+    postings = defaultdict(list)
+    totals = {}
+    score_only = {}
+    for post_id, vector in vectors.items():
+        totals[post_id] = sum(vector.values())
+        score_only[post_id] = []
+        for feature, weight in vector.items():
+            if feature.startswith(SCORE_ONLY_PREFIXES):
+                score_only[post_id].append((feature, weight))
+            else:
+                postings[feature].append((post_id, weight))
+
+    results = {}
+    for post_id, vector in vectors.items():
+        # 累加与每篇候选文章的 Σ min(a_i, b_i)
+        overlap = defaultdict(float)
+        for feature, weight in vector.items():
+            for other_id, other_weight in postings.get(feature, ()):
+                if other_id != post_id:
+                    overlap[other_id] += min(weight, other_weight)
+        scored = []
+        for other_id, shared in overlap.items():
+            # 只参与打分的特征（分类）只在候选之间比较
+            other_vector = vectors[other_id]
+            for feature, weight in score_only[post_id]:
+                if feature in other_vector:
+                    shared += min(weight, other_vector[feature])
+            union = totals[post_id] + totals[other_id] - shared
+            if union > 0:
+                scored.append((shared / union, other_id))
+        # 同分时 id 较大（较新）的文章优先
+        results[post_id] = [
+            (other_id, score) for score, other_id in heapq.nlargest(top_k, scored)
+        ]
+    return results
+
+
+@transaction.atomic
+def compute_related_posts(top_k=5, tag_weight=1.0, category_weight=0.5,
+                          content_weight=0.0, batch_size=1000):
+    """
+    重新计算并整表替换相关文章结果，返回写入的记录数
+    在事务中执行：读请求要么看到旧结果，要么看到新结果
+    """
+    vectors = build_vectors(tag_weight, category_weight, content_weight)
+    ranked = rank_related(vectors, top_k)
+    rows = [
+        models.RelatedPost(post_id=post_id, related_id=related_id, score=score, rank=rank)
+        for post_id, related in ranked.items()
+        for rank, (related_id, score) in enumerate(related, start=1)
+    ]
+    models.RelatedPost.objects.all().delete()
+    models.RelatedPost.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
@@ -10,6 +10,8 @@
 # 为什么需要：DRF 提供了多种序列化器基类（如 ModelSerializer, Serializer），所有字段类型（CharField, SlugField 等）也来自这里。
 from rest_framework import serializers
 from django.contrib.auth.models import User
+# 稀疏字段集：支持 ?fields= / ?omit= 只返回部分字段（见 core/fieldsets.py）
+from core.fieldsets import SparseFieldsetSerializerMixin
 from . import models
 
 # 当需要完整User信息的时候使用此序列化器
@@ -22,7 +24,7 @@ class UserSerializer(serializers.ModelSerializer):
             'email',
             ];
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Category
         fields = [
@@ -31,7 +33,7 @@ class CategorySerializer(serializers.ModelSerializer):
             'description'
         ]
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Tag
         fields = [
@@ -52,7 +54,7 @@ class AuthorPostListSerializer(serializers.ModelSerializer):
 # 命名含义：
 # PostList：表示这是用于“文章列表”的序列化器
 # Serializer：表明它是序列化器
-class PostListSerializer(serializers.ModelSerializer):
+class PostListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # 定义一个序列化字段，名为 author（前端 JSON 中的键名）
     # serializers.CharField(...): 指定该字段在 JSON 中是string类型
     # source='author.username'
@@ -99,7 +101,7 @@ class AuthorPostDetailSerializer(serializers.ModelSerializer):
         fields = ['username'];
 
 # 文章详情序列化器
-class PostDetailSerializer(serializers.ModelSerializer):
+class PostDetailSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = AuthorPostDetailSerializer(read_only=True)
     # 显式声明 slug 字段的类型。
     slug = serializers.SlugField(allow_unicode=True)
@@ -118,4 +120,56 @@ class PostDetailSerializer(serializers.ModelSerializer):
             'updated_at',
             'category',
             'tags'
-        ]
\ No newline at end of file
+        ]
+
+# 相关文章序列化器
+# 只输出详情页“相关文章”区块需要的字段，外加相似度得分
+class RelatedPostSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    slug = serializers.SlugField(allow_unicode=True)
+    # score 来自视图查询集中的 annotate()，不是 Post 模型字段
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = models.Post
+        fields = [
+            'id',
+            'title',
+            'slug',
+            'summary',
+            'created_at',
+            'score'
+        ]
+        # score 来自 annotate()，不对应模型列
+        field_dependencies = {'score': []}
+
+# 月度归档序列化器
+class MonthlyArchiveSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = models.MonthlyArchive
+        fields = [
+            'year',
+            'month',
+            'post_count'
+        ]
+
+# 热门文章序列化器
+class PopularPostSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    slug = serializers.SlugField(allow_unicode=True)
+
+    class Meta:
+        model = models.Post
+        fields = [
+            'id',
+            'title',
+            'slug',
+            'summary',
+            'created_at',
+            'views'
+        ]
+
+# 增量同步用文章序列化器（/api/sync/）
+# 与详情相同，但分类和标签只输出 id：
+# 分类 / 标签本身作为独立的记录同步，改名时客户端无需重新下载引用它们的每篇文章
+class PostSyncSerializer(PostDetailSerializer):
+    category = serializers.PrimaryKeyRelatedField(read_only=True)
+    tags = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
@@ -0,0 +1,316 @@
+# ============================================================
+# 博客模块 - 信号处理
+# ============================================================
+# 信号（signals）：模型保存/删除后 Django 会自动通知这里注册的函数。
+# 作用：
+# - 内容变化时让依赖内容的缓存失效（内容版本号 +1）
+# - 删除 / 撤回发布时写入删除记录，增量同步接口据此通知客户端（见 core/sync.py）
+# - 增量更新本进程的搜索联想索引（见 core/suggest.py）和 slug 集合（见 core/slugs.py）
+# - 刷新 Nginx 中受影响地址的 API 缓存（见 core/purge.py）
+# - 把受影响文章的列表项 JSON 标记为过期（见 core/listjson.py）
+# 注册方式：在 apps.BlogConfig.ready() 中导入本模块。
+# ============================================================
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core import listjson, purge, sync
+from core.cache import content_changed
+from core.models import Tombstone
+from core.slugs import post_slugs
+from core.suggest import suggest_index
+from . import archive, models, serializers
+
+
+@receiver(post_save, sender=models.Post)
+@receiver(post_delete, sender=models.Post)
+@receiver(post_save, sender=models.Category)
+@receiver(post_delete, sender=models.Category)
+@receiver(post_save, sender=models.Tag)
+@receiver(post_delete, sender=models.Tag)
+def invalidate_on_save_or_delete(sender, **kwargs):
+    content_changed()
+
+
+@receiver(m2m_changed, sender=models.Post.tags.through)
+def invalidate_on_tags_changed(sender, action, **kwargs):
+    # 只在真正修改之后（post_*）处理，忽略 pre_* 阶段
+    if action.startswith('post_'):
+        content_changed()
+
+
+# ======== 增量同步：删除记录 ========
+@receiver(post_delete, sender=models.Post)
+def record_post_deleted(sender, instance, **kwargs):
+    # 草稿从未对外公开（撤回发布时已经记录过），无需通知客户端
+    if not instance.is_draft:
+        sync.record_tombstone(instance)
+
+
+@receiver(post_delete, sender=models.Category)
+@receiver(post_delete, sender=models.Tag)
+def record_taxonomy_deleted(sender, instance, **kwargs):
+    sync.record_tombstone(instance)
+
+
+@receiver(post_save, sender=models.Post)
+def record_post_unpublished(sender, instance, **kwargs):
+    # 已发布 → 草稿：对客户端来说等同于删除（旧状态由下面的 remember_archive_state 记录）
+    old = getattr(instance, '_archive_old_state', None)
+    if old and not old[0] and instance.is_draft:
+        sync.record_tombstone(instance, Tombstone.Reason.UNPUBLISHED)
+
+
+@receiver(m2m_changed, sender=models.Post.tags.through)
+def touch_on_tags_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # 增删标签不会调用 save()，手动更新文章的 updated_at，使其出现在下一次同步中
+    sync.touch_m2m(instance, action, reverse, model, pk_set)
+
+
+# ======== 月度归档计数 ========
+# 保存前记录旧状态（是否草稿、创建时间），保存后与新状态比较，
+# 只对受影响的月份做 ±1，不重新统计全部文章
+@receiver(pre_save, sender=models.Post)
+def remember_archive_state(sender, instance, **kwargs):
+    old = None
+    if instance.pk:
+        old = sender.objects.filter(pk=instance.pk).values_list(
+            'is_draft', 'created_at'
+        ).first()
+    instance._archive_old_state = old
+
+
+@receiver(post_save, sender=models.Post)
+def update_archive_on_save(sender, instance, **kwargs):
+    old = getattr(instance, '_archive_old_state', None)
+    archive.apply_change(old, (instance.is_draft, instance.created_at))
+
+
+@receiver(post_delete, sender=models.Post)
+def update_archive_on_delete(sender, instance, **kwargs):
+    archive.apply_change((instance.is_draft, instance.created_at), None)
+
+
+# ======== 搜索联想索引 ========
+# 事务提交后再更新：回滚的修改不会进入索引
+@receiver(post_save, sender=models.Post)
+def update_suggest_on_post_save(sender, instance, **kwargs):
+    if instance.is_draft:
+        transaction.on_commit(lambda: suggest_index.remove('post', instance.pk))
+    else:
+        transaction.on_commit(
+            lambda: suggest_index.upsert('post', instance.pk, instance.title, instance.slug)
+        )
+
+
+@receiver(post_save, sender=models.Category)
+@receiver(post_save, sender=models.Tag)
+def update_suggest_on_taxonomy_save(sender, instance, **kwargs):
+    kind = sender._meta.model_name
+    transaction.on_commit(lambda: suggest_index.upsert(kind, instance.pk, instance.name))
+
+
+@receiver(post_delete, sender=models.Post)
+@receiver(post_delete, sender=models.Category)
+@receiver(post_delete, sender=models.Tag)
+def update_suggest_on_delete(sender, instance, **kwargs):
+    kind, pk = sender._meta.model_name, instance.pk
+    transaction.on_commit(lambda: suggest_index.remove(kind, pk))
+
+
+# ======== 详情页 slug 集合 ========
+# 只需及时加入新发布的 slug；集合中多出的 slug 只会多查一次数据库，由定期重建清理
+@receiver(post_save, sender=models.Post)
+def update_slugs_on_post_save(sender, instance, **kwargs):
+    slug = instance.slug
+    if instance.is_draft:
+        transaction.on_commit(lambda: post_slugs.discard(slug))
+    else:
+        transaction.on_commit(lambda: post_slugs.add(slug))
+
+
+@receiver(post_delete, sender=models.Post)
+def update_slugs_on_post_delete(sender, instance, **kwargs):
+    slug = instance.slug
+    transaction.on_commit(lambda: post_slugs.discard(slug))
+
+
+# ======== Nginx API 缓存刷新 ========
+# 只刷新受影响的地址：文章详情（新旧 slug）、各列表，以及按相关分类 / 标签筛选的列表
+# 未开启刷新（PROXY_CACHE_REFRESH_URL 为空）时直接返回，不做额外查询
+def _published_slugs(**filters):
+    return list(models.Post.objects.published().filter(**filters).values_list('slug', flat=True))
+
+
+@receiver(pre_save, sender=models.Post)
+def remember_proxy_cache_state(sender, instance, **kwargs):
+    old = None
+    if instance.pk and purge.is_enabled():
+        old = sender.objects.filter(pk=instance.pk).values_list('slug', 'category_id').first()
+    instance._proxy_cache_old_state = old
+
+
+@receiver(post_save, sender=models.Post)
+def refresh_proxy_cache_on_post_save(sender, instance, **kwargs):
+    if not purge.is_enabled():
+        return
+    # 保存前后都是草稿：没有公开内容发生变化
+    archive_state = getattr(instance, '_archive_old_state', None)
+    if instance.is_draft and (archive_state is None or archive_state[0]):
+        return
+    old_slug, old_category_id = getattr(instance, '_proxy_cache_old_state', None) or (None, None)
+    tag_ids = instance.tags.values_list('pk', flat=True)
+    purge.refresh_after_commit(purge.post_urls(
+        {old_slug, instance.slug}, {old_category_id, instance.category_id}, tag_ids,
+    ))
+
+
+@receiver(pre_delete, sender=models.Post)
+def remember_tags_before_delete(sender, instance, **kwargs):
+    # post_delete 时中间表的记录已经删除
+    if purge.is_enabled():
+        instance._proxy_cache_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=models.Post)
+def refresh_proxy_cache_on_post_delete(sender, instance, **kwargs):
+    if purge.is_enabled() and not instance.is_draft:
+        purge.refresh_after_commit(purge.post_urls(
+            [instance.slug], [instance.category_id], getattr(instance, '_proxy_cache_tag_ids', []),
+        ))
+
+
+@receiver(m2m_changed, sender=models.Post.tags.through)
+def refresh_proxy_cache_on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not purge.is_enabled():
+        return
+    if action == 'pre_clear':
+        # clear() 之后无法知道移除了哪些，先记下来
+        if reverse:
+            pk_set = sender.objects.filter(tag_id=instance.pk).values_list('post_id', flat=True)
+        else:
+            pk_set = sender.objects.filter(post_id=instance.pk).values_list('tag_id', flat=True)
+        instance._proxy_cache_cleared = set(pk_set)
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_proxy_cache_cleared', set())
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if reverse:
+        # 从标签一侧修改：instance 是标签，pk_set 是文章
+        urls = purge.tag_urls(instance.pk, _published_slugs(pk__in=pk_set))
+    elif instance.is_draft:
+        return
+    else:
+        urls = purge.post_urls([instance.slug], [instance.category_id], pk_set)
+    purge.refresh_after_commit(urls)
+
+
+@receiver(pre_delete, sender=models.Category)
+@receiver(pre_delete, sender=models.Tag)
+def remember_posts_before_taxonomy_delete(sender, instance, **kwargs):
+    # 删除分类时文章的分类被置空、删除标签时中间表记录被删除，之后就查不到相关文章了
+    if purge.is_enabled():
+        field = 'category' if sender is models.Category else 'tags'
+        instance._proxy_cache_post_slugs = _published_slugs(**{field: instance.pk})
+
+
+@receiver(post_save, sender=models.Category)
+@receiver(post_delete, sender=models.Category)
+def refresh_proxy_cache_on_category_changed(sender, instance, **kwargs):
+    if purge.is_enabled():
+        slugs = getattr(instance, '_proxy_cache_post_slugs', None)
+        if slugs is None:
+            slugs = _published_slugs(category=instance.pk)
+        purge.refresh_after_commit(purge.category_urls(instance.pk, slugs))
+
+
+@receiver(post_save, sender=models.Tag)
+@receiver(post_delete, sender=models.Tag)
+def refresh_proxy_cache_on_tag_changed(sender, instance, **kwargs):
+    if purge.is_enabled():
+        slugs = getattr(instance, '_proxy_cache_post_slugs', None)
+        if slugs is None:
+            slugs = _published_slugs(tags=instance.pk)
+        purge.refresh_after_commit(purge.tag_urls(instance.pk, slugs))
+
+
+# ======== 列表项 JSON（见 core/listjson.py） ========
+# 信号中只把受影响的文章标记为过期（一条 UPDATE），与修改在同一个事务中，回滚时一起回滚；
+# 逐行序列化由调度进程完成（refresh_stale_list_json），给分类 / 标签改名时保存请求不会变慢。
+# 放在文件末尾：同一信号的处理函数按注册顺序执行，这里排在 touch_m2m 等处理之后
+def list_json_queryset():
+    return models.Post.objects.select_related('author', 'category').prefetch_related('tags')
+
+
+def refresh_list_json(**filters):
+    """立即重新生成（rebuild_list_json 使用）"""
+    listjson.refresh(list_json_queryset().filter(**filters), serializers.PostListSerializer)
+
+
+def refresh_stale_list_json(batch_size=200):
+    """重新生成被标记为过期的行（调度进程使用），返回处理的行数"""
+    return listjson.refresh_stale(list_json_queryset(), serializers.PostListSerializer, batch_size)
+
+
+def mark_list_json_stale(**filters):
+    listjson.mark_stale(models.Post.objects.filter(**filters))
+
+
+@receiver(post_save, sender=models.Post)
+def mark_list_json_on_post_save(sender, instance, **kwargs):
+    mark_list_json_stale(pk=instance.pk)
+
+
+@receiver(m2m_changed, sender=models.Post.tags.through)
+def mark_list_json_on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # 从标签一侧 clear()：之后就查不到移除了哪些文章，先记下来
+        instance._list_json_cleared = list(sender.objects.filter(tag_id=instance.pk).values_list('post_id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        mark_list_json_stale(pk=instance.pk)
+    elif action == 'post_clear':
+        mark_list_json_stale(pk__in=getattr(instance, '_list_json_cleared', []))
+    else:
+        # 从标签一侧修改：instance 是标签，pk_set 是文章
+        mark_list_json_stale(pk__in=pk_set)
+
+
+@receiver(pre_delete, sender=models.Category)
+@receiver(pre_delete, sender=models.Tag)
+def remember_list_json_posts(sender, instance, **kwargs):
+    # 删除分类时文章的分类被批量置空、删除标签时中间表记录被删除，都不会触发文章的信号
+    field = 'category' if sender is models.Category else 'tags'
+    instance._list_json_post_ids = list(models.Post.objects.filter(**{field: instance.pk}).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=models.Category)
+@receiver(post_delete, sender=models.Category)
+def mark_list_json_on_category_changed(sender, instance, **kwargs):
+    post_ids = getattr(instance, '_list_json_post_ids', None)
+    if post_ids is None:
+        mark_list_json_stale(category=instance.pk)
+    else:
+        mark_list_json_stale(pk__in=post_ids)
+
+
+@receiver(post_save, sender=models.Tag)
+@receiver(post_delete, sender=models.Tag)
+def mark_list_json_on_tag_changed(sender, instance, **kwargs):
+    post_ids = getattr(instance, '_list_json_post_ids', None)
+    if post_ids is None:
+        mark_list_json_stale(tags=instance.pk)
+    else:
+        mark_list_json_stale(pk__in=post_ids)
+
+
+@receiver(post_save, sender=User)
+def mark_list_json_on_author_changed(sender, instance, update_fields=None, **kwargs):
+    # 列表中只显示作者的用户名；登录时只更新 last_login，不需要处理
+    if update_fields is None or 'username' in update_fields:
+        mark_list_json_stale(author=instance.pk)
@@ -1,3 +1,303 @@
+import os
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import listjson
+
+from . import neighbors, signals
+from .models import Category, Post, RelatedPost, Tag
+from .related import rank_related
+
+
+class ScheduledPublishTests(TestCase):
+    """定时发布：python manage.py publish_scheduled"""
+
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pw')
+
+    def publish(self, **options):
+        call_command('publish_scheduled', '--no-related', stdout=StringIO(), **options)
+
+    def create_due_post(self):
+        post = Post.objects.create(
+            title='定时文章', slug='scheduled', summary='', content='', author=self.author, is_draft=True
+        )
+        # save() 会把将来的 publish_at 保持为草稿；这里直接改成已经到期
+        Post.objects.filter(pk=post.pk).update(publish_at=timezone.now() - timedelta(minutes=1))
+        return post
+
+    def test_publishes_due_post_and_clears_publish_at(self):
+        post = self.create_due_post()
+        self.publish()
+        post.refresh_from_db()
+        self.assertFalse(post.is_draft)
+        self.assertIsNone(post.publish_at)
+
+    def test_unpublished_post_is_not_republished(self):
+        post = self.create_due_post()
+        self.publish()
+        # 发布之后在后台改回草稿：调度进程不能再把它发布出去
+        post.refresh_from_db()
+        post.is_draft = True
+        post.save()
+        self.publish()
+        post.refresh_from_db()
+        self.assertTrue(post.is_draft)
+
+    def test_future_post_stays_draft(self):
+        post = Post.objects.create(
+            title='将来', slug='future', summary='', content='', author=self.author,
+            is_draft=False, publish_at=timezone.now() + timedelta(days=1)
+        )
+        self.publish()
+        post.refresh_from_db()
+        self.assertTrue(post.is_draft)
+        self.assertIsNotNone(post.publish_at)
+
+    def test_failed_related_computation_does_not_stop_publishing(self):
+        post = self.create_due_post()
+        with mock.patch(
+            'core.management.commands.publish_scheduled.compute_related_posts',
+            side_effect=RuntimeError('boom'),
+        ) as compute, self.assertLogs('core.management.commands.publish_scheduled', 'ERROR'):
+            call_command('publish_scheduled', stdout=StringIO())
+        compute.assert_called_once()
+        post.refresh_from_db()
+        self.assertFalse(post.is_draft)
+
+    def test_loop_survives_failed_cycle(self):
+        from core.management.commands.publish_scheduled import Command
+
+        calls = []
+
+        def run_once(command, options):
+            calls.append(options)
+            if len(calls) == 1:
+                raise RuntimeError('database unavailable')
+            command.running = False
+
+        with mock.patch.object(Command, 'run_once', autospec=True, side_effect=run_once), \
+                mock.patch('core.management.commands.publish_scheduled.signal.signal'), \
+                self.assertLogs('core.management.commands.publish_scheduled', 'ERROR'):
+            call_command('publish_scheduled', '--loop', '--interval', '0', stdout=StringIO())
+        self.assertEqual(len(calls), 2)
+
+
+class RelatedPostsTests(TestCase):
+    """相关文章：blog/related.py"""
+
+    def test_category_alone_does_not_make_posts_related(self):
+        ranked = rank_related({
+            1: {'cat:1': 0.5},
+            2: {'cat:1': 0.5},
+            3: {'cat:1': 0.5, 'tag:1': 1.0},
+        })
+        self.assertEqual(ranked[1], [])
+        self.assertEqual(ranked[3], [])
+
+    def test_category_breaks_ties_between_tag_candidates(self):
+        ranked = rank_related({
+            1: {'cat:1': 0.5, 'tag:1': 1.0},
+            2: {'cat:1': 0.5, 'tag:1': 1.0},
+            3: {'cat:2': 0.5, 'tag:1': 1.0},
+        })
+        # 与 2：(1 + 0.5) / 1.5；与 3：1 / (1.5 + 1.5 - 1)
+        self.assertEqual(ranked[1], [(2, 1.0), (3, 0.5)])
+
+    def test_compute_related_posts_replaces_table(self):
+        author = User.objects.create_user('author', password='pw')
+        tag = Tag.objects.create(name='python')
+        for slug in ('a', 'b'):
+            post = Post.objects.create(
+                title=slug, slug=slug, summary='', content='', author=author, is_draft=False
+            )
+            post.tags.add(tag)
+        call_command('compute_related_posts', stdout=StringIO())
+        self.assertEqual(
+            sorted(RelatedPost.objects.values_list('post__slug', 'related__slug')),
+            [('a', 'b'), ('b', 'a')],
+        )
+
+
+class TagFilterTests(TestCase):
+    """文章列表的多标签过滤：?tags=1,2&tag_mode=any|all"""
+
+    def setUp(self):
+        author = User.objects.create_user('author', password='pw')
+        self.python, self.web, self.orm = (Tag.objects.create(name=name) for name in ('python', 'web', 'orm'))
+        tagged = {
+            'python-web': [self.python, self.web],
+            'python-web-orm': [self.python, self.web, self.orm],
+            'python': [self.python],
+            'orm': [self.orm],
+        }
+        for slug, tags in tagged.items():
+            post = Post.objects.create(title=slug, slug=slug, summary='', content='', author=author, is_draft=False)
+            post.tags.set(tags)
+
+    def slugs(self, tags, mode=None):
+        params = {'tags': ','.join(str(tag.pk) for tag in tags), 'page_size': 50}
+        if mode:
+            params['tag_mode'] = mode
+        response = self.client.get('/api/posts/', params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['slug'] for item in response.json()['results'])
+
+    def test_any_mode(self):
+        self.assertEqual(self.slugs([self.web, self.orm]), ['orm', 'python-web', 'python-web-orm'])
+
+    def test_all_mode(self):
+        self.assertEqual(self.slugs([self.python, self.web], 'all'), ['python-web', 'python-web-orm'])
+        self.assertEqual(self.slugs([self.python, self.web, self.orm], 'all'), ['python-web-orm'])
+        # 重复的 id 不影响 HAVING COUNT(*) = n
+        self.assertEqual(self.slugs([self.orm, self.orm, self.web], 'all'), ['python-web-orm'])
+
+
+class ListJSONTests(TestCase):
+    """文章列表的预先序列化 JSON：core/listjson.py"""
+
+    def setUp(self):
+        author = User.objects.create_user('author', password='pw')
+        self.category = Category.objects.create(name='Django')
+        for index in range(3):
+            Post.objects.create(
+                title=f'post-{index}', slug=f'post-{index}', summary='', content='',
+                author=author, category=self.category, is_draft=False,
+            )
+        signals.refresh_stale_list_json()
+
+    def categories(self):
+        response = self.client.get('/api/posts/', {'page_size': 50})
+        self.assertEqual(response.status_code, 200)
+        return [item['category']['name'] for item in response.json()['results']]
+
+    def stale_count(self):
+        return Post.objects.filter(list_json_version='').count()
+
+    def test_rename_marks_rows_stale_without_rendering(self):
+        self.assertEqual(self.stale_count(), 0)
+        self.category.name = 'Django 5'
+        with CaptureQueriesContext(connection) as queries:
+            self.category.save()
+        # 保存时只多一条 UPDATE 标记过期，不读取文章、不逐行序列化
+        self.assertEqual(self.stale_count(), 3)
+        self.assertFalse(any('FROM "blog_post"' in query['sql'] and query['sql'].startswith('SELECT')
+                             for query in queries.captured_queries))
+
+        self.assertEqual(signals.refresh_stale_list_json(), 3)
+        self.assertEqual(self.stale_count(), 0)
+        self.assertEqual(self.categories(), ['Django 5'] * 3)
+
+    def test_list_renders_stale_rows_without_writing(self):
+        self.category.name = 'Django 5'
+        self.category.save()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.categories(), ['Django 5'] * 3)
+        # GET 请求不写数据库：过期的行只用于本次响应，仍由调度进程重新生成
+        self.assertFalse(any(query['sql'].startswith(('UPDATE', 'INSERT')) for query in queries.captured_queries))
+        self.assertEqual(self.stale_count(), 3)
+
+    def results(self, **params):
+        response = self.client.get('/api/posts/', {'page_size': 50, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def serialized(self, **params):
+        # 请求稀疏字段集时照常逐行序列化：omit 一个不存在的字段，得到序列化器的原始输出作为对照
+        return self.results(omit='-', **params)
+
+    def test_serializer_version_change_renders_rows_again(self):
+        # 片段按原样输出：版本一致时不会重新序列化
+        Post.objects.update(list_json='{"id":0}')
+        self.assertEqual(self.results()['results'], [{'id': 0}] * 3)
+        # 部署新版本（APP_VERSION 或字段列表变化）后旧片段视为过期，照常序列化
+        self.addCleanup(listjson.serializer_version.cache_clear)
+        with mock.patch.dict(os.environ, {'APP_VERSION': 'next-release'}):
+            listjson.serializer_version.cache_clear()
+            self.assertEqual(self.results()['results'], self.serialized()['results'])
+
+    def test_fragments_match_serializer_output(self):
+        for page in (1, 2):
+            materialized = self.results(page_size=2, page=page)
+            serialized = self.serialized(page_size=2, page=page)
+            self.assertEqual(materialized['results'], serialized['results'])
+            self.assertEqual(materialized['count'], serialized['count'])
+        # 不分页时返回数组
+        self.assertEqual(self.client.get('/api/posts/').json(), self.client.get('/api/posts/?omit=-').json())
+
+    def test_scheduler_refreshes_stale_rows(self):
+        Post.objects.filter(slug='post-0').first().tags.add(Tag.objects.create(name='orm'))
+        self.assertEqual(self.stale_count(), 1)
+        call_command('publish_scheduled', '--no-related', stdout=StringIO())
+        self.assertEqual(self.stale_count(), 0)
+
+
+class NeighborTests(TestCase):
+    """上一篇 / 下一篇：blog/neighbors.py"""
+
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user('author', password='pw')
+        django, react = Category.objects.create(name='Django'), Category.objects.create(name='React')
+        start = timezone.now() - timedelta(days=1)
+        # (slug, 分类, 发布时间偏移)：b 和 c 的发布时间相同，按 id 决定先后；d 是草稿，e 没有分类
+        self.posts = {}
+        for slug, category, hours, draft in [
+            ('a', django, 0, False), ('b', react, 1, False), ('c', django, 1, False),
+            ('d', django, 2, True), ('e', None, 3, False),
+        ]:
+            post = Post.objects.create(
+                title=slug, slug=slug, summary='', content='', author=author,
+                category=category, is_draft=draft,
+            )
+            Post.objects.filter(pk=post.pk).update(created_at=start + timedelta(hours=hours))
+            post.refresh_from_db()
+            self.posts[slug] = post
+
+    def neighbors(self, slug, scope):
+        result = neighbors.find_neighbors(self.posts[slug])[scope]
+        if result is None:
+            return None
+        return tuple(item and item['slug'] for item in (result['previous'], result['next']))
+
+    def test_parse_scopes(self):
+        self.assertEqual(neighbors.parse_scopes('1'), ('global', 'category'))
+        self.assertEqual(neighbors.parse_scopes(' ALL '), ('global', 'category'))
+        self.assertEqual(neighbors.parse_scopes('category'), ('category',))
+        self.assertEqual(neighbors.parse_scopes('category,global'), ('global', 'category'))
+        self.assertEqual(neighbors.parse_scopes('0'), ())
+        self.assertEqual(neighbors.parse_scopes(None), ())
+
+    def test_equal_created_at_is_ordered_by_id(self):
+        self.assertEqual(self.neighbors('b', 'global'), ('a', 'c'))
+        self.assertEqual(self.neighbors('c', 'global'), ('b', 'e'))
+
+    def test_first_and_last_post(self):
+        self.assertEqual(self.neighbors('a', 'global'), (None, 'b'))
+        # 草稿 d 不算
+        self.assertEqual(self.neighbors('e', 'global'), ('c', None))
+
+    def test_category_scope(self):
+        self.assertEqual(self.neighbors('a', 'category'), (None, 'c'))
+        self.assertEqual(self.neighbors('c', 'category'), ('a', None))
+        self.assertEqual(self.neighbors('b', 'category'), (None, None))
+
+    def test_post_without_category(self):
+        self.assertIsNone(self.neighbors('e', 'category'))
 
-# Create your tests here.
+    def test_detail_view_returns_requested_scopes(self):
+        with mock.patch('blog.views.view_counter'):
+            response = self.client.get('/api/posts/b/', {'neighbors': 'global'})
+            plain = self.client.get('/api/posts/b/')
+        self.assertEqual(list(response.json()['neighbors']), ['global'])
+        self.assertEqual(response.json()['neighbors']['global']['next']['slug'], 'c')
+        self.assertNotIn('neighbors', plain.json())
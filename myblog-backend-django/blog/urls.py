@@ -29,7 +29,14 @@ urlpatterns = [
     #   为什么使用 slug 转换器？
     #       自动验证参数合法性（避免 posts/../../../etc/passwd/ 这类攻击）
     #       比通用 <str:slug> 更安全
+    # 以下固定路径必须写在 posts/<slug>/ 之前，否则 "archive" 等会被当成文章 slug
+    # 按月归档
+    path('posts/archive/', views.MonthlyArchiveListView.as_view(), name='post-archive'),
+    # 热门文章（按阅读量）
+    path('posts/popular/', views.PopularPostListView.as_view(), name='post-popular'),
     path('posts/<unicode_slug:slug>/', views.PostDetailView.as_view(), name='post-detail'),
+    # 相关文章（预计算结果，见 blog/related.py）
+    path('posts/<unicode_slug:slug>/related/', views.RelatedPostListView.as_view(), name='post-related'),
     
     # ======== 类型 ========
     path('categories/', views.CategoryListView.as_view(), name='category-list'),
@@ -3,6 +3,7 @@
 # 此项目是 DRF（前后端分离），视图返回的是 JSON 数据，不是 HTML，所以确实用不到 render。
 from django.shortcuts import render
 from django.http import JsonResponse
+from django.db.models import F
 from django.utils import timezone
 import os
 # generics 是什么？
@@ -17,31 +18,44 @@ from rest_framework import (
     filters
 )
 from django_filters.rest_framework import DjangoFilterBackend
+from core.coalesce import CoalescedListMixin
+from core.counters import view_counter
+from core.warming import is_internal_request
+from core.facets import FacetViewMixin
+from core.listjson import MaterializedListMixin
+from core.pagination import EstimatedCountPagination
+from core.fieldsets import SparseFieldsetViewMixin
+from core.slugs import SlugFilterViewMixin, post_slugs
 from . import (
+    filters as blog_filters,
     models,
+    neighbors,
     serializers
 )
 
+# 所有列表/详情视图都继承 SparseFieldsetViewMixin：
+# 支持 ?fields=id,title 或 ?omit=content 只返回部分字段，查询集随之只读取需要的列
+
 # ======== 类型 ========
 # 返回完整类型列表
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(SparseFieldsetViewMixin, generics.ListAPIView):
     serializer_class = serializers.CategorySerializer
     # 读取的json数据格式用的是什么model
     queryset = models.Category.objects.all()
 
 # 返回单独类型详情
-class CategoryDetailView(generics.RetrieveAPIView):
+class CategoryDetailView(SparseFieldsetViewMixin, generics.RetrieveAPIView):
     serializer_class = serializers.CategorySerializer
     queryset = models.Category.objects.all()
 
 # ======== 标签 ========
 # 返回完整标签列表
-class TagListView(generics.ListAPIView):
+class TagListView(SparseFieldsetViewMixin, generics.ListAPIView):
     serializer_class = serializers.TagSerializer
     queryset = models.Tag.objects.all()
 
 # 返回单独标签详情
-class TagDetailView(generics.RetrieveAPIView):
+class TagDetailView(SparseFieldsetViewMixin, generics.RetrieveAPIView):
     serializer_class = serializers.TagSerializer
     queryset = models.Tag.objects.all()
 
@@ -55,7 +69,13 @@ class TagDetailView(generics.RetrieveAPIView):
 #   返回对象列表
 #   自动处理分页、排序等功能
 #   只响应 GET 请求，其他方法（POST/PUT）返回 405 Method Not Allowed
-class PostListView(generics.ListAPIView):
+# 文章列表是最耗资源的接口：
+#   CoalescedListMixin：相同的并发请求只查询、序列化一次（见 core/coalesce.py）
+#   get_throttle_scope()：按 IP 限流，搜索请求单独使用更严格的 post-search 速率（见 core/throttling.py）
+#   FacetViewMixin：?facets=category,tags 时附带分类 / 标签的计数（见 core/facets.py）
+#   MaterializedListMixin：直接拼接每篇文章预先存好的 list_json，不再逐行序列化（见 core/listjson.py）
+class PostListView(CoalescedListMixin, FacetViewMixin, MaterializedListMixin, SparseFieldsetViewMixin,
+                   generics.ListAPIView):
     # 告诉视图 “用哪个 Serializer 来序列化数据”。
     # 机制：当 DRF 处理请求时，会调用 serializer_class 对 queryset 中的每个对象进行序列化
     serializer_class = serializers.PostListSerializer
@@ -63,13 +83,13 @@ class PostListView(generics.ListAPIView):
     # Post.objects： Django ORM 的模型管理器，用于查询数据库
     # select_related: 用于一对一/多对一关系筛选(ForeignKey)
     # prefetch_related: 用于多对多(ManyToManyField)
-    # .filter(is_draft=False)： 只获取已发布的文章，过滤掉草稿
+    # .published()： 只获取已发布的文章，过滤掉草稿（定义在 models.PostQuerySet）
     # 如果没有这一行，API 会返回所有文章（包括草稿）
     # .order_by('-created_at')：规定排序规则，按发布时间排序。-表示降序（从新到旧）
     queryset = models.Post.objects.select_related(
         'author', 
         'category'
-        ).prefetch_related('tags').filter(is_draft=False).order_by('-created_at')
+        ).prefetch_related('tags').published().order_by('-created_at')
     # 过滤搜索结果
     # 指定所用过滤器,其他常用的过滤器有：
     # ExactFilter：使用精确匹配过滤，可以用于过滤整数，boolean，字符串等类型的字段
@@ -90,10 +110,18 @@ class PostListView(generics.ListAPIView):
         'author__username'
     ]
     # 指定 DjangoFilterBackend 过滤条件
-    filterset_fields = [
-        'category',
-        'tags'
-    ]
+    # PostFilter 支持 ?category= / ?tags= / ?year=&month=（见 blog/filters.py）
+    filterset_class = blog_filters.PostFilter
+    # 分页：默认不分页（兼容前端直接使用数组）
+    # 传入 ?page_size=20&page=2 时分页，总数使用估算/缓存计数，避免每页 COUNT(*)
+    pagination_class = EstimatedCountPagination
+    # 可返回的分面：{字段: 关联模型上的显示名称字段}
+    facet_fields = {'category': 'name', 'tags': 'name'}
+
+    def get_throttle_scope(self):
+        if self.request.query_params.get('search'):
+            return 'post-search'
+        return 'post-list'
 
 # 定义一个用于单篇文章详情的API 视图类。
 # 继承关系：
@@ -104,18 +132,89 @@ class PostListView(generics.ListAPIView):
 #   返回单个对象（不是列表）
 #   只响应 GET 请求，其他方法（POST/PUT）返回 405 Method Not Allowed
 #   如果对象不存在，返回 404 Not Found
-class PostDetailView(generics.RetrieveAPIView):
+class PostDetailView(SlugFilterViewMixin, SparseFieldsetViewMixin, generics.RetrieveAPIView):
     # 指定用于序列化单篇文章详情的 Serializer 类
     serializer_class = serializers.PostDetailSerializer
     # query: 查询
     # 只获取已发布的文章，过滤掉草稿
+    # defer：详情页用不到列表项 JSON（core/listjson.py），不读取
     queryset = models.Post.objects.select_related(
         'author',
         'category'
-        ).prefetch_related('tags').filter(is_draft=False)
+        ).prefetch_related('tags').published().defer('list_json', 'list_json_version')
     # DRF 默认根据主键（id）查找对象，例如：/api/posts/1/
     # 这里改为根据 slug 字段查找文章，例如：/api/posts/my-first-post/
     lookup_field = 'slug'  # 根据 slug 字段查找文章，而不是默认的 id
+    # 不存在的 slug（爬虫扫描、失效链接）直接 404，不查数据库（见 core/slugs.py）
+    slug_filter = post_slugs
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        # 可选：上一篇 / 下一篇（?neighbors=1，或 ?neighbors=global / category 只要其中一组）
+        # 走 (created_at, id) 索引的一次查询，结果按内容版本号缓存（见 blog/neighbors.py）
+        scopes = neighbors.parse_scopes(request.query_params.get('neighbors'))
+        if scopes:
+            response.data['neighbors'] = neighbors.find_neighbors(self.object, scopes)
+        # 阅读量只在内存中 +1，由后台线程定期批量写库（见 core/counters.py）
+        # 缓存预热、Nginx 缓存刷新等内部请求不计数
+        if not is_internal_request(request):
+            view_counter.increment(self.object)
+        return response
+
+    def get_object(self):
+        # 记下查到的文章，供 retrieve() 计数使用
+        self.object = super().get_object()
+        return self.object
+
+# 热门文章列表
+# GET /api/posts/popular/?limit=5
+# 按数据库中已写入的阅读量排序（走 (is_draft, -views) 索引），不等待内存中的计数
+class PopularPostListView(SparseFieldsetViewMixin, generics.ListAPIView):
+    serializer_class = serializers.PopularPostSerializer
+    pagination_class = None
+    default_limit = 5
+    max_limit = 50
+
+    def get_queryset(self):
+        return models.Post.objects.published().only(
+            'id', 'title', 'slug', 'summary', 'created_at', 'views'
+        ).order_by('-views', '-created_at')
+
+    def filter_queryset(self, queryset):
+        # 切片放在最后：切片之后的查询集不能再调整 only() 等
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+        return super().filter_queryset(queryset)[:limit]
+
+# 相关文章列表
+# GET /api/posts/<slug>/related/
+# 数据来自预计算表 RelatedPost（由 compute_related_posts 命令定期生成），
+# 一次查询即可：按 slug 唯一索引找到源文章 → 按 (post_id, rank) 索引取相关文章
+class RelatedPostListView(SparseFieldsetViewMixin, generics.ListAPIView):
+    serializer_class = serializers.RelatedPostSerializer
+    # 相关文章数量固定（top-K），不需要分页
+    pagination_class = None
+
+    def get_queryset(self):
+        return models.Post.objects.published().filter(
+            related_from__post__slug=self.kwargs['slug'],
+            related_from__post__is_draft=False,
+        ).annotate(
+            score=F('related_from__score')
+        ).only(
+            'id', 'title', 'slug', 'summary', 'created_at'
+        ).order_by('related_from__rank')
+
+# 按月归档列表
+# GET /api/posts/archive/ → [{"year": 2025, "month": 10, "post_count": 12}, ...]
+# 数据来自预聚合表 MonthlyArchive（由 Post 信号增量维护），查询量只与月份数有关
+class MonthlyArchiveListView(SparseFieldsetViewMixin, generics.ListAPIView):
+    serializer_class = serializers.MonthlyArchiveSerializer
+    queryset = models.MonthlyArchive.objects.filter(post_count__gt=0)
+    pagination_class = None
 
 # 完整数据流示例
 # 当访问 GET /api/posts/learn-django/：
@@ -0,0 +1,51 @@
+"""
+只提供公开 API 的 worker 使用的配置（API-only）
+
+绝大多数请求是匿名的 JSON 读取，用不到后台管理、会话、消息和 CSRF。
+在 config.settings 的基础上去掉这些 app 和中间件：worker 启动时少导入
+admin（以及 blog/admin.py 等）、表单、模板相关的 40 多个模块，每个 worker 占用内存更少。
+用 `python manage.py profile_imports --compare` 对比两种配置的启动耗时和内存。
+
+实测（SQLite，交替测量 9 次取中位数）：RSS 稳定减少约 1.7 MB；
+少导入的模块自身耗时合计约 15~20 ms（约占 400 ms 导入时间的 4%），
+小于导入总耗时本身的波动（同一配置多次测量相差 100 ms 以上），单次对比可能看到任意一方更快。
+导入时间的大头是 DRF 及其间接导入的模块（装有 psycopg 时 rest_framework.compat 会导入
+django.contrib.postgres），两种配置都需要。主要收益是内存，不要期待明显更快的冷启动。
+
+用法：只让 gunicorn 使用这个配置（管理命令仍使用 config.settings，migrate 等不受影响），例如
+    GUNICORN_CMD_ARGS="--env DJANGO_SETTINGS_MODULE=config.settings_api"
+注意：这样启动的 worker 没有 /admin/，也不支持会话登录；
+后台管理需要另外运行一个使用默认配置（config.settings）的实例，并由 Nginx 把 /admin/ 转发过去。
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# 公开 API 不需要的 app：后台管理依赖会话和消息，三者一起去掉
+# auth 和 contenttypes 保留（Post.author 外键指向 User）
+API_ONLY_EXCLUDED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+]
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_ONLY_EXCLUDED_APPS]
+
+# 会话 / 登录 / CSRF / 消息中间件：公开 API 只有匿名 GET，全部去掉
+# （AuthenticationMiddleware 依赖会话，request.user 改由 DRF 设置为匿名用户）
+API_ONLY_EXCLUDED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+MIDDLEWARE = [item for item in MIDDLEWARE if item not in API_ONLY_EXCLUDED_MIDDLEWARE]
+
+TEMPLATES[0]['OPTIONS']['context_processors'] = [
+    processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+    if processor != 'django.contrib.messages.context_processors.messages'
+]
+
+# 不做会话 / Basic 认证：所有请求都是匿名用户，也不会导入认证相关模块
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+}
@@ -16,14 +16,13 @@ Including another URLconf
 """
 
 
-from django.contrib import admin
 # include：用于包含其他 app 的路由模块（必须导入！）
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core import views as core_views
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     # 包含 blog 应用的路由模块，前端 API 路径统一以 /api/ 开头，清晰易维护
     # 作用：将所有以 /api/ 开头的请求，交给 blog 应用的路由处理
     # 'api/'：
@@ -36,8 +35,23 @@ urlpatterns = [
     path('api/', include('blog.urls')),
     # 项目展示模块路由
     path('api/', include('project.urls')),
+    # 跨模块聚合接口（首页等）
+    path('api/', include('core.urls')),
+    # RSS / Atom 订阅与站点地图：挂在根路径，供阅读器和搜索引擎爬虫访问
+    # （Nginx 把主站的 /feed/ 和 /sitemap*.xml 转发到后端）
+    path('feed/', core_views.RSSFeedView.as_view(), name='feed-rss'),
+    path('feed/atom/', core_views.AtomFeedView.as_view(), name='feed-atom'),
+    path('sitemap.xml', core_views.SitemapView.as_view(), name='sitemap'),
+    path('sitemap-<slug:section>-<int:page>.xml', core_views.SitemapShardView.as_view(), name='sitemap-shard'),
 ]
 
+# 后台管理：API-only 配置（config/settings_api.py）没有安装 admin，
+# 此时不导入 django.contrib.admin，也不注册 /admin/
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
 # 开发环境下提供媒体文件服务
 # 生产环境应由 Nginx 处理媒体文件
 if settings.DEBUG:
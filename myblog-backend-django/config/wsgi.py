@@ -14,3 +14,31 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# 内存索引：搜索联想（core/suggest.py）、详情页 slug 集合（core/slugs.py）
+# 在后台线程中构建，不占用 worker 的启动时间（构建需要查询数据库）；
+# 构建完成之前搜索联想返回空结果、slug 不做拦截，构建失败时第一次请求会再次触发
+from core.slugs import post_slugs, project_slugs
+from core.suggest import suggest_index
+
+suggest_index.rebuild_in_background()
+post_slugs.rebuild_in_background()
+project_slugs.rebuild_in_background()
+
+# 内存统计（见 core/memory.py）：kill -USR2 <worker 进程号> 把 RSS、GC 和分配位置写入日志；
+# MEMORY_TRACEMALLOC=1 时从这里开始跟踪内存分配
+from django.conf import settings
+from core import memory
+
+memory.install_signal_handler()
+if settings.MEMORY_TRACEMALLOC:
+    memory.start_tracing()
+
+# 缓存预热（见 core/warming.py）：WARM_CACHES_ON_START=1 时在 worker 开始接受请求之前完成
+if settings.WARM_CACHES_ON_START:
+    try:
+        from core.warming import warm_on_start
+        warm_on_start()
+    except Exception:
+        import logging
+        logging.getLogger(__name__).exception('缓存预热失败')
@@ -0,0 +1,30 @@
+# ============================================================
+# 公共组件 - 后台管理
+# ============================================================
+# 计数字段（阅读量 views）由 core.counters 在后台线程中用 views = views + delta 累加，
+# 后台编辑页打开时读到的值在保存前早已过时。
+# ModelAdmin 默认 obj.save() 写回全部字段，会用旧值覆盖这期间已写入的增量。
+# CounterFieldsAdminMixin：计数字段只读，修改时 save(update_fields=...) 不包含计数字段。
+# ============================================================
+
+
+class CounterFieldsAdminMixin:
+    """
+    放在 admin.ModelAdmin 之前
+    counter_fields：由计数缓冲写入、后台不应修改的字段
+    """
+    counter_fields = ('views',)
+
+    def get_readonly_fields(self, request, obj=None):
+        return (*super().get_readonly_fields(request, obj), *self.counter_fields)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            # 新建时计数为默认值 0，没有可以覆盖的增量
+            return super().save_model(request, obj, form, change)
+        # 列表页 list_editable 的修改也经过这里
+        fields = [
+            field.name for field in obj._meta.concrete_fields
+            if not field.primary_key and field.name not in self.counter_fields
+        ]
+        obj.save(update_fields=fields)
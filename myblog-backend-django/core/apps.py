@@ -0,0 +1,20 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = '公共组件'
+
+    def ready(self):
+        # SQLite 生产模式：每个新连接建立时设置 PRAGMA（见 core/sqlite.py）
+        from django.db.backends.signals import connection_created
+
+        from .sqlite import apply_pragmas
+        connection_created.connect(apply_pragmas, dispatch_uid='core.sqlite.apply_pragmas')
+
+        # 统计每个 worker 处理的请求数（见 core/memory.py）
+        from django.core.signals import request_finished
+
+        from .memory import request_finished as count_request
+        request_finished.connect(count_request, dispatch_uid='core.memory.request_finished')
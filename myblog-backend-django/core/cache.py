@@ -0,0 +1,80 @@
+# ============================================================
+# 公共组件 - 内容版本号（缓存失效）
+# ============================================================
+# 所有“依赖内容”的缓存（计数、首页聚合、Feed 等）都把内容版本号拼进缓存键。
+# 任意 Post / Project / Category / Tag / TechStack 发生变化时，
+# 信号处理函数调用 bump_content_version()，旧缓存键自然失效（无需逐个删除）。
+#
+# 限制：版本号存在默认缓存里，只有所有进程共享同一个缓存时才能让所有进程同时失效。
+# 默认的 LocMemCache 是每个进程一份：后台修改内容的 worker、定时发布进程（scheduler）
+# 增加的版本号，其他 gunicorn worker 看不到，它们会继续使用旧缓存直到过期。
+# 因此：
+#   - 生产环境（docker-compose.prod.yml）默认开启 SHARED_CACHE_PATH，backend 与 scheduler
+#     挂载同一个 tmpfs 卷，版本号对所有进程可见（也可以换成 Redis / Memcached 等共享后端）
+#   - 缓存不共享时，依赖版本号的缓存时间通过 content_cache_timeout() 限制在
+#     LOCAL_CONTENT_CACHE_TTL 秒以内（默认 60），过期数据最多保留这么久
+# ============================================================
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CONTENT_VERSION_KEY = 'content:version'
+# 每个进程各自一份的缓存后端：内容版本号无法跨进程生效
+PER_PROCESS_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def cache_is_shared():
+    """默认缓存是否由所有进程共享（共享内存文件、文件缓存、Redis 等）"""
+    return settings.CACHES['default']['BACKEND'] not in PER_PROCESS_BACKENDS
+
+
+def content_cache_timeout(timeout):
+    """依赖内容版本号的缓存时间：缓存不共享时不超过 LOCAL_CONTENT_CACHE_TTL 秒"""
+    if cache_is_shared():
+        return timeout
+    return min(timeout, getattr(settings, 'LOCAL_CONTENT_CACHE_TTL', 60))
+
+
+def get_content_version():
+    """返回当前内容版本号（整数）"""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        # add() 只在键不存在时写入，避免多个进程互相覆盖
+        cache.add(CONTENT_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CONTENT_VERSION_KEY, 1)
+    return version
+
+
+def bump_content_version():
+    """内容版本号 +1，返回新的版本号"""
+    try:
+        return cache.incr(CONTENT_VERSION_KEY)
+    except ValueError:
+        # 键不存在（缓存刚启动或被淘汰）：从 2 开始，保证与“默认版本 1”不同
+        cache.add(CONTENT_VERSION_KEY, 2, timeout=None)
+        return cache.get(CONTENT_VERSION_KEY, 2)
+
+
+def content_changed():
+    """
+    内容发生变化时由信号调用
+    在事务提交之后再让缓存失效：如果提交前失效，
+    并发请求可能把“旧数据”重新写进新版本的缓存里
+    """
+    transaction.on_commit(bump_content_version)
+    # 可选：稍后在后台重新预热列表类接口（见 core/warming.py，WARM_CACHES_AFTER_CHANGE）
+    transaction.on_commit(_schedule_rewarm)
+
+
+def _schedule_rewarm():
+    from .warming import rewarmer
+    rewarmer.schedule()
+
+
+def versioned_key(*parts):
+    """生成带内容版本号的缓存键，如 versioned_key('count', 'blog.post', digest)"""
+    return ':'.join(['v%s' % get_content_version(), *map(str, parts)])
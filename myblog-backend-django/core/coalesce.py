@@ -0,0 +1,85 @@
+# ============================================================
+# 公共组件 - 请求合并（single-flight）
+# ============================================================
+# 热门列表 / 搜索在同一时刻可能收到许多完全相同的请求（首页刷新、爬虫并发），
+# 每个请求各查一次数据库、各序列化一次，负载成倍增加（“惊群”）。
+# 做法：同一 worker 内，相同的请求（协议 + 域名 + 路径 + 查询参数 + 内容版本号）同时只执行一次：
+#   - 第一个请求（leader）正常查询并序列化
+#   - 执行期间到达的相同请求等待 leader 完成，直接复用它的结果（出错时同样抛出异常）
+#   - leader 完成后立即移除记录，之后的请求重新执行（这里只合并“同时”的请求，不是缓存）
+# 注意：只有一个 worker 同时处理多个请求时才有效果——
+# gunicorn 默认的 sync worker 一次只处理一个请求，需要启用线程，
+# 例如在 .env.prod 中设置 GUNICORN_CMD_ARGS="--threads 4"。
+# ============================================================
+
+import logging
+import threading
+
+from rest_framework.response import Response
+
+from .cache import get_content_version
+
+logger = logging.getLogger(__name__)
+
+# 等待 leader 的最长时间（秒），超时后自己执行，避免 leader 卡住时所有请求一起卡住
+WAIT_TIMEOUT = 30
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        """执行 func()；相同 key 的并发调用只执行一次并共享结果"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(WAIT_TIMEOUT):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            logger.warning('等待合并请求超时，单独执行：%s', key)
+            return func()
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+flights = SingleFlight()
+
+
+class CoalescedListMixin:
+    """
+    列表视图混入：相同的并发请求共享一次查询和序列化的结果
+    只用于对所有用户返回相同内容的公开接口
+    """
+
+    def list(self, request, *args, **kwargs):
+        params = tuple(sorted((name, tuple(values)) for name, values in request.query_params.lists()))
+        # 版本号只在缓存共享时跨进程生效（见 core/cache.py）；这里只合并“正在执行”的请求，
+        # 版本号不准时最多让修改后的一个请求复用修改前刚开始的查询结果
+        # 分页链接等是包含协议和域名的完整地址：不同域名 / 协议的请求结果不能共享
+        key = (get_content_version(), request.scheme, request.get_host(), request.path, params)
+        data = flights.do(key, lambda: super(CoalescedListMixin, self).list(request, *args, **kwargs).data)
+        # 多个请求共享同一份 data，渲染时只读取，不会互相影响
+        return Response(data)
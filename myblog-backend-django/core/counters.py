@@ -0,0 +1,187 @@
+# ============================================================
+# 公共组件 - 阅读量计数缓冲
+# ============================================================
+# 问题：每次访问详情页都执行 UPDATE ... SET views = views + 1，
+#   热门文章的同一行会被所有请求串行加锁，PostgreSQL 每次 UPDATE 还会产生一个死元组。
+# 方案：
+#   1. 请求只在进程内存中累加（加锁的字典 +1，微秒级，不访问数据库）
+#   2. 后台线程每隔 VIEW_COUNTER_FLUSH_INTERVAL 秒把累计增量一次性写入：
+#        UPDATE blog_post AS t SET views = t.views + v.delta
+#        FROM (VALUES (1, 5), (2, 3), ...) AS v(id, delta) WHERE t.id = v.id
+#   3. 可选（VIEW_COUNTER_SPOOL_DIR）：多个 gunicorn worker 先把增量写入共享目录，
+#      由抢到文件锁的那个 worker 合并后统一写库，每个周期只有一条 UPDATE
+# 读取（热门文章列表）只读数据库中已写入的计数，从不等待计数写入。
+# ============================================================
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+
+logger = logging.getLogger(__name__)
+
+# 单条 UPDATE 最多包含的行数（避免 SQL 参数过多）
+UPDATE_CHUNK_SIZE = 500
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def write_deltas(deltas, field='views'):
+    """
+    把 {(model_label, pk): delta} 批量加到数据库
+    每个模型每 UPDATE_CHUNK_SIZE 行一条 UPDATE 语句
+    """
+    by_model = defaultdict(list)
+    for (label, pk), delta in deltas.items():
+        if delta:
+            by_model[label].append((pk, delta))
+
+    for label, rows in by_model.items():
+        model = apps.get_model(label)
+        table = model._meta.db_table
+        pk_column = model._meta.pk.column
+        connection = connections[router.db_for_write(model)]
+        qn = connection.ops.quote_name
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            # 按主键排序：多个进程同时写入时加锁顺序一致，避免死锁
+            for chunk in _chunks(sorted(rows), UPDATE_CHUNK_SIZE):
+                params = [value for row in chunk for value in row]
+                if connection.vendor == 'postgresql':
+                    values = ', '.join(['(%s::bigint, %s::bigint)'] * len(chunk))
+                    sql = (
+                        f'UPDATE {qn(table)} AS t SET {qn(field)} = t.{qn(field)} + v.delta '
+                        f'FROM (VALUES {values}) AS v(id, delta) '
+                        f'WHERE t.{qn(pk_column)} = v.id'
+                    )
+                else:
+                    # SQLite 等：用 CTE 表达同样的“一条语句批量更新”
+                    values = ', '.join(['(%s, %s)'] * len(chunk))
+                    sql = (
+                        f'WITH v(id, delta) AS (VALUES {values}) '
+                        f'UPDATE {qn(table)} SET {qn(field)} = {qn(field)} + '
+                        f'(SELECT delta FROM v WHERE v.id = {qn(table)}.{qn(pk_column)}) '
+                        f'WHERE {qn(pk_column)} IN (SELECT id FROM v)'
+                    )
+                cursor.execute(sql, params)
+
+
+class ViewCounterBuffer:
+    """
+    进程内计数缓冲
+    gunicorn fork 出的每个 worker 各自拥有一份（首次计数时按 pid 启动刷新线程）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._pid = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'VIEW_COUNTER_FLUSH_INTERVAL', 5)
+
+    @property
+    def spool_dir(self):
+        spool_dir = getattr(settings, 'VIEW_COUNTER_SPOOL_DIR', '')
+        return Path(spool_dir) if spool_dir else None
+
+    def increment(self, instance, amount=1):
+        """为模型实例的阅读量累加 amount（只写内存）"""
+        key = (instance._meta.label_lower, instance.pk)
+        with self._lock:
+            self._pending[key] += amount
+            if self._pid != os.getpid():
+                self._start_flusher()
+
+    def _start_flusher(self):
+        # fork 之后父进程的线程不会被继承，需要在当前进程重新启动
+        self._pid = os.getpid()
+        thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+        thread.start()
+        # 进程正常退出时把剩余增量写入
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('阅读量写入失败')
+            finally:
+                # 后台线程持有独立的数据库连接，用完及时关闭
+                close_old_connections()
+
+    def _take_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        return pending
+
+    def flush(self):
+        """把累计的增量写入数据库，返回写入的行数"""
+        pending = self._take_pending()
+        if self.spool_dir is not None:
+            return self._flush_via_spool(pending)
+        if not pending:
+            return 0
+        try:
+            write_deltas(pending)
+        except Exception:
+            # 写入失败：把增量放回缓冲，下个周期重试
+            with self._lock:
+                for key, delta in pending.items():
+                    self._pending[key] += delta
+            raise
+        return len(pending)
+
+    # ======== 共享目录模式（多个 worker 合并写入） ========
+
+    def _flush_via_spool(self, pending):
+        spool_dir = self.spool_dir
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        if pending:
+            # 先写临时文件再原子重命名，读取方不会读到写了一半的文件
+            name = f'{os.getpid()}-{time.time_ns()}'
+            tmp_path = spool_dir / f'.{name}.tmp'
+            tmp_path.write_text(json.dumps([[*key, delta] for key, delta in pending.items()]))
+            os.replace(tmp_path, spool_dir / f'{name}.json')
+
+        with open(spool_dir / '.flush.lock', 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # 其他 worker 正在写库，本次增量会在下一个周期被合并
+                return 0
+            try:
+                return self._merge_spool(spool_dir)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _merge_spool(self, spool_dir):
+        files = sorted(spool_dir.glob('*.json'))
+        merged = defaultdict(int)
+        for path in files:
+            for label, pk, delta in json.loads(path.read_text()):
+                merged[(label, pk)] += delta
+        if merged:
+            write_deltas(merged)
+        # 写库成功后才删除，失败时文件保留到下次重试
+        for path in files:
+            path.unlink(missing_ok=True)
+        return len(merged)
+
+
+# 全局单例：视图中使用 view_counter.increment(obj)
+view_counter = ViewCounterBuffer()
@@ -0,0 +1,126 @@
+# ============================================================
+# 公共组件 - 计数策略
+# ============================================================
+# 大表上的 COUNT(*) 需要扫描全表（PostgreSQL 的 MVCC 无法直接读取行数），
+# 带 JOIN 的过滤查询（如 ?tags=）更是如此，分页器每翻一页都会执行一次。
+# 这里按表规模选择计数方式：
+# - 小表：照常精确 COUNT(*)
+# - 大表且查询未带过滤条件：读取 pg_class.reltuples（由 ANALYZE/autovacuum 维护）
+# - 大表且带过滤条件：读取 EXPLAIN 的预估行数；预估结果较小时仍做精确计数
+# 结果按“查询 SQL + 内容版本号”缓存，内容变化后自动失效。
+# 非 PostgreSQL 数据库（如 SQLite）始终使用精确计数（同样会被缓存）。
+# ============================================================
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+from .cache import content_cache_timeout, versioned_key
+
+
+def get_estimate_threshold():
+    """超过该行数才使用估算值（settings.COUNT_ESTIMATE_THRESHOLD）"""
+    return getattr(settings, 'COUNT_ESTIMATE_THRESHOLD', 10000)
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    读取 PostgreSQL 统计信息中的表行数估算值
+    其他数据库或表从未被 ANALYZE 过（reltuples = -1）时返回 None
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def explain_rows(queryset):
+    """
+    读取 PostgreSQL 查询计划的预估行数（EXPLAIN 不会真正执行查询）
+    其他数据库返回 None
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def is_unfiltered(queryset):
+    """查询集没有任何 WHERE 条件时，行数即为整表行数"""
+    return not queryset.query.where
+
+
+def _count(queryset):
+    """按表规模选择计数方式，返回 (count, is_estimate)"""
+    threshold = get_estimate_threshold()
+    table_rows = estimate_table_rows(queryset.model, queryset.db)
+    # 非 PostgreSQL，或表本身不大：精确计数
+    if table_rows is None or table_rows < threshold:
+        return queryset.count(), False
+    if is_unfiltered(queryset):
+        return table_rows, True
+    # 过滤后预估结果较小：精确计数的代价也小，直接精确计数
+    planned = explain_rows(queryset)
+    if planned is None or planned < threshold:
+        return queryset.count(), False
+    return planned, True
+
+
+def count_cache_key(queryset):
+    """缓存键：模型 + 查询 SQL（由过滤参数决定）+ 内容版本号"""
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(
+        f'{queryset.db}|{sql}|{params!r}'.encode('utf-8')
+    ).hexdigest()
+    return versioned_key('count', queryset.model._meta.label_lower, digest)
+
+
+def estimated_count(queryset):
+    """
+    返回 (count, is_estimate)
+    结果缓存 COUNT_CACHE_TIMEOUT 秒；内容变化（版本号 +1）后自动失效
+    """
+    key = count_cache_key(queryset)
+    cached = cache.get(key)
+    if cached is not None:
+        return tuple(cached)
+    result = _count(queryset)
+    cache.set(key, result, content_cache_timeout(getattr(settings, 'COUNT_CACHE_TIMEOUT', 300)))
+    return result
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    使用估算/缓存计数的分页器
+    - Admin 列表页（ModelAdmin.paginator）
+    - API 分页（core.pagination.EstimatedCountPagination）
+    count_is_estimate 表示 count 是否为估算值
+    """
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            count, self.count_is_estimate = estimated_count(self.object_list)
+            return count
+        return super().count
@@ -0,0 +1,128 @@
+# ============================================================
+# 公共组件 - 分面计数（?facets=）
+# ============================================================
+# 搜索 / 筛选结果旁边显示“Django (14)、React (6)”这样的计数：
+#   GET /api/posts/?search=django&facets=category,tags
+#   GET /api/projects/?facets=tech_stack,status
+# 计数基于当前的过滤条件（搜索词、分类、标签等），与返回的结果一致。
+# 做法：每个分面是一条 GROUP BY 查询，所有分面用 UNION ALL 合并为一条 SQL，
+# 过滤条件作为子查询（id IN (...)）只写一次，一次数据库往返得到全部计数：
+#   SELECT 'category', category_id, 分类名, COUNT(*) ... GROUP BY ...
+#   UNION ALL
+#   SELECT 'tags', tag_id, 标签名, COUNT(*) FROM 文章-标签中间表 ... GROUP BY ...
+# 结果按“过滤后的 SQL + 内容版本号”缓存（与 core/counting.py 相同），内容变化后自动失效。
+#
+# 返回格式（每个分面按数量从多到少）：
+#   "facets": {"category": [{"value": 3, "label": "Django", "count": 14}, ...], ...}
+# 不分页时列表接口原本直接返回数组，请求分面时改为 {"results": [...], "facets": {...}}。
+# ============================================================
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Cast
+
+from .cache import content_cache_timeout, versioned_key
+from .fieldsets import parse_field_list
+
+# 每个分面最多返回的取值数量
+MAX_FACET_VALUES = 100
+
+
+def _grouped(queryset, facet, key, label):
+    """一个分面的 GROUP BY 查询：列为 (facet, key, label, count)，各分面的列类型保持一致以便 UNION"""
+    return queryset.order_by().annotate(
+        facet=Value(facet, output_field=CharField()),
+        key=Cast(key, output_field=CharField()),
+        label=label,
+    ).values('facet', 'key', 'label').annotate(count=Count('*'))
+
+
+def facet_query(queryset, facets):
+    """
+    构造合并后的查询
+    facets：{分面名: 关联模型上用作显示名称的字段}，选项字段（choices）为 None
+    """
+    model = queryset.model
+    ids = queryset.order_by().values('pk')
+    parts = []
+    for name, label_field in facets.items():
+        field = model._meta.get_field(name)
+        if field.many_to_many:
+            # 多对多：直接统计中间表，不需要 JOIN 回主表
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            rows = through.objects.filter(**{f'{source}__in': ids})
+            parts.append(_grouped(rows, name, F(f'{target}_id'), F(f'{target}__{label_field}')))
+        elif field.is_relation:
+            rows = model.objects.filter(pk__in=ids, **{f'{name}__isnull': False})
+            parts.append(_grouped(rows, name, F(field.attname), F(f'{name}__{label_field}')))
+        else:
+            # 选项字段：显示名称在 Python 中根据 choices 补上
+            rows = model.objects.filter(pk__in=ids)
+            parts.append(_grouped(rows, name, F(name), Value('', output_field=CharField())))
+    return parts[0].union(*parts[1:], all=True)
+
+
+def facet_counts(queryset, facets):
+    """返回 {分面名: [{'value', 'label', 'count'}, ...]}"""
+    model = queryset.model
+    result = {name: [] for name in facets}
+    for facet, key, label, count in facet_query(queryset, facets).values_list('facet', 'key', 'label', 'count'):
+        field = model._meta.get_field(facet)
+        if field.is_relation:
+            value = field.target_field.to_python(key)
+        else:
+            value = key
+            label = dict(field.flatchoices).get(key, key)
+        result[facet].append({'value': value, 'label': label, 'count': count})
+    for values in result.values():
+        values.sort(key=lambda item: (-item['count'], str(item['label'])))
+        del values[MAX_FACET_VALUES:]
+    return result
+
+
+def cached_facet_counts(queryset, facets):
+    """facet_counts()，按过滤后的 SQL + 分面 + 内容版本号缓存"""
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(
+        f'{queryset.db}|{sql}|{params!r}|{sorted(facets)}'.encode('utf-8')
+    ).hexdigest()
+    key = versioned_key('facets', queryset.model._meta.label_lower, digest)
+    counts = cache.get(key)
+    if counts is None:
+        counts = facet_counts(queryset, facets)
+        cache.set(key, counts, content_cache_timeout(getattr(settings, 'COUNT_CACHE_TIMEOUT', 300)))
+    return counts
+
+
+class FacetViewMixin:
+    """
+    列表视图混入：?facets=a,b 时在结果旁边返回分面计数
+    子类声明 facet_fields = {'category': 'name', 'tags': 'name'}（选项字段写 None）
+    未在 facet_fields 中声明的名称忽略
+    """
+    facet_fields = {}
+
+    def get_requested_facets(self):
+        requested = parse_field_list(self.request.query_params.get('facets'))
+        if not requested:
+            return {}
+        return {name: label for name, label in self.facet_fields.items() if name in requested}
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        facets = self.get_requested_facets()
+        if not facets:
+            return response
+        # 与结果使用相同的过滤条件（只构造查询集，不会重复查询结果）
+        queryset = self.filter_queryset(self.get_queryset())
+        counts = cached_facet_counts(queryset, facets)
+        if isinstance(response.data, dict):
+            response.data['facets'] = counts
+        else:
+            response.data = {'results': response.data, 'facets': counts}
+        return response
@@ -0,0 +1,218 @@
+# ============================================================
+# 公共组件 - RSS / Atom 订阅与站点地图（sitemap）
+# ============================================================
+# 爬虫和阅读器会频繁抓取这些地址，生成时注意：
+#   - 只读取用到的列（values_list），不读取 content 正文，也不实例化模型对象
+#   - 通过 iterator() 分块读取，边查询边输出（生成器），内存占用与数据量无关
+#   - 单个 sitemap 最多 50000 个 URL（协议限制），超过时 /sitemap.xml 变为索引，
+#     按类型分片：/sitemap-posts-1.xml、/sitemap-posts-2.xml ……
+# 生成的 XML 由视图按内容版本号缓存（见 core/views.py），内容不变时直接返回缓存。
+# 链接指向前端页面（/post/<slug>、/project/<slug> 等，见前端 router.tsx）。
+# ============================================================
+
+import math
+from xml.sax.saxutils import escape, quoteattr
+
+from django.db.models import Max
+from django.utils.encoding import iri_to_uri
+from django.utils.feedgenerator import rfc2822_date, rfc3339_date
+
+from blog.models import Category, Post, Tag
+from project.models import Project
+
+# sitemap 协议规定的单个文件 URL 上限
+SITEMAP_MAX_URLS = 50000
+# 订阅中的文章数量
+FEED_ITEMS = 20
+FEED_TITLE = "雨影's 小站"
+FEED_DESCRIPTION = '最新文章'
+# 输出时把小片段合并到约 64KB 再交给服务器发送
+CHUNK_SIZE = 64 * 1024
+# iterator() 每次从数据库读取的行数
+FETCH_SIZE = 2000
+
+
+def _buffered(pieces, size=CHUNK_SIZE):
+    """把大量小字符串合并为较大的块，减少 WSGI 写入次数"""
+    buffer, length = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _url(base, path):
+    return escape(iri_to_uri(base + path))
+
+
+def latest(*timestamps):
+    """多个时间中最新的一个（忽略 None）"""
+    timestamps = [ts for ts in timestamps if ts is not None]
+    return max(timestamps) if timestamps else None
+
+
+# ======== sitemap ========
+
+class SitemapSection:
+    """
+    sitemap 中的一类页面
+    queryset：公开可见的行；key_field：拼接到 path 中的字段（slug 或 id）
+    """
+
+    def __init__(self, name, queryset, key_field, path):
+        self.name = name
+        self.queryset = queryset
+        self.key_field = key_field
+        self.path = path
+
+    def count(self):
+        return self.queryset.count()
+
+    def pages(self):
+        return max(1, math.ceil(self.count() / SITEMAP_MAX_URLS))
+
+    def last_modified(self):
+        return self.queryset.aggregate(value=Max('updated_at'))['value']
+
+    def urls(self, page=1):
+        """第 page 片的 (path, lastmod)；按主键排序，分片边界稳定"""
+        start = (page - 1) * SITEMAP_MAX_URLS
+        rows = self.queryset.order_by('pk').values_list(
+            self.key_field, 'updated_at'
+        )[start:start + SITEMAP_MAX_URLS]
+        for key, updated_at in rows.iterator(chunk_size=FETCH_SIZE):
+            yield self.path.format(key), updated_at
+
+
+class StaticSection:
+    """前端的固定页面（首页、文章列表、项目列表），lastmod 取最新内容的时间"""
+    name = 'pages'
+    paths = ['/', '/blog', '/projects']
+
+    def count(self):
+        return len(self.paths)
+
+    def pages(self):
+        return 1
+
+    def last_modified(self):
+        return latest(
+            Post.objects.published().aggregate(value=Max('updated_at'))['value'],
+            Project.objects.published().aggregate(value=Max('updated_at'))['value'],
+        )
+
+    def urls(self, page=1):
+        last_modified = self.last_modified()
+        for path in self.paths:
+            yield path, last_modified
+
+
+def sitemap_sections():
+    return [
+        StaticSection(),
+        SitemapSection('posts', Post.objects.published(), 'slug', '/post/{}'),
+        SitemapSection('projects', Project.objects.published(), 'slug', '/project/{}'),
+        SitemapSection('categories', Category.objects.all(), 'pk', '/category/{}'),
+        SitemapSection('tags', Tag.objects.all(), 'pk', '/tag/{}'),
+    ]
+
+
+def render_urlset(base, entries):
+    """<urlset>：entries 为 (path, lastmod) 的可迭代对象"""
+    def pieces():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for path, lastmod in entries:
+            if lastmod is None:
+                yield f'<url><loc>{_url(base, path)}</loc></url>\n'
+            else:
+                yield f'<url><loc>{_url(base, path)}</loc><lastmod>{rfc3339_date(lastmod)}</lastmod></url>\n'
+        yield '</urlset>\n'
+    return _buffered(pieces())
+
+
+def render_sitemap_index(base, shards):
+    """<sitemapindex>：shards 为 (path, lastmod)"""
+    def pieces():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for path, lastmod in shards:
+            yield f'<sitemap><loc>{_url(base, path)}</loc>'
+            if lastmod is not None:
+                yield f'<lastmod>{rfc3339_date(lastmod)}</lastmod>'
+            yield '</sitemap>\n'
+        yield '</sitemapindex>\n'
+    return _buffered(pieces())
+
+
+def sitemap_shards(sections):
+    """索引中列出的全部分片 (path, lastmod)"""
+    for section in sections:
+        last_modified = section.last_modified()
+        for page in range(1, section.pages() + 1):
+            yield f'/sitemap-{section.name}-{page}.xml', last_modified
+
+
+# ======== RSS / Atom ========
+
+def feed_items(limit=FEED_ITEMS):
+    """最新文章，只读取订阅需要的列"""
+    return Post.objects.published().order_by('-created_at').values_list(
+        'title', 'slug', 'summary', 'created_at', 'updated_at',
+        'author__username', 'category__name',
+    )[:limit].iterator(chunk_size=FETCH_SIZE)
+
+
+def render_rss(base, feed_url, items, last_modified):
+    def pieces():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield (
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>\n'
+        )
+        yield f'<title>{escape(FEED_TITLE)}</title><link>{_url(base, "/")}</link>'
+        yield f'<description>{escape(FEED_DESCRIPTION)}</description>'
+        yield f'<atom:link href="{escape(feed_url)}" rel="self" type="application/rss+xml"/>'
+        if last_modified is not None:
+            yield f'<lastBuildDate>{rfc2822_date(last_modified)}</lastBuildDate>'
+        yield '\n'
+        for title, slug, summary, created_at, updated_at, author, category in items:
+            link = _url(base, f'/post/{slug}')
+            yield f'<item><title>{escape(title)}</title><link>{link}</link>'
+            yield f'<guid isPermaLink="true">{link}</guid>'
+            yield f'<description>{escape(summary)}</description>'
+            yield f'<pubDate>{rfc2822_date(created_at)}</pubDate>'
+            yield f'<dc:creator>{escape(author)}</dc:creator>'
+            if category:
+                yield f'<category>{escape(category)}</category>'
+            yield '</item>\n'
+        yield '</channel></rss>\n'
+    return _buffered(pieces())
+
+
+def render_atom(base, feed_url, items, last_modified):
+    def pieces():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+        yield f'<title>{escape(FEED_TITLE)}</title><subtitle>{escape(FEED_DESCRIPTION)}</subtitle>'
+        yield f'<link href="{_url(base, "/")}" rel="alternate"/>'
+        yield f'<link href="{escape(feed_url)}" rel="self"/>'
+        yield f'<id>{_url(base, "/")}</id>'
+        if last_modified is not None:
+            yield f'<updated>{rfc3339_date(last_modified)}</updated>'
+        yield '\n'
+        for title, slug, summary, created_at, updated_at, author, category in items:
+            link = _url(base, f'/post/{slug}')
+            yield f'<entry><title>{escape(title)}</title><link href="{link}" rel="alternate"/>'
+            yield f'<id>{link}</id><published>{rfc3339_date(created_at)}</published>'
+            yield f'<updated>{rfc3339_date(updated_at)}</updated>'
+            yield f'<author><name>{escape(author)}</name></author>'
+            if category:
+                yield f'<category term={quoteattr(category)}/>'
+            yield f'<summary>{escape(summary)}</summary></entry>\n'
+        yield '</feed>\n'
+    return _buffered(pieces())
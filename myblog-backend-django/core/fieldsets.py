@@ -0,0 +1,141 @@
+# ============================================================
+# 公共组件 - 稀疏字段集（?fields= / ?omit=）
+# ============================================================
+# 客户端可以只请求需要的字段：
+#   GET /api/posts/?fields=id,title,slug        只返回这三个字段
+#   GET /api/posts/my-post/?omit=content        不返回正文
+# 查询集会随之调整：
+#   - only() 只读取用到的列（不需要正文时不读取 content 大字段）
+#   - 没有请求 author / category 时不再 select_related（少 JOIN）
+#   - 没有请求 tags / tech_stack 时不再 prefetch_related（少一次查询）
+# 用法：
+#   序列化器继承 SparseFieldsetSerializerMixin
+#   视图继承 SparseFieldsetViewMixin（需放在 generics.XxxAPIView 之前）
+# 序列化器中不能直接对应模型字段的字段（如 SerializerMethodField），
+# 在 Meta.field_dependencies 中声明依赖的模型字段，例如：
+#   field_dependencies = {'cover_image_url': ['cover_image']}
+# ============================================================
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def parse_field_list(value):
+    """'a, b,c' → {'a', 'b', 'c'}；空值返回 None"""
+    if not value:
+        return None
+    names = {name.strip() for name in value.split(',')}
+    names.discard('')
+    return names or None
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    根据 context['sparse_fields'] 裁剪字段
+    只作用于最外层序列化器（嵌套的分类、标签等保持完整）
+    """
+
+    def _is_root(self):
+        parent = self.parent
+        # many=True 时外面还包了一层 ListSerializer
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get('sparse_fields')
+        if selected is None or not self._is_root():
+            return fields
+        return {name: field for name, field in fields.items() if name in selected}
+
+
+def _source_of(name, field):
+    # 未绑定的字段 source 为 None，绑定后默认等于字段名
+    return field.source or name
+
+
+def plan_queryset(queryset, serializer_class, selected):
+    """
+    根据选中的序列化字段调整查询集（only / select_related / prefetch_related）
+    遇到无法确定依赖的字段时返回原查询集（宁可多读，不能少读）
+    """
+    model = queryset.model
+    all_fields = serializer_class().get_fields()
+    dependencies = getattr(serializer_class.Meta, 'field_dependencies', {})
+    only = {model._meta.pk.name}
+    select_related = set()
+    prefetch_related = set()
+
+    for name in selected:
+        if name in dependencies:
+            only.update(dependencies[name])
+            continue
+        field = all_fields[name]
+        source = _source_of(name, field)
+        try:
+            model_field = model._meta.get_field(source.split('.')[0])
+        except FieldDoesNotExist:
+            return queryset
+
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch_related.add(model_field.name)
+        elif model_field.is_relation:
+            # 外键：JOIN 取出关联对象，并只读取嵌套序列化器用到的列
+            select_related.add(model_field.name)
+            only.add(model_field.name)
+            if isinstance(field, serializers.BaseSerializer):
+                for sub_name, sub_field in field.get_fields().items():
+                    sub_source = _source_of(sub_name, sub_field)
+                    try:
+                        model_field.related_model._meta.get_field(sub_source)
+                    except FieldDoesNotExist:
+                        continue
+                    only.add(f'{model_field.name}__{sub_source}')
+        else:
+            only.add(model_field.name)
+
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select_related:
+        queryset = queryset.select_related(*sorted(select_related))
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*sorted(prefetch_related))
+    return queryset.only(*sorted(only))
+
+
+class SparseFieldsetViewMixin:
+    """
+    视图混入：解析 ?fields= / ?omit=，裁剪序列化字段并优化查询集
+    未传入这两个参数时行为与原来完全一致
+    """
+
+    def get_sparse_fields(self):
+        """返回选中的字段名集合；未请求稀疏字段集时返回 None"""
+        if not hasattr(self, '_sparse_fields'):
+            params = self.request.query_params
+            requested = parse_field_list(params.get('fields'))
+            omitted = parse_field_list(params.get('omit'))
+            if requested is None and omitted is None:
+                self._sparse_fields = None
+            else:
+                names = set(self.get_serializer_class()().get_fields())
+                if requested is not None:
+                    names &= requested
+                if omitted is not None:
+                    names -= omitted
+                self._sparse_fields = names
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fields'] = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        # 在 filter_queryset 中调整（而不是 get_queryset）：
+        # 视图自定义 get_queryset() 时也能生效，列表和详情（get_object）都会经过这里
+        queryset = super().filter_queryset(queryset)
+        selected = self.get_sparse_fields()
+        if selected is None:
+            return queryset
+        return plan_queryset(queryset, self.get_serializer_class(), selected)
@@ -0,0 +1,110 @@
+# ============================================================
+# 公共组件 - 多对多多值过滤（?tags=1,2,3&tag_mode=all|any）
+# ============================================================
+# any（命中任意一个）：
+#   .filter(tags__in=[...]) 会 JOIN 中间表，一篇文章命中多个标签时重复出现，还要 DISTINCT。
+#   这里改为中间表上的子查询（中间表的 tag_id 列有索引），主查询不 JOIN、不去重：
+#     id IN (SELECT post_id FROM blog_post_tags WHERE tag_id IN (1, 2, 3))
+# all（同时具有全部）：
+#   一条 GROUP BY ... HAVING 子查询，无论几个标签都只查询一次中间表、主查询不 JOIN：
+#     id IN (SELECT post_id FROM blog_post_tags WHERE tag_id IN (...)
+#            GROUP BY post_id HAVING COUNT(*) = n)
+#   （中间表对 (post_id, tag_id) 有唯一约束，COUNT(*) 就是命中的不同标签数）
+#   代价只与这些标签的文章总数有关，与标签个数无关，查询计划稳定。
+#   没有用“每个标签 JOIN 一次”（.filter(tags=a).filter(tags=b)...）：JOIN 数量随请求参数增长，
+#   超过 PostgreSQL 的 join_collapse_limit（默认 8）后不再自动调整连接顺序，计划好坏取决于参数。
+# 各种写法的实测对比见 `python manage.py benchmark_tag_filter`（blog/management/commands），
+# 其中 chained（逐个 JOIN）、exists（每个标签一个 EXISTS）只用于对比。
+# SQLite、50000 篇文章、500 个标签：all 模式 HAVING 为 40~75ms；JOIN 写法在 2~5 个热门标签时约 35ms，
+# 结果为空的组合可以提前结束（1~10ms）。在生产数据库（PostgreSQL）上换写法之前先用该命令实测。
+# any 模式子查询比 JOIN + DISTINCT 快约 1.5~1.8 倍。
+# ============================================================
+
+import django_filters
+from django.db.models import Count, Exists, OuterRef
+
+MODE_ANY = 'any'
+MODE_ALL = 'all'
+MODE_CHOICES = [(MODE_ANY, '命中任意一个'), (MODE_ALL, '同时具有全部')]
+
+
+def _through(queryset, field_name):
+    field = queryset.model._meta.get_field(field_name)
+    return field.remote_field.through, field.m2m_field_name(), field.m2m_reverse_field_name()
+
+
+def match_any(queryset, field_name, ids):
+    """命中任意一个：id IN (SELECT 主表id FROM 中间表 WHERE 关联id IN (...))"""
+    through, source, target = _through(queryset, field_name)
+    matches = through.objects.filter(**{f'{target}__in': ids}).values(source)
+    return queryset.filter(pk__in=matches)
+
+
+def match_all_having(queryset, field_name, ids):
+    """同时具有全部：中间表 GROUP BY 主表id HAVING COUNT(*) = n"""
+    through, source, target = _through(queryset, field_name)
+    matches = (
+        through.objects.filter(**{f'{target}__in': ids})
+        .values(source)
+        .annotate(matched=Count('*'))
+        .filter(matched=len(ids))
+        .values(source)
+    )
+    return queryset.filter(pk__in=matches)
+
+
+def match_all_joins(queryset, field_name, ids):
+    """同时具有全部：每个 id JOIN 一次中间表（.filter(tags=a).filter(tags=b)...），只用于性能对比"""
+    for pk in ids:
+        queryset = queryset.filter(**{field_name: pk})
+    return queryset
+
+
+def match_all_exists(queryset, field_name, ids):
+    """同时具有全部：每个 id 一个 EXISTS 子查询（中间表唯一索引上的点查），只用于性能对比"""
+    through, source, target = _through(queryset, field_name)
+    for pk in ids:
+        queryset = queryset.filter(Exists(through.objects.filter(**{source: OuterRef('pk'), target: pk})))
+    return queryset
+
+
+def filter_many_to_many(queryset, field_name, ids, mode=MODE_ANY):
+    """按多对多字段的多个 id 过滤（见文件头部说明）"""
+    ids = sorted(set(ids))
+    if not ids:
+        return queryset
+    if mode != MODE_ALL:
+        return match_any(queryset, field_name, ids)
+    return match_all_having(queryset, field_name, ids)
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    """逗号分隔的整数列表：?tags=1,2,3"""
+
+
+class ManyToManyInFilter(NumberInFilter):
+    """
+    多对多字段的多值过滤
+    mode_param：FilterSet 中表示 any / all 的参数名（未传时为 any）
+    """
+
+    def __init__(self, *args, mode_param, **kwargs):
+        self.mode_param = mode_param
+        super().__init__(*args, **kwargs)
+
+    def filter(self, queryset, value):
+        if not value:
+            return queryset
+        mode = self.parent.form.cleaned_data.get(self.mode_param) or MODE_ANY
+        return filter_many_to_many(queryset, self.field_name, value, mode)
+
+
+class MatchModeFilter(django_filters.ChoiceFilter):
+    """any / all 参数本身不过滤，由对应的 ManyToManyInFilter 读取"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('choices', MODE_CHOICES)
+        super().__init__(*args, **kwargs)
+
+    def filter(self, queryset, value):
+        return queryset
@@ -0,0 +1,188 @@
+# ============================================================
+# 公共组件 - 预先序列化的列表项 JSON
+# ============================================================
+# 列表接口每次请求都要从 Post / User / Category / Tag 的行重新拼出同样的字典，
+# 再交给 JSONRenderer 编码；而一篇文章在列表中的样子，只有它自己、它的分类或标签被修改时才会改变。
+# 做法：把列表序列化器对每一行的输出（已经编码好的 JSON 文本）存在该行的 list_json 列：
+#   - 失效：信号在文章 / 项目及其分类、标签、技术栈、作者变化时调用 mark_stale()
+#     （见 blog/signals.py、project/signals.py）：一条 UPDATE 把受影响的行标记为过期
+#     （list_json_version = ''），与修改在同一个事务中完成，不在保存时逐行序列化
+#     （给一个有上千篇文章的分类改名，保存请求里只多一条 UPDATE）
+#   - 重新生成：调度进程（publish_scheduled --loop）每个周期调用 refresh_stale()，
+#     也可以手动执行 `python manage.py rebuild_list_json --stale`；部署后执行一次不带参数的全量重建
+#   - 读取：MaterializedListMixin 只查询 (id, list_json, list_json_version) 三列，
+#     用逗号把各行的 JSON 片段拼成数组，不再为每一行创建模型对象、运行序列化器
+#   - list_json_version 记录生成时序列化器的“版本”（字段列表 + APP_VERSION）：
+#     部署了修改过的序列化器后旧片段自动视为过期。过期或为空的行在请求时照常序列化，
+#     但不写回：GET 请求不写数据库（否则读写分离路由会认为本请求写过，把客户端粘到主库，见 core/routers.py）
+# 与请求有关的内容不能预先存好：封面图片等绝对地址以相对路径保存（序列化时不传 request），
+# 返回前对整个数组做一次替换补上当前请求的协议和域名（absolute_url_fields）。
+# 请求了稀疏字段集（?fields= / ?omit=）时片段中的字段不对，照常序列化。
+# ============================================================
+
+import functools
+import hashlib
+import json
+import os
+import re
+import uuid
+
+from django.db import connections, router, transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+_renderer = JSONRenderer()
+# 被信号标记为过期的行的 list_json_version（有部分索引，调度进程据此查找需要重新生成的行）
+STALE = ''
+
+
+class JSONFragment(str):
+    """已经编码好的 JSON 文本（例如一个数组）；渲染时原样输出，不再编码"""
+
+
+class FragmentJSONRenderer(JSONRenderer):
+    """
+    与 JSONRenderer 相同，另外支持 JSONFragment：
+    数据本身是片段时直接输出；最外层字典中的片段（分页的 results、分面的 results）原样嵌入
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, JSONFragment):
+            return data.encode('utf-8')
+        if not isinstance(data, dict) or not any(isinstance(value, JSONFragment) for value in data.values()):
+            return super().render(data, accepted_media_type, renderer_context)
+        # 先用随机占位符代替片段照常编码，再把占位符（连同两边的引号）替换为片段
+        token = uuid.uuid4().hex
+        fragments = {}
+        replaced = {}
+        for index, (key, value) in enumerate(data.items()):
+            if isinstance(value, JSONFragment):
+                placeholder = f'{token}:{index}'
+                fragments[json.dumps(placeholder).encode('utf-8')] = value.encode('utf-8')
+                value = placeholder
+            replaced[key] = value
+        content = super().render(replaced, accepted_media_type, renderer_context)
+        for placeholder, fragment in fragments.items():
+            content = content.replace(placeholder, fragment, 1)
+        return content
+
+
+@functools.lru_cache(maxsize=None)
+def serializer_version(serializer_class):
+    """序列化器的版本：字段列表变化或部署新版本（APP_VERSION）后改变"""
+    fields = ','.join(serializer_class().get_fields())
+    source = f"{os.getenv('APP_VERSION', '')}|{serializer_class.__module__}.{serializer_class.__qualname__}|{fields}"
+    return hashlib.md5(source.encode('utf-8')).hexdigest()[:16]
+
+
+def render_rows(objects, serializer_class):
+    """逐行序列化并编码，返回 {主键: JSON 文本}；不传 request，绝对地址保存为相对路径"""
+    data = serializer_class(objects, many=True, context={}).data
+    return {obj.pk: _renderer.render(item).decode('utf-8') for obj, item in zip(objects, data)}
+
+
+def store(model, rendered, version):
+    """写入 list_json；用 bulk_update，不触发信号，也不改动 updated_at"""
+    objects = [model(pk=pk, list_json=text, list_json_version=version) for pk, text in rendered.items()]
+    model.objects.bulk_update(objects, ['list_json', 'list_json_version'], batch_size=500)
+
+
+def refresh(queryset, serializer_class, pks=None):
+    """
+    重新生成 queryset 中（pks 不为 None 时只处理这些主键）各行的 list_json，返回处理的行数
+    queryset 需带上序列化器用到的 select_related / prefetch_related
+    """
+    if pks is not None:
+        pks = [pk for pk in pks if pk is not None]
+        if not pks:
+            return 0
+        queryset = queryset.filter(pk__in=pks)
+    objects = list(queryset)
+    if objects:
+        store(queryset.model, render_rows(objects, serializer_class), serializer_version(serializer_class))
+    return len(objects)
+
+
+def mark_stale(queryset):
+    """标记为过期（信号中使用）：一条 UPDATE，不序列化，不触发信号，也不改动 updated_at"""
+    return queryset.update(list_json_version=STALE)
+
+
+def refresh_stale(queryset, serializer_class, batch_size=200):
+    """
+    重新生成被标记为过期的行，返回处理的行数（调度进程、rebuild_list_json --stale 使用）
+    与 core/scheduling.py 相同：每批在一个事务中锁住这些行再生成。
+    生成期间其他事务修改了相关数据，它的 mark_stale() 会等到这批提交之后再执行，
+    行重新被标记为过期，下一个周期再生成，不会留下过时的片段
+    """
+    model = queryset.model
+    database = router.db_for_write(model)
+    # PostgreSQL：SKIP LOCKED 跳过正在被修改的行（下一个周期再处理），多个进程同时运行也不会重复生成
+    skip_locked = connections[database].features.has_select_for_update_skip_locked
+    total = 0
+    while True:
+        with transaction.atomic(using=database):
+            stale = model.objects.using(database).filter(list_json_version=STALE).order_by('pk')
+            if skip_locked:
+                stale = stale.select_for_update(skip_locked=True)
+            pks = list(stale.values_list('pk', flat=True)[:batch_size])
+            refresh(queryset.using(database), serializer_class, pks)
+        total += len(pks)
+        if len(pks) < batch_size:
+            return total
+
+
+class MaterializedListMixin:
+    """
+    列表视图混入：用各行预先存好的 list_json 拼出结果数组
+    放在 FacetViewMixin 之后、SparseFieldsetViewMixin 之前（替换 ListModelMixin.list）
+    absolute_url_fields：片段中以相对路径保存、返回时需要补上协议和域名的字段
+    """
+    renderer_classes = [FragmentJSONRenderer]
+    absolute_url_fields = ()
+
+    def list(self, request, *args, **kwargs):
+        if self.get_sparse_fields() is not None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.select_related(None).prefetch_related(None).values_list(
+            'pk', 'list_json', 'list_json_version'
+        )
+        page = self.paginate_queryset(rows)
+        rows = list(page if page is not None else rows)
+
+        version = serializer_version(self.get_serializer_class())
+        stale = {pk for pk, text, row_version in rows if not text or row_version != version}
+        fresh = self.render_stale(stale) if stale else {}
+        # 过期的行在两次查询之间被删除时没有新片段，跳过
+        texts = (fresh.get(pk) if pk in stale else text for pk, text, _ in rows)
+        content = JSONFragment(self.absolutize('[' + ','.join(text for text in texts if text) + ']'))
+
+        if page is not None:
+            return self.get_paginated_response(content)
+        return Response(content)
+
+    def render_stale(self, pks):
+        """
+        过期或缺失的行：照常序列化，只用于本次响应
+        不写回数据库（由调度进程重新生成，见文件头部说明）
+        """
+        objects = list(self.get_queryset().filter(pk__in=pks))
+        return render_rows(objects, self.get_serializer_class())
+
+    def absolutize(self, content):
+        # 片段是 JSON 文本：字符串内部的引号都被转义为 \"，所以 `"字段名":"/` 只会出现在真正的字段上
+        # 与序列化器中的 request.build_absolute_uri() 结果一致：
+        #   /path → 补上协议和域名；//host/path（省略协议）→ 补上当前请求的协议；完整地址保持不变
+        if not self.absolute_url_fields:
+            return content
+        origin = self.request.build_absolute_uri('/')[:-1]
+        scheme = self.request.scheme
+        for name in self.absolute_url_fields:
+            content = re.sub(
+                f'("{re.escape(name)}":")(//?)',
+                lambda match: match.group(1) + (f'{scheme}://' if match.group(2) == '//' else f'{origin}/'),
+                content,
+            )
+        return content
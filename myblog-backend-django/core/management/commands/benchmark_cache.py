@@ -0,0 +1,126 @@
+# ============================================================
+# 管理命令：缓存后端对比（LocMemCache / FileBasedCache / SharedMemoryCache）
+# ============================================================
+# 用法：
+#   python manage.py benchmark_cache
+#   python manage.py benchmark_cache --workers 4 --seconds 5 --keys 2000
+# 每个后端都在临时目录中新建（不影响 settings.CACHES），分两部分测量：
+#   1. 单进程：小值（约 200 字节）/ 中等值（约 10KB，类似一页 20 篇文章的列表）的 get / set 速度
+#   2. 多进程（模拟 gunicorn worker）：每个进程随机读取 --keys 个键，未命中时“计算”
+#      （--compute-ms 毫秒）并写入缓存；统计总吞吐、命中率和计算次数。
+#      LocMemCache 每个进程各自预热，同一个键要计算 N 次；共享后端只需计算一次
+# ============================================================
+
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from core.shmcache import SharedMemoryCache
+
+SMALL_VALUE = {'id': 1, 'title': 'x' * 160, 'slug': 'benchmark'}
+MEDIUM_VALUE = [
+    dict(SMALL_VALUE, id=index, slug=f'post-{index}', summary=f'{index} ' + 'x' * 400) for index in range(20)
+]
+
+
+def create_backend(name, directory, max_entries):
+    if name == 'locmem':
+        return LocMemCache(f'benchmark-{os.getpid()}', {'OPTIONS': {'MAX_ENTRIES': max_entries}})
+    if name == 'filebased':
+        return FileBasedCache(os.path.join(directory, 'files'), {'OPTIONS': {'MAX_ENTRIES': max_entries}})
+    return SharedMemoryCache(os.path.join(directory, 'shm-cache'), {'OPTIONS': {'SIZE': 64 * 1024 * 1024}})
+
+
+def ops_per_second(func, count):
+    started = time.perf_counter()
+    for index in range(count):
+        func(index)
+    return count / (time.perf_counter() - started)
+
+
+def single_process(name, directory, operations, max_entries):
+    cache = create_backend(name, directory, max_entries)
+    results = {}
+    for label, value in (('小值', SMALL_VALUE), ('中等值', MEDIUM_VALUE)):
+        keys = [f'single:{label}:{index % 500}' for index in range(operations)]
+        results[f'{label} set'] = ops_per_second(lambda index: cache.set(keys[index], value, 300), operations)
+        results[f'{label} get'] = ops_per_second(lambda index: cache.get(keys[index]), operations)
+    cache.clear()
+    return results
+
+
+def worker(name, directory, options, deadline, results):
+    random.seed(os.getpid())
+    cache = create_backend(name, directory, options['keys'] * 2)
+    requests = hits = computed = 0
+    while time.monotonic() < deadline:
+        key = f"page:{random.randrange(options['keys'])}"
+        requests += 1
+        if cache.get(key) is not None:
+            hits += 1
+            continue
+        time.sleep(options['compute_ms'] / 1000)
+        cache.set(key, MEDIUM_VALUE, 300)
+        computed += 1
+    results.put((requests, hits, computed))
+
+
+def multi_process(name, directory, options):
+    # 先在父进程创建一次：共享后端的文件在 fork 前初始化
+    create_backend(name, directory, options['keys'] * 2).clear()
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    deadline = time.monotonic() + options['seconds']
+    processes = [
+        context.Process(target=worker, args=(name, directory, options, deadline, results))
+        for _ in range(options['workers'])
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    requests = sum(item[0] for item in collected)
+    hits = sum(item[1] for item in collected)
+    computed = sum(item[2] for item in collected)
+    return requests / options['seconds'], hits / requests if requests else 0, computed
+
+
+class Command(BaseCommand):
+    help = '对比 LocMemCache、FileBasedCache 与共享内存缓存（core/shmcache.py）的速度和跨进程命中率'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operations', type=int, default=20000, help='单进程测试每项的操作次数')
+        parser.add_argument('--workers', type=int, default=3, help='多进程测试的进程数（gunicorn worker 数）')
+        parser.add_argument('--seconds', type=float, default=5, help='多进程测试每个后端运行的秒数')
+        parser.add_argument('--keys', type=int, default=500, help='多进程测试的键数量')
+        parser.add_argument('--compute-ms', type=float, default=5, help='未命中时模拟的计算耗时（毫秒）')
+
+    def handle(self, *args, **options):
+        backends = ['locmem', 'filebased', 'shared']
+        directory = tempfile.mkdtemp(prefix='benchmark-cache-')
+        try:
+            self.stdout.write(f"单进程（每项 {options['operations']} 次，单位：次/秒）")
+            rows = {name: single_process(name, directory, options['operations'], 1000) for name in backends}
+            columns = list(rows['locmem'])
+            self.stdout.write(f"{'后端':<12}" + ''.join(f'{column:>14}' for column in columns))
+            for name, result in rows.items():
+                self.stdout.write(f'{name:<12}' + ''.join(f'{result[column]:>16.0f}' for column in columns))
+
+            self.stdout.write(
+                f"\n{options['workers']} 个进程，{options['keys']} 个键，"
+                f"未命中时计算 {options['compute_ms']:g} ms，每个后端 {options['seconds']:g} 秒"
+            )
+            self.stdout.write(f"{'后端':<12}{'请求/秒':>10}{'命中率':>9}{'计算次数':>10}")
+            for name in backends:
+                throughput, hit_rate, computed = multi_process(name, directory, options)
+                self.stdout.write(f'{name:<12}{throughput:>12.0f}{hit_rate:>10.1%}{computed:>12}')
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
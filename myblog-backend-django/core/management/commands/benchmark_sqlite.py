@@ -0,0 +1,179 @@
+# ============================================================
+# 管理命令：SQLite 并发读写对比（默认配置 vs 生产模式 PRAGMA）
+# ============================================================
+# 用法：
+#   python manage.py benchmark_sqlite
+#   python manage.py benchmark_sqlite --readers 8 --seconds 10
+# 在临时目录中创建独立的测试数据库（不影响 db.sqlite3），模拟：
+#   - 多个读进程（gunicorn worker）：文章列表（按时间倒序前 20 条）+ 按 slug 查询详情
+#   - 一个写进程（后台编辑）：每次事务插入一篇长文章、修改几篇文章，事务持续一小段时间
+# 分别在默认配置和生产模式（settings.SQLITE_PRAGMAS，未开启时使用与其相同的默认取值）下运行，
+# 输出读请求的吞吐量、延迟（p50 / p99）、失败数，以及写事务数。
+# 读写都直接使用 sqlite3 模块，只测量 SQLite 本身，不包含 Django 的开销。
+# ============================================================
+
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sqlite import pragma_statements
+
+# 与 config/settings.py 中 SQLITE_PRODUCTION=1 时的默认值相同
+PRODUCTION_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -65536,
+    'busy_timeout': 5000,
+    'temp_store': 'memory',
+}
+
+LIST_SQL = 'SELECT id, title, slug, created_at FROM post WHERE is_draft = 0 ORDER BY created_at DESC LIMIT 20'
+DETAIL_SQL = 'SELECT id, title, content FROM post WHERE slug = ?'
+
+
+def connect(path, pragmas):
+    # 与 Django 相同：sqlite3 默认等待锁 5 秒
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    for statement in pragma_statements(pragmas):
+        connection.execute(statement)
+    return connection
+
+
+def create_database(path, rows, pragmas):
+    connection = connect(path, pragmas)
+    connection.executescript('''
+        CREATE TABLE post (
+            id INTEGER PRIMARY KEY, title TEXT, slug TEXT UNIQUE, content TEXT,
+            is_draft INTEGER, created_at REAL
+        );
+        CREATE INDEX post_pub_created ON post (is_draft, created_at);
+    ''')
+    content = 'x' * 4000
+    connection.execute('BEGIN')
+    connection.executemany(
+        'INSERT INTO post (title, slug, content, is_draft, created_at) VALUES (?, ?, ?, 0, ?)',
+        ((f'post {index}', f'post-{index}', content, index) for index in range(rows)),
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+def reader(path, pragmas, rows, deadline, results):
+    random.seed(os.getpid())
+    connection = connect(path, pragmas)
+    latencies, errors = [], 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            connection.execute(LIST_SQL).fetchall()
+            connection.execute(DETAIL_SQL, (f'post-{random.randrange(rows)}',)).fetchall()
+        except sqlite3.OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    results.put(('reader', latencies, errors))
+
+
+def writer(path, pragmas, deadline, interval, hold, immediate, results):
+    connection = connect(path, pragmas)
+    content = 'y' * 20000
+    commits, errors, number = 0, 0, 0
+    while time.monotonic() < deadline:
+        number += 1
+        try:
+            connection.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            connection.execute(
+                'INSERT INTO post (title, slug, content, is_draft, created_at) VALUES (?, ?, ?, 0, ?)',
+                (f'new {number}', f'new-{os.getpid()}-{number}', content, time.time()),
+            )
+            connection.execute(
+                'UPDATE post SET title = title || ? WHERE id IN (SELECT id FROM post ORDER BY random() LIMIT 5)',
+                ('!',),
+            )
+            # 模拟一次后台保存中的多条语句（信号、计数、删除记录等）
+            time.sleep(hold)
+            connection.execute('COMMIT')
+            commits += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+        time.sleep(interval)
+    results.put(('writer', commits, errors))
+
+
+def run_profile(name, pragmas, options):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.sqlite3')
+        create_database(path, options['rows'], pragmas)
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        deadline = time.monotonic() + options['seconds']
+        processes = [
+            context.Process(target=reader, args=(path, pragmas, options['rows'], deadline, results))
+            for _ in range(options['readers'])
+        ]
+        processes.append(context.Process(
+            target=writer,
+            args=(path, pragmas, deadline, options['write_interval'], options['write_hold'],
+                  bool(pragmas), results),
+        ))
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    latencies = [value for kind, values, _ in collected if kind == 'reader' for value in values]
+    latencies.sort()
+    read_errors = sum(errors for kind, _, errors in collected if kind == 'reader')
+    commits, write_errors = next((values, errors) for kind, values, errors in collected if kind == 'writer')
+    return {
+        'name': name,
+        'reads_per_second': len(latencies) / options['seconds'],
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0,
+        'max_ms': latencies[-1] * 1000 if latencies else 0,
+        'read_errors': read_errors,
+        'commits': commits,
+        'write_errors': write_errors,
+    }
+
+
+class Command(BaseCommand):
+    help = '对比 SQLite 默认配置与生产模式 PRAGMA 在后台写入期间的读吞吐和延迟'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='读进程数量')
+        parser.add_argument('--seconds', type=float, default=5, help='每种配置运行的秒数')
+        parser.add_argument('--rows', type=int, default=20000, help='初始文章数量')
+        parser.add_argument('--write-interval', type=float, default=0.05, help='两次写事务之间的间隔（秒）')
+        parser.add_argument('--write-hold', type=float, default=0.02, help='每个写事务持续的时间（秒）')
+
+    def handle(self, *args, **options):
+        profiles = [
+            ('默认配置', {}),
+            ('生产模式', getattr(settings, 'SQLITE_PRAGMAS', None) or PRODUCTION_PRAGMAS),
+        ]
+        self.stdout.write(
+            f"{options['readers']} 个读进程 + 1 个写进程，每种配置 {options['seconds']:g} 秒"
+        )
+        self.stdout.write(
+            f"\n{'配置':<8}{'读/秒':>10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+            f"{'读失败':>7}{'写事务':>7}{'写失败':>7}"
+        )
+        for name, pragmas in profiles:
+            result = run_profile(name, pragmas, options)
+            self.stdout.write(
+                f"{result['name']:<8}{result['reads_per_second']:>10.0f}{result['p50_ms']:>9.2f}"
+                f"{result['p99_ms']:>9.2f}{result['max_ms']:>9.1f}{result['read_errors']:>7}"
+                f"{result['commits']:>7}{result['write_errors']:>7}"
+            )
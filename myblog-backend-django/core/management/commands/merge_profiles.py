@@ -0,0 +1,81 @@
+# ============================================================
+# 管理命令：合并采样性能分析结果（生成火焰图）
+# ============================================================
+# 用法：
+#   python manage.py merge_profiles                                  # 各视图的样本数和最耗时的函数
+#   python manage.py merge_profiles --view PostListView --output posts.folded
+#   flamegraph.pl posts.folded > posts.svg                           # 或拖进 https://www.speedscope.app
+#   python manage.py merge_profiles --clear                          # 合并后删除原始文件
+# 读取 PROFILING_DIR 中所有 worker 写入的 <视图名>.<进程号>.collapsed（见 core/profiling.py），
+# 按视图合并；--output 写出折叠栈（每行：栈 次数），多个视图时每个栈以视图名开头。
+# 摘要中的“自身”是函数位于栈顶（正在执行它自己的代码）的样本比例，“累计”是函数出现在栈中的比例。
+# ============================================================
+
+import glob
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import SUFFIX, read_collapsed, write_collapsed
+
+
+class Command(BaseCommand):
+    help = '合并各 worker 的采样性能分析结果，输出火焰图数据和热点函数'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='结果目录（默认 settings.PROFILING_DIR）')
+        parser.add_argument('--view', default='', help='只合并视图名包含该字符串的结果')
+        parser.add_argument('--output', default='', help='折叠栈输出文件（- 表示标准输出）')
+        parser.add_argument('--top', type=int, default=15, help='摘要中每个视图列出的函数数量')
+        parser.add_argument('--clear', action='store_true', help='合并后删除原始文件')
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.PROFILING_DIR
+        paths = sorted(glob.glob(os.path.join(directory, f'*{SUFFIX}')))
+        views = {}
+        for path in paths:
+            # <视图名>.<进程号>.collapsed；视图名本身包含点号
+            view_name = os.path.basename(path)[:-len(SUFFIX)].rsplit('.', 1)[0]
+            if options['view'] not in view_name:
+                continue
+            views.setdefault(view_name, Counter()).update(read_collapsed(path))
+        if not views:
+            self.stdout.write(f'{directory} 中没有匹配的结果')
+            return
+
+        if options['output']:
+            merged = Counter()
+            for view_name, counts in views.items():
+                prefix = f'{view_name};' if len(views) > 1 else ''
+                for stack, count in counts.items():
+                    merged[prefix + stack] += count
+            if options['output'] == '-':
+                for stack, count in merged.most_common():
+                    self.stdout.write(f'{stack} {count}')
+            else:
+                write_collapsed(options['output'], merged)
+                self.stdout.write(self.style.SUCCESS(f"已写入 {options['output']}（{len(merged)} 个不同的栈）"))
+
+        if options['output'] != '-':
+            for view_name, counts in sorted(views.items(), key=lambda item: -sum(item[1].values())):
+                self.summarize(view_name, counts, options['top'])
+
+        if options['clear']:
+            for path in paths:
+                os.remove(path)
+
+    def summarize(self, view_name, counts, top):
+        total = sum(counts.values())
+        own, cumulative = Counter(), Counter()
+        for stack, count in counts.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            # 递归函数在一个栈中只计一次
+            for frame in set(frames):
+                cumulative[frame] += count
+        self.stdout.write(f'\n{view_name}：{total} 个样本')
+        self.stdout.write(f"{'自身':>8}{'累计':>8}  函数")
+        for frame, count in own.most_common(top):
+            self.stdout.write(f'{count / total:>8.1%}{cumulative[frame] / total:>8.1%}  {frame}')
@@ -0,0 +1,186 @@
+# ============================================================
+# 管理命令：分析 worker 启动时的导入耗时和内存
+# ============================================================
+# 用法：
+#   python manage.py profile_imports                    # 分析 config.wsgi 的启动
+#   python manage.py profile_imports --top 40
+#   python manage.py profile_imports --target-settings config.settings_api
+#   python manage.py profile_imports --compare          # 对比默认配置和 API-only 配置
+# 原理：在子进程中用 `python -X importtime` 导入 config.wsgi（与 gunicorn worker 启动过程相同），
+# 解析每个模块的导入耗时（self：模块自身，cumulative：包含它导入的子模块），
+# 并记录导入总耗时和导入完成后的常驻内存（RSS）。
+# 每次测量都是全新的子进程，结果即 worker 的冷启动成本；--repeat 多次取中位数减少波动。
+# 导入总耗时（几百毫秒）的波动有几十毫秒，比两种配置的实际差异还大：
+# --compare 交替测量两种配置，并输出少导入的模块自身耗时之和作为可靠的对比依据。
+# ============================================================
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 子进程：记录开始标记（之前的是解释器自身的启动导入），导入目标模块，输出耗时和 RSS
+CHILD_SCRIPT = '''
+import importlib, json, resource, sys, time
+sys.stderr.write("--- profile start ---\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - start
+rss_kb = None
+try:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+except OSError:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "rss_kb": rss_kb, "modules": len(sys.modules)}))
+'''
+
+START_MARKER = '--- profile start ---'
+# import time:   self [us] | cumulative | imported package
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+COMPARE_SETTINGS = ('config.settings', 'config.settings_api')
+
+
+def run_child(module, settings_module):
+    """在子进程中导入 module，返回 (结果字典, [(模块, self_us, cumulative_us), ...])"""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT, module],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        raise CommandError(f'导入 {module} 失败（{settings_module}）：\n{process.stderr[-2000:]}')
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+
+    modules = []
+    started = False
+    for line in process.stderr.splitlines():
+        if line == START_MARKER:
+            started = True
+            continue
+        match = IMPORTTIME_RE.match(line)
+        if started and match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return result, modules
+
+
+def summarize(settings_module, runs):
+    """耗时和 RSS 取中位数（同时记录最小、最大耗时），模块明细取最后一次"""
+    seconds = [result['seconds'] for result, _ in runs]
+    return {
+        'settings': settings_module,
+        'seconds': statistics.median(seconds),
+        'min_seconds': min(seconds),
+        'max_seconds': max(seconds),
+        'rss_kb': statistics.median(result['rss_kb'] for result, _ in runs),
+        'modules': runs[-1][1],
+    }
+
+
+def profile(module, settings_module, repeat):
+    """重复测量 repeat 次"""
+    return summarize(settings_module, [run_child(module, settings_module) for _ in range(repeat)])
+
+
+def profile_interleaved(module, settings_modules, repeat):
+    """
+    对比多个配置时交替测量（A B A B ...），而不是先测完 A 再测 B：
+    磁盘缓存预热、机器负载变化等随时间漂移的因素对各配置的影响相同
+    """
+    runs = {name: [] for name in settings_modules}
+    for _ in range(repeat):
+        for name in settings_modules:
+            runs[name].append(run_child(module, name))
+    return [summarize(name, runs[name]) for name in settings_modules]
+
+
+def by_package(modules):
+    """按顶层包汇总 self 耗时：{包名: (self_us, 模块数)}"""
+    totals = defaultdict(lambda: [0, 0])
+    for name, self_us, _ in modules:
+        package = name.split('.')[0]
+        totals[package][0] += self_us
+        totals[package][1] += 1
+    return {package: tuple(value) for package, value in totals.items()}
+
+
+class Command(BaseCommand):
+    help = '分析 worker 启动（导入 config.wsgi）时各模块的导入耗时和内存占用'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='config.wsgi', help='要导入的模块（默认 config.wsgi）')
+        parser.add_argument('--target-settings', help='子进程使用的配置模块（默认与当前相同）')
+        parser.add_argument('--top', type=int, default=25, help='列出耗时最多的前 N 个模块 / 包')
+        parser.add_argument('--repeat', type=int, default=5, help='测量次数，取中位数')
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='对比 config.settings 与 config.settings_api（API-only）',
+        )
+
+    def handle(self, *args, **options):
+        module, top, repeat = options['module'], options['top'], max(1, options['repeat'])
+        if options['compare']:
+            full, api = profile_interleaved(module, COMPARE_SETTINGS, repeat)
+            self.write_summary(full)
+            self.write_summary(api)
+            self.write_comparison(full, api, top)
+            return
+
+        target = options['target_settings'] or settings.SETTINGS_MODULE
+        report = profile(module, target, repeat)
+        self.write_summary(report)
+        self.write_modules(report['modules'], top)
+
+    # ======== 输出 ========
+
+    def write_summary(self, report):
+        self.stdout.write(self.style.SUCCESS(
+            f"[{report['settings']}] 导入耗时 {report['seconds'] * 1000:.1f} ms"
+            f"（{report['min_seconds'] * 1000:.1f} ~ {report['max_seconds'] * 1000:.1f}），"
+            f"RSS {report['rss_kb'] / 1024:.1f} MB，新导入模块 {len(report['modules'])} 个"
+        ))
+
+    def write_modules(self, modules, top):
+        self.stdout.write('\n按模块（self = 模块自身耗时，cumulative = 包含子模块）：')
+        self.stdout.write(f"{'self ms':>9} {'cumul ms':>9}  模块")
+        for name, self_us, cumulative_us in sorted(modules, key=lambda item: -item[1])[:top]:
+            self.stdout.write(f'{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}')
+
+        self.stdout.write('\n按顶层包汇总：')
+        self.stdout.write(f"{'self ms':>9} {'模块数':>6}  包")
+        packages = sorted(by_package(modules).items(), key=lambda item: -item[1][0])
+        for package, (self_us, count) in packages[:top]:
+            self.stdout.write(f'{self_us / 1000:9.1f} {count:6d}  {package}')
+
+    def write_comparison(self, full, api, top):
+        seconds = full['seconds'] - api['seconds']
+        rss = (full['rss_kb'] - api['rss_kb']) / 1024
+        api_names = {name for name, _, _ in api['modules']}
+        skipped = [item for item in full['modules'] if item[0] not in api_names]
+        # 少导入的模块自身耗时之和：不受测量波动影响，是配置差异能节省的导入时间的上限
+        skipped_ms = sum(self_us for _, self_us, _ in skipped) / 1000
+        self.stdout.write(
+            f"\nAPI-only 配置：导入耗时中位数相差 {seconds * 1000:.1f} ms"
+            f"（{seconds / full['seconds']:.0%}），RSS 减少 {rss:.1f} MB，"
+            f"少导入 {len(skipped)} 个模块（自身耗时合计 {skipped_ms:.1f} ms）"
+        )
+        # 两种配置的耗时范围重叠时，中位数之差只是噪声
+        if api['max_seconds'] >= full['min_seconds']:
+            self.stdout.write(self.style.WARNING(
+                '两种配置的导入耗时范围重叠，耗时差异在测量波动之内；请以 RSS 和少导入的模块耗时为准'
+            ))
+        self.stdout.write('\n只在默认配置中导入的包（API-only 不再导入）：')
+        self.stdout.write(f"{'self ms':>9} {'模块数':>6}  包")
+        packages = sorted(by_package(skipped).items(), key=lambda item: -item[1][0])
+        for package, (self_us, count) in packages[:top]:
+            self.stdout.write(f'{self_us / 1000:9.1f} {count:6d}  {package}')
@@ -0,0 +1,31 @@
+# ============================================================
+# 管理命令：清理过期的删除记录
+# ============================================================
+# 用法：
+#   python manage.py prune_tombstones              # 按 SYNC_TOMBSTONE_RETENTION_DAYS 清理
+#   python manage.py prune_tombstones --days 30
+# 游标早于保留期限的客户端会被要求全量重新同步，所以更早的删除记录不再需要。
+# ============================================================
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Tombstone
+from core.sync import retention_horizon
+
+
+class Command(BaseCommand):
+    help = '清理超过保留期限的增量同步删除记录'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='保留天数（默认 SYNC_TOMBSTONE_RETENTION_DAYS）')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None:
+            horizon = timezone.now() - timedelta(days=options['days'])
+        else:
+            horizon = retention_horizon()
+        deleted, _ = Tombstone.objects.filter(created_at__lt=horizon).delete()
+        self.stdout.write(self.style.SUCCESS(f'已清理 {deleted} 条删除记录'))
@@ -0,0 +1,115 @@
+# ============================================================
+# 管理命令：定时发布
+# ============================================================
+# 用法：
+#   python manage.py publish_scheduled            # 执行一次（适合 cron）
+#   python manage.py publish_scheduled --loop     # 常驻循环（docker-compose 的 scheduler 服务）
+# 不依赖 Celery / Redis 等外部组件：
+# 每隔 --interval 秒通过部分索引查找到期内容并分批发布，
+# 发布时 post_save 信号负责缓存失效；有新文章发布时顺带重新计算相关文章
+# （整表重算，常驻运行时最多每 --related-interval 秒一次，失败时记录日志并在之后重试）。
+# 每个周期还会重新生成被信号标记为过期的列表项 JSON（见 core/listjson.py）。
+# ============================================================
+
+import logging
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog import signals as blog_signals
+from blog.models import Post
+from blog.related import compute_related_posts
+from core import purge
+from core.scheduling import publish_due
+from project import signals as project_signals
+from project.models import Project
+
+logger = logging.getLogger(__name__)
+
+
+def publish_post(post):
+    post.is_draft = False
+
+
+def publish_project(project):
+    project.is_published = True
+
+
+class Command(BaseCommand):
+    help = '发布定时发布时间已到的文章和项目'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='常驻运行，每隔 --interval 秒检查一次')
+        parser.add_argument('--interval', type=float, default=30, help='检查间隔（秒）')
+        parser.add_argument('--batch-size', type=int, default=100, help='每批发布的最大数量')
+        parser.add_argument('--no-related', action='store_true', help='发布文章后不重新计算相关文章')
+        parser.add_argument(
+            '--related-interval', type=float, default=600,
+            help='常驻运行时重新计算相关文章的最小间隔（秒），期间发布的文章合并为一次计算',
+        )
+
+    def handle(self, *args, **options):
+        self.running = True
+        # 有新发布的文章、相关文章还没有重新计算；上次计算的时间
+        self.related_pending = False
+        self.related_at = None
+        if not options['loop']:
+            # 单次运行（cron）：命令结束进程就退出，Nginx 缓存的刷新不能交给后台线程
+            purge.refresher.synchronous = True
+            try:
+                self.run_once(options)
+            finally:
+                purge.refresher.synchronous = False
+            return
+        # docker stop 发送 SIGTERM：完成当前批次后退出
+        signal.signal(signal.SIGTERM, self.stop)
+        while True:
+            try:
+                self.run_once(options)
+            except Exception:
+                # 常驻进程不能因为一次失败（数据库暂时不可用等）退出：记录错误，下个周期重试
+                logger.exception('定时发布执行失败')
+            # 长时间运行的进程需要主动清理失效的数据库连接
+            close_old_connections()
+            deadline = time.monotonic() + options['interval']
+            while self.running and time.monotonic() < deadline:
+                time.sleep(min(1.0, options['interval']))
+            if not self.running:
+                return
+
+    def stop(self, signum, frame):
+        self.running = False
+
+    def run_once(self, options):
+        batch_size = options['batch_size']
+        # publish_due 发布时会清空 publish_at（之后改回草稿不会被再次自动发布），所以一并保存
+        posts = publish_due(Post, publish_post, ['is_draft', 'publish_at', 'updated_at'], batch_size)
+        projects = publish_due(Project, publish_project, ['is_published', 'publish_at', 'updated_at'], batch_size)
+        if posts and not options['no_related']:
+            # 新发布的文章需要进入相关文章结果
+            self.related_pending = True
+        if posts or projects:
+            self.stdout.write(f'已发布 {posts} 篇文章、{projects} 个项目')
+        self.update_related(options)
+        # 放在发布之后：本次发布的内容也已被信号标记为过期
+        rendered = blog_signals.refresh_stale_list_json() + project_signals.refresh_stale_list_json()
+        if rendered:
+            self.stdout.write(f'已重新生成 {rendered} 行列表项 JSON')
+
+    def update_related(self, options):
+        """重新计算相关文章：单次运行时立即计算，常驻运行时与上次计算至少间隔 --related-interval 秒"""
+        if not self.related_pending:
+            return
+        now = time.monotonic()
+        if options['loop'] and self.related_at is not None and now - self.related_at < options['related_interval']:
+            return
+        self.related_at = now
+        try:
+            compute_related_posts()
+        except Exception:
+            # 相关文章不影响发布：记录错误，下一次间隔到达后重试
+            logger.exception('重新计算相关文章失败')
+            return
+        self.related_pending = False
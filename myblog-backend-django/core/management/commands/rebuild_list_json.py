@@ -0,0 +1,46 @@
+# ============================================================
+# 管理命令：重新生成列表项 JSON
+# ============================================================
+# 用法：
+#   python manage.py rebuild_list_json              # 文章和项目
+#   python manage.py rebuild_list_json --only post  # 只处理文章
+#   python manage.py rebuild_list_json --stale      # 只处理被信号标记为过期的行
+# 日常由信号标记过期、调度进程（publish_scheduled --loop）重新生成（见 core/listjson.py）；
+# 过期或缺失的行在请求时照常序列化，但不写回数据库。
+# 部署修改过序列化器的新版本、批量导入（loaddata）之后执行一次全量重建，列表请求就不需要逐行序列化。
+# ============================================================
+
+from django.core.management.base import BaseCommand
+
+from blog import models as blog_models
+from blog import signals as blog_signals
+from project import models as project_models
+from project import signals as project_signals
+
+TARGETS = {
+    'post': (blog_models.Post, blog_signals),
+    'project': (project_models.Project, project_signals),
+}
+
+
+class Command(BaseCommand):
+    help = '按当前的列表序列化器重新生成文章 / 项目的 list_json'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=sorted(TARGETS), help='只处理一种对象')
+        parser.add_argument('--batch-size', type=int, default=500, help='每批处理的行数')
+        parser.add_argument('--stale', action='store_true', help='只处理被标记为过期的行')
+
+    def handle(self, *args, **options):
+        names = [options['only']] if options['only'] else list(TARGETS)
+        batch_size = max(1, options['batch_size'])
+        for name in names:
+            model, signals = TARGETS[name]
+            if options['stale']:
+                total = signals.refresh_stale_list_json(batch_size)
+            else:
+                pks = list(model.objects.order_by('pk').values_list('pk', flat=True))
+                for start in range(0, len(pks), batch_size):
+                    signals.refresh_list_json(pk__in=pks[start:start + batch_size])
+                total = len(pks)
+            self.stdout.write(self.style.SUCCESS(f'{name}：已重新生成 {total} 行'))
@@ -0,0 +1,49 @@
+# ============================================================
+# 管理命令：缓存预热
+# ============================================================
+# 用法：
+#   python manage.py warm_caches                                   # 进程内请求（填充共享缓存时最有用）
+#   python manage.py warm_caches --base-url http://localhost:8000  # 通过 HTTP 请求 gunicorn
+#   python manage.py warm_caches --details 20 --concurrency 8 --verbose
+# 预热的地址与顺序见 core/warming.py；详情页不计阅读量。
+# 进程内预热只填充执行命令的这个进程（和共享缓存）；各 worker 自己的进程内缓存
+# 需要 --base-url 或 WARM_CACHES_ON_START=1。
+# ============================================================
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.warming import warm, warm_paths
+
+
+class Command(BaseCommand):
+    help = '按价值顺序请求首页、列表和热门详情页，填充缓存'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--details', type=int, default=None,
+                            help='预热的文章 / 项目详情页数量（默认 WARM_CACHES_DETAILS）')
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='最大并发请求数（默认 WARM_CACHES_CONCURRENCY）')
+        parser.add_argument('--timeout', type=float, default=None, help='总时长上限（秒），超过后不再发起新请求')
+        parser.add_argument('--base-url', default='', help='通过 HTTP 请求该地址（如 http://localhost:8000）')
+        parser.add_argument('--verbose', action='store_true', help='列出每个地址的状态码和耗时')
+
+    def handle(self, *args, **options):
+        paths = warm_paths(options['details'])
+        concurrency = options['concurrency'] or settings.WARM_CACHES_CONCURRENCY
+        started = time.monotonic()
+        results = warm(paths, concurrency, options['timeout'], options['base_url'])
+        elapsed = time.monotonic() - started
+
+        failed = [(path, status) for path, status, _ in results if status != 200]
+        if options['verbose']:
+            for path, status, duration in results:
+                self.stdout.write(f"{status or '-':>5}{duration:>9.1f} ms  {path}")
+        for path, status in failed:
+            self.stderr.write(f"预热失败：{path}（{status or '未执行或出错'}）")
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(
+            f'已预热 {len(results) - len(failed)}/{len(results)} 个地址，并发 {concurrency}，耗时 {elapsed:.1f}s'
+        ))
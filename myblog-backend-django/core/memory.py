@@ -0,0 +1,175 @@
+# ============================================================
+# 公共组件 - worker 内存统计与泄漏排查
+# ============================================================
+# gunicorn worker 长时间运行后 RSS 持续增长（例如不分页的 /api/posts/ 返回大量数据），
+# 需要判断是 QuerySet 结果缓存、序列化器对象还是内存碎片，再决定 max_requests 回收间隔。
+# 这里提供（都是每个 worker 各自的数据，结果中带有进程号）：
+#   - 基础统计：RSS（当前 / 峰值）、已处理的请求数、GC 各代的对象数和回收次数
+#   - tracemalloc 快照（MEMORY_TRACEMALLOC=1 时开启，有一定开销，只在排查时使用）：
+#     按分配位置（文件:行号）汇总当前占用最多的位置，以及与上一次快照相比变化最大的位置。
+#     多次调用后，持续增长的位置就是可疑的泄漏点
+#   - 查看方式：
+#       GET /api/debug/memory/?snapshot=1   staff 用户（见 core/views.py 的 MemoryStatsView）
+#       kill -USR2 <worker 进程号>           把同样的内容写入日志（不要发给 gunicorn 主进程，
+#                                            主进程收到 USR2 会热升级）
+#   - MEMORY_LOG_EVERY > 0 时每处理 N 个请求记录一次 RSS，便于画出“请求数 - RSS”曲线
+# ============================================================
+
+import gc
+import logging
+import os
+import signal
+import sys
+import threading
+import tracemalloc
+
+from django.conf import settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_state = {'requests': 0, 'baseline': None, 'previous': None}
+
+
+def _rss_from_proc():
+    """当前 RSS（字节），只在 Linux 上可用"""
+    try:
+        with open('/proc/self/status', encoding='ascii') as file:
+            for line in file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_stats():
+    peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 上单位是 KB，macOS 上是字节
+        peak = peak if sys.platform == 'darwin' else peak * 1024
+    return {'rss_bytes': _rss_from_proc(), 'peak_rss_bytes': peak}
+
+
+def gc_stats():
+    return {
+        'counts': gc.get_count(),
+        'thresholds': gc.get_threshold(),
+        'generations': gc.get_stats(),
+        'garbage': len(gc.garbage),
+    }
+
+
+def request_finished(sender, **kwargs):
+    """request_finished 信号处理函数：统计请求数，按需记录 RSS"""
+    with _lock:
+        _state['requests'] += 1
+        count = _state['requests']
+    every = getattr(settings, 'MEMORY_LOG_EVERY', 0)
+    if every and count % every == 0:
+        logger.info('worker %s 已处理 %s 个请求，RSS %s 字节', os.getpid(), count, rss_stats()['rss_bytes'])
+
+
+# ======== tracemalloc ========
+
+def start_tracing():
+    """开启 tracemalloc（MEMORY_TRACEMALLOC=1 时在 config/wsgi.py 中调用，只影响 gunicorn worker）"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(getattr(settings, 'MEMORY_TRACEMALLOC_FRAMES', 1))
+    with _lock:
+        _state['baseline'] = _state['previous'] = _filtered_snapshot()
+
+
+def _filtered_snapshot():
+    # 排除 tracemalloc 自身和导入机制的分配
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ])
+
+
+def _format_stat(stat):
+    frame = stat.traceback[0]
+    return {
+        'site': f'{frame.filename}:{frame.lineno}',
+        'size_bytes': stat.size,
+        'count': stat.count,
+    }
+
+
+def _format_diff(stat):
+    return {**_format_stat(stat), 'size_diff_bytes': stat.size_diff, 'count_diff': stat.count_diff}
+
+
+def tracemalloc_report(take_snapshot=False, limit=20):
+    """
+    当前占用最多的分配位置；take_snapshot=True 时再拍一张快照，
+    返回与上一次快照、与启动时快照相比变化最大的位置（按变化量的绝对值排序）
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    report = {'traced_bytes': current, 'traced_peak_bytes': peak}
+    snapshot = _filtered_snapshot()
+    report['top'] = [_format_stat(stat) for stat in snapshot.statistics('lineno')[:limit]]
+    if take_snapshot:
+        with _lock:
+            previous, baseline = _state['previous'], _state['baseline']
+            _state['previous'] = snapshot
+        if previous is not None:
+            report['since_previous'] = [
+                _format_diff(stat) for stat in snapshot.compare_to(previous, 'lineno')[:limit]
+            ]
+        if baseline is not None:
+            report['since_start'] = [
+                _format_diff(stat) for stat in snapshot.compare_to(baseline, 'lineno')[:limit]
+            ]
+    return report
+
+
+def memory_report(take_snapshot=False, limit=20):
+    with _lock:
+        requests = _state['requests']
+    return {
+        'pid': os.getpid(),
+        'requests': requests,
+        **rss_stats(),
+        'gc': gc_stats(),
+        'tracemalloc': tracemalloc_report(take_snapshot, limit),
+    }
+
+
+# ======== 信号：kill -USR2 <worker 进程号> ========
+
+def _dump(signum, frame):
+    # 在信号处理函数中只启动一个线程，避免在任意位置打断的主线程里做大量工作
+    threading.Thread(target=log_report, name='memory-dump', daemon=True).start()
+
+
+def log_report():
+    report = memory_report(take_snapshot=True)
+    logger.warning(
+        'worker %s 内存：RSS %s 字节，峰值 %s 字节，已处理 %s 个请求，GC 计数 %s',
+        report['pid'], report['rss_bytes'], report['peak_rss_bytes'], report['requests'], report['gc']['counts'],
+    )
+    tracing = report['tracemalloc']
+    if tracing:
+        for item in tracing['top'][:10]:
+            logger.warning('占用最多：%s %s 字节', item['site'], item['size_bytes'])
+        for item in tracing.get('since_previous', [])[:10]:
+            logger.warning(
+                '与上次相比变化最大：%s %s 字节（%+d）', item['site'], item['size_bytes'], item['size_diff_bytes'],
+            )
+
+
+def install_signal_handler():
+    # 只能在主线程注册；Windows 没有 SIGUSR2
+    if hasattr(signal, 'SIGUSR2') and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR2, _dump)
@@ -0,0 +1,137 @@
+# ============================================================
+# 公共组件 - 中间件
+# ============================================================
+
+import random
+import sys
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import purge, routers
+from .profiling import profiler
+
+# 客户端写入后设置的 Cookie：有效期内该客户端的读取走主库
+STICKY_COOKIE = 'db_primary'
+# 最近发生过写入的标记（缓存为共享缓存时对所有 worker 生效，见 SHARED_CACHE_PATH）：
+# 后台在 api 域名下保存文章后，前端从另一个域名发起的请求不会带上面的 Cookie，
+# 这个标记让作者保存后马上刷新页面也能看到新内容
+RECENT_WRITE_KEY = 'db:recent_write'
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    按请求决定读主库还是读副本（见 core/routers.py）
+    读副本的条件：
+      - 配置了副本，且为 GET / HEAD / OPTIONS 请求
+      - 视图所在模块属于 DATABASE_REPLICA_VIEW_MODULES，且视图没有声明 replica_reads = False
+      - 客户端没有 STICKY_COOKIE，且最近没有写入
+    会话、用户等认证相关的表由路由固定读主库（ReplicaRouter 的 PRIMARY_APPS）：
+    request.user 是惰性求值的，通常在视图中才第一次查询，这时本请求可能已经决定读副本
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        self.sticky_seconds = getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 5)
+        self.view_modules = tuple(getattr(settings, 'DATABASE_REPLICA_VIEW_MODULES', ()))
+
+    def __call__(self, request):
+        state = routers.RoutingState()
+        token = routers.set_state(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.reset_state(token)
+        if self.replicas and (state.wrote or request.method not in READ_METHODS):
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite='Lax',
+                secure=request.is_secure(),
+            )
+            cache.set(RECENT_WRITE_KEY, True, self.sticky_seconds)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.use_replica(request, view_func):
+            routers.get_state().replica = random.choice(self.replicas)
+        return None
+
+    def use_replica(self, request, view_func):
+        if not self.replicas or request.method not in READ_METHODS:
+            return False
+        # DRF 的 as_view() 在 cls 上保存视图类，Django 的在 view_class 上
+        view = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None) or view_func
+        if not getattr(view, 'replica_reads', view.__module__.startswith(self.view_modules)):
+            return False
+        if STICKY_COOKIE in request.COOKIES:
+            return False
+        # Nginx 缓存的刷新请求（core/purge.py）：内容刚刚提交，副本可能还没同步
+        if purge.REFRESH_HEADER in request.headers:
+            return False
+        return not cache.get(RECENT_WRITE_KEY)
+
+
+class ProxyCacheMiddleware:
+    """
+    通过 X-Accel-Expires 告诉 Nginx 这个响应缓存多久（见 core/purge.py 的 cache_ttl）
+    Nginx 会去掉这个响应头，不会发给浏览器；没有 Nginx 时这个响应头不起作用
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method in ('GET', 'HEAD') and 'X-Accel-Expires' not in response:
+            ttl = purge.cache_ttl(request, response)
+            if ttl is not None:
+                response['X-Accel-Expires'] = str(ttl)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    采样式性能分析（见 core/profiling.py），默认关闭
+    分析的请求：
+      - 视图所在模块属于 PROFILING_VIEW_MODULES，按 PROFILING_SAMPLE_RATE 的比例随机抽取
+      - 或者 staff 用户的请求带有 X-Profile: 1（不受比例和模块限制，用于复现某个慢请求）
+    需要放在 AuthenticationMiddleware 之后（判断 staff 时要用 request.user）
+    """
+
+    header = 'X-Profile'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        self.view_modules = tuple(getattr(settings, 'PROFILING_VIEW_MODULES', ()))
+
+    def __call__(self, request):
+        # 调用栈从这一层往里记录（外层的 gunicorn、其他中间件与视图无关）
+        request._profiling_frame = sys._getframe()
+        request._profiling = False
+        try:
+            return self.get_response(request)
+        finally:
+            if request._profiling:
+                profiler.stop()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None) or view_func
+        if self.should_profile(request, view):
+            request._profiling = True
+            profiler.start(f'{view.__module__}.{view.__qualname__}', request._profiling_frame)
+        return None
+
+    def should_profile(self, request, view):
+        if request.headers.get(self.header) == '1':
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_staff:
+                return True
+        if not self.sample_rate or not view.__module__.startswith(self.view_modules):
+            return False
+        return random.random() < self.sample_rate
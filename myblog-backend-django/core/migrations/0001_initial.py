@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='模型')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='对象ID')),
+                ('slug', models.CharField(blank=True, max_length=200, verbose_name='URL标识')),
+                ('reason', models.CharField(choices=[('deleted', '已删除'), ('unpublished', '已撤回发布')], max_length=20, verbose_name='原因')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='时间')),
+            ],
+            options={
+                'verbose_name': '删除记录',
+                'verbose_name_plural': '删除记录',
+                'indexes': [models.Index(fields=['created_at', 'id'], name='core_tombstone_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# ============================================================
+# 公共组件 - 数据模型
+# ============================================================
+# Tombstone（墓碑记录）：增量同步接口需要告诉客户端“哪些内容不见了”，
+# 但被删除的行已经不在原表里，所以删除 / 撤回发布时在这里留一条记录。
+# 由 blog / project 的信号写入，/api/sync/ 按时间顺序读取（见 core/sync.py）。
+# ============================================================
+
+from django.db import models
+
+
+class Tombstone(models.Model):
+    class Reason(models.TextChoices):
+        DELETED = 'deleted', '已删除'
+        UNPUBLISHED = 'unpublished', '已撤回发布'
+
+    # 模型标识，如 "blog.post"、"project.techstack"
+    model = models.CharField(max_length=100, verbose_name="模型")
+    # 被删除对象的主键
+    object_id = models.PositiveBigIntegerField(verbose_name="对象ID")
+    # 文章 / 项目的 slug（客户端可能以 slug 作为本地键），分类等为空
+    slug = models.CharField(max_length=200, blank=True, verbose_name="URL标识")
+    reason = models.CharField(max_length=20, choices=Reason.choices, verbose_name="原因")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="时间")
+
+    def __str__(self) -> str:
+        return f'{self.model}:{self.object_id} {self.reason}'
+
+    class Meta:
+        verbose_name = "删除记录"
+        verbose_name_plural = "删除记录"
+        indexes = [
+            # 同步接口按 (created_at, id) 做键集分页
+            models.Index(fields=['created_at', 'id'], name='core_tombstone_created_idx'),
+        ]
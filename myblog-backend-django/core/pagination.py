@@ -0,0 +1,44 @@
+# ============================================================
+# 公共组件 - API 分页
+# ============================================================
+# 默认不分页（page_size = None），保持现有前端“直接拿数组”的行为；
+# 客户端传入 ?page_size=20&page=2 时才分页。
+# 总数使用 core.counting 的计数策略（大表估算 + 缓存），分页元数据保持廉价。
+# ============================================================
+
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from .counting import EstimatedCountPaginator
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    分页返回格式：
+    {
+        "count": 1234,
+        "count_is_estimate": false,
+        "next": "...",
+        "previous": "...",
+        "results": [...]
+    }
+    """
+    django_paginator_class = EstimatedCountPaginator
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response({
+            'count': paginator.count,
+            'count_is_estimate': paginator.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {'type': 'boolean'}
+        return response_schema
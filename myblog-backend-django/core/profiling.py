@@ -0,0 +1,152 @@
+# ============================================================
+# 公共组件 - 采样式请求性能分析（生成火焰图的数据）
+# ============================================================
+# 线上接口偶尔变慢时，访问日志只能看到总耗时，看不到时间花在序列化、ORM 还是别处。
+# 这里在进程内用一个后台线程定时“采样”：
+#   - 被选中的请求开始时登记（线程 id、视图名、中间件的栈帧），结束时注销
+#   - 后台线程每隔 PROFILING_INTERVAL_MS 毫秒通过 sys._current_frames() 读取这些线程当前的调用栈，
+#     从中间件往里的部分拼成 “模块:函数;模块:函数;...”，同一个栈出现的次数 +1
+#   - 某个函数出现在越多的样本中，说明它（或它调用的函数）占用的时间越多
+# 与 cProfile 不同，被分析的请求本身不做额外的事情（不跟踪每次函数调用），开销只与采样频率有关。
+# 采样线程要拿到 GIL 才能运行：请求线程执行纯 Python 代码时，默认每 5ms 才让出一次 GIL，
+# 样本会集中在数据库查询等释放 GIL 的地方。因此有请求正在被分析时，
+# 把解释器的线程切换间隔（sys.setswitchinterval）临时调到采样间隔以下，结束后恢复。
+# 结果按视图汇总，定期写入 PROFILING_DIR/<视图名>.<进程号>.collapsed（“折叠栈”格式，每行：栈 次数），
+# 用 `python manage.py merge_profiles` 合并所有 worker 的文件，输出可直接交给
+# flamegraph.pl、speedscope 等工具生成火焰图。
+# 开启方式（见 core/middleware.py 的 ProfilingMiddleware）：
+#   - PROFILING_SAMPLE_RATE > 0：按比例抽取 PROFILING_VIEW_MODULES 中视图的请求
+#   - 管理员请求带上 X-Profile: 1 请求头：这个请求一定会被分析（会话登录的 staff 用户）
+# ============================================================
+
+import atexit
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = '.collapsed'
+# 调用栈最多保留的层数（从中间件往里），避免递归很深时一行过长
+MAX_DEPTH = 200
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+
+
+def collapse(frame, stop):
+    """从 frame 向外走到 stop（不含）为止，返回 “外层;...;内层”"""
+    labels = []
+    while frame is not None and frame is not stop and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+def read_collapsed(path):
+    """读取折叠栈文件，返回 Counter({栈: 次数})"""
+    counts = Counter()
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack and count.isdigit():
+                counts[stack] += int(count)
+    return counts
+
+
+def write_collapsed(path, counts):
+    # 先写临时文件再改名：merge_profiles 不会读到写了一半的文件
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        for stack, count in counts.most_common():
+            file.write(f'{stack} {count}\n')
+    os.replace(temporary, path)
+
+
+class SamplingProfiler:
+    """每个 worker 一个：记录正在被分析的请求，由后台线程定时采样"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}       # 线程 id → (视图名, 中间件栈帧)
+        self._counts = {}       # 视图名 → Counter({栈: 次数})
+        self._dirty = set()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._last_flush = time.monotonic()
+        self._switch_interval = None
+
+    def start(self, view_name, stop_frame):
+        with self._lock:
+            if not self._active:
+                self._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(self._switch_interval, self.interval / 4))
+            self._active[threading.get_ident()] = (view_name, stop_frame)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+            if not self._active:
+                self._wakeup.clear()
+                if self._switch_interval is not None:
+                    sys.setswitchinterval(self._switch_interval)
+                    self._switch_interval = None
+            due = time.monotonic() - self._last_flush >= getattr(settings, 'PROFILING_FLUSH_INTERVAL', 10)
+        if due:
+            self.flush()
+
+    @property
+    def interval(self):
+        return getattr(settings, 'PROFILING_INTERVAL_MS', 5) / 1000
+
+    def _run(self):
+        while True:
+            # 没有需要分析的请求时不采样
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            self.sample()
+
+    def sample(self):
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, (view_name, stop_frame) in self._active.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = collapse(frame, stop_frame)
+                if stack:
+                    self._counts.setdefault(view_name, Counter())[stack] += 1
+                    self._dirty.add(view_name)
+
+    def flush(self):
+        """把有新样本的视图写入 PROFILING_DIR（本进程的文件整体覆盖）"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            pending = {name: Counter(self._counts[name]) for name in self._dirty}
+            self._dirty.clear()
+        if not pending:
+            return
+        directory = settings.PROFILING_DIR
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for view_name, counts in pending.items():
+                write_collapsed(os.path.join(directory, f'{view_name}.{os.getpid()}{SUFFIX}'), counts)
+        except OSError:
+            logger.exception('写入性能分析结果失败：%s', directory)
+
+
+profiler = SamplingProfiler()
+# worker 退出（max_requests 回收、重启）时写入最后一批样本
+atexit.register(profiler.flush)
@@ -0,0 +1,232 @@
+# ============================================================
+# 公共组件 - Nginx API 缓存的精确刷新
+# ============================================================
+# Nginx 对匿名的 /api/ GET 请求做代理缓存（nginx/conf.d/api-cache.inc）：
+#   - 默认只缓存 5 秒（微缓存），热点请求在这 5 秒内不再到达 gunicorn
+#   - 本模块列出的“规范地址”（列表、详情、按分类 / 标签筛选等）由 Django 通过
+#     X-Accel-Expires 响应头指定更长的缓存时间（PROXY_CACHE_TTL，见 core/middleware.py）
+# 长时间缓存之所以安全，是因为内容变化时信号会算出受影响的规范地址，
+# 事务提交后由后台线程逐个请求 Nginx 的内部刷新端口（PROXY_CACHE_REFRESH_URL，不对外开放）。
+# 单次运行的管理命令（如不带 --loop 的 publish_scheduled）在退出时会丢掉后台线程中未完成的刷新，
+# 这类命令设置 refresher.synchronous = True，在提交事务的线程中直接刷新。
+# 该端口对同一个缓存区忽略已有缓存、回源获取最新内容并写回缓存（开源版 Nginx 没有 purge 模块，
+# “刷新”可以达到同样效果，而且刷新之后第一个真实请求也不需要回源）。
+# 只刷新受影响的地址：后台改一篇文章不会清空整个缓存。
+# 未设置 PROXY_CACHE_REFRESH_URL 时不发送刷新请求，也不指定长缓存时间，只有 5 秒微缓存。
+# ============================================================
+
+import logging
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+# 刷新请求的请求头：告诉 Django 这是刷新请求（读主库，见 core/middleware.py）
+REFRESH_HEADER = 'X-Cache-Refresh'
+# 收到第一个地址后稍等片刻再刷新，合并同一次保存触发的多个信号
+BATCH_DELAY = 0.2
+# 404 的详情页（不存在的 slug）最多缓存的秒数
+NOT_FOUND_TTL = 60
+
+# 规范地址：{URL 名称: 允许出现的查询参数}；最多带一个参数，且值为单个整数（或 featured=true）
+CANONICAL = {
+    'post-list': {'category', 'tags'},
+    'post-detail': set(),
+    'post-archive': set(),
+    'category-list': set(),
+    'category-detail': set(),
+    'tag-list': set(),
+    'tag-detail': set(),
+    'project-list': {'featured'},
+    'project-detail': set(),
+    'techstack-list': set(),
+    'home': set(),
+}
+# 详情接口会累加阅读量，缓存命中的请求不会计数，所以单独使用较短的缓存时间
+DETAIL_VIEWS = {'post-detail', 'project-detail'}
+# 不能缓存的接口（每个客户端的游标不同 / 健康检查 / 每个 worker 的内存统计）
+NEVER_CACHE = {'sync', 'health', 'memory-stats'}
+
+
+def is_enabled():
+    return bool(getattr(settings, 'PROXY_CACHE_REFRESH_URL', ''))
+
+
+def _is_canonical_query(url_name, query):
+    if not query:
+        return True
+    if len(query) != 1:
+        return False
+    name, values = next(iter(query.lists()))
+    if name not in CANONICAL[url_name] or len(values) != 1:
+        return False
+    value = values[0]
+    return value == 'true' if name == 'featured' else value.isdigit()
+
+
+def cache_ttl(request, response):
+    """
+    响应应在 Nginx 中缓存的秒数（写入 X-Accel-Expires）
+    None 表示不指定（使用 Nginx 的默认微缓存），0 表示不缓存
+    """
+    match = request.resolver_match
+    if match is None:
+        return None
+    if match.url_name in NEVER_CACHE:
+        return 0
+    if not is_enabled() or match.url_name not in CANONICAL:
+        return None
+    if not _is_canonical_query(match.url_name, request.GET):
+        return None
+    if match.url_name in DETAIL_VIEWS:
+        ttl = getattr(settings, 'PROXY_CACHE_DETAIL_TTL', 5)
+        if response.status_code == 404:
+            return min(ttl, NOT_FOUND_TTL)
+    else:
+        ttl = getattr(settings, 'PROXY_CACHE_TTL', 600)
+    return ttl if response.status_code == 200 else None
+
+
+# ======== 受影响的地址 ========
+
+def _with_query(name, **params):
+    path = reverse(name)
+    return f'{path}?{urlencode(params)}' if params else path
+
+
+def post_urls(slugs=(), category_ids=(), tag_ids=()):
+    """文章变化：列表、首页、归档、分类 / 标签（文章数）、详情，以及按相关分类 / 标签筛选的列表"""
+    urls = {
+        reverse('post-list'), reverse('home'), reverse('post-archive'),
+        reverse('category-list'), reverse('tag-list'),
+    }
+    for slug in slugs:
+        if slug:
+            urls.add(reverse('post-detail', kwargs={'slug': slug}))
+    for pk in category_ids:
+        if pk is not None:
+            urls.add(_with_query('post-list', category=pk))
+    for pk in tag_ids:
+        urls.add(_with_query('post-list', tags=pk))
+    return urls
+
+
+def category_urls(pk, post_slugs=()):
+    """分类变化：分类本身，以及嵌套显示分类名称的文章列表 / 详情"""
+    urls = post_urls(post_slugs, category_ids=[pk])
+    urls.add(reverse('category-detail', kwargs={'pk': pk}))
+    return urls
+
+
+def tag_urls(pk, post_slugs=()):
+    urls = post_urls(post_slugs, tag_ids=[pk])
+    urls.add(reverse('tag-detail', kwargs={'pk': pk}))
+    return urls
+
+
+def project_urls(slugs=()):
+    urls = {
+        reverse('project-list'), _with_query('project-list', featured='true'),
+        reverse('home'), reverse('techstack-list'),
+    }
+    for slug in slugs:
+        if slug:
+            urls.add(reverse('project-detail', kwargs={'slug': slug}))
+    return urls
+
+
+def tech_stack_urls(project_slugs=()):
+    return project_urls(project_slugs)
+
+
+# ======== 刷新 ========
+
+def refresh_origins():
+    """
+    Nginx 的缓存键包含 Origin（CORS 响应头随 Origin 变化），每个地址要按
+    “无 Origin（服务端渲染、curl 等）+ 每个允许的前端域名”分别刷新
+    CORS_ALLOW_ALL_ORIGINS=true（仅开发环境）时其他域名的缓存只能等待过期
+    """
+    return [''] + list(getattr(settings, 'CORS_ALLOWED_ORIGINS', []))
+
+
+class CacheRefresher:
+    """后台线程：依次请求 Nginx 内部刷新端口，让这些地址的缓存更新为最新内容"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        # True：不启动后台线程，submit() 直接刷新完再返回（进程马上就要退出时使用）
+        self.synchronous = False
+
+    def submit(self, urls):
+        if not is_enabled():
+            return
+        if self.synchronous:
+            self.refresh_all(urls)
+            return
+        for url in urls:
+            self._queue.put(url)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='proxy-cache-refresh', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            urls = {self._queue.get()}
+            time.sleep(BATCH_DELAY)
+            while True:
+                try:
+                    urls.add(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.refresh_all(urls)
+
+    def refresh_all(self, urls):
+        for url in sorted(urls):
+            for origin in refresh_origins():
+                self.refresh(url, origin)
+
+    def refresh(self, path, origin=''):
+        base = settings.PROXY_CACHE_REFRESH_URL.rstrip('/')
+        headers = {
+            # Django 只接受 ALLOWED_HOSTS 中的域名
+            'Host': settings.PROXY_CACHE_REFRESH_HOST,
+            # 协议和域名是缓存键的一部分（nginx/conf.d/api-cache.inc），内容（分页链接中的完整地址）
+            # 也要与公开端口上的一致
+            'X-Forwarded-Proto': settings.PROXY_CACHE_REFRESH_SCHEME,
+            REFRESH_HEADER: '1',
+        }
+        if origin:
+            headers['Origin'] = origin
+        request = urllib.request.Request(base + path, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+        except urllib.error.HTTPError as exc:
+            # 404 等也会写入缓存（见 cache_ttl），不算失败
+            if exc.code >= 500:
+                logger.warning('刷新 Nginx 缓存失败：%s（%s）', path, exc.code)
+        except OSError as exc:
+            logger.warning('刷新 Nginx 缓存失败：%s（%s）', path, exc)
+
+
+refresher = CacheRefresher()
+
+
+def refresh_after_commit(urls):
+    """事务提交后刷新这些地址（回滚的修改不会触发刷新）"""
+    if not is_enabled() or not urls:
+        return
+    urls = set(urls)
+    transaction.on_commit(lambda: refresher.submit(urls))
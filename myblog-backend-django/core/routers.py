@@ -0,0 +1,96 @@
+# ============================================================
+# 公共组件 - 读写分离数据库路由
+# ============================================================
+# 配置了只读副本（DATABASE_REPLICA_URLS，见 config/settings.py）时：
+#   - 公开的只读接口（blog.views / project.views 等的 GET 请求）读副本
+#   - 写入、后台管理、管理命令、后台线程一律使用主库（default）
+#   - 读己之写：客户端写入后的 DATABASE_REPLICA_STICKY_SECONDS 秒内读主库，
+#     避免刚保存的内容因为副本延迟“看不到”
+# 是否读副本由 core.middleware.ReplicaRoutingMiddleware 按请求决定，
+# 通过 ContextVar 传给路由；请求之外（命令、线程）没有这个状态，默认走主库。
+# 认证、会话相关的表（PRIMARY_APPS）始终读主库：request.user 是惰性求值的，
+# 常常在视图中（已经决定读副本之后）才第一次查询会话和用户，
+# 刚登录 / 刚修改密码时副本上可能还没有对应的会话或用户记录。
+# 未配置副本时路由始终返回 default，行为与原来完全一致。
+# ============================================================
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+PRIMARY = 'default'
+# 始终读主库的 app：会话、用户与权限、内容类型、后台操作日志
+PRIMARY_APPS = frozenset({'sessions', 'auth', 'contenttypes', 'admin'})
+
+
+@dataclass
+class RoutingState:
+    # 本次请求读取使用的副本别名；None 表示读主库
+    replica: str = None
+    # 本次请求是否发生过写入（写入后剩余的读取改走主库）
+    wrote: bool = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def get_state():
+    return _state.get()
+
+
+def set_state(state):
+    """设置当前请求的路由状态，返回用于 reset_state() 的 token"""
+    return _state.set(state)
+
+
+def reset_state(token):
+    _state.reset(token)
+
+
+def stream_with_state(iterable):
+    """
+    StreamingHttpResponse 的内容在视图返回、中间件退出之后才被迭代，
+    此时路由状态已经重置。用当前请求的状态包装生成器，使流式输出中的查询仍按本请求路由
+    """
+    # 在这里（视图中）立即取得状态；生成器函数体要等到第一次迭代才执行
+    state = _state.get()
+
+    def generate():
+        iterator = iter(iterable)
+        while True:
+            token = _state.set(state)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _state.reset(token)
+            yield chunk
+
+    return generate()
+
+
+class ReplicaRouter:
+    """
+    settings.DATABASE_ROUTERS 中启用
+    副本是主库的完整复制，所以关系检查总是允许，迁移只在主库上执行
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APPS:
+            return PRIMARY
+        state = _state.get()
+        if state is not None and state.replica and not state.wrote:
+            return state.replica
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -0,0 +1,44 @@
+# ============================================================
+# 公共组件 - 定时发布
+# ============================================================
+# 查找“定时发布时间已到”的内容，分批发布。
+# 每批在一个事务中完成：查询一次（走部分索引）→ 逐个 save(update_fields=...)。
+# 使用 save() 而不是 QuerySet.update()，是为了让 post_save 信号照常触发
+# （缓存失效、月度归档计数等都依赖信号），定时发布的数量很小，这点开销可以忽略。
+# 发布的同时清空 publish_at：否则之后在后台把内容改回草稿 / 未发布，
+# 过去的 publish_at 仍然满足“到期”条件，会被调度进程悄悄地再次发布。
+# ============================================================
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+
+def publish_due(model, publish, update_fields, batch_size=100, now=None):
+    """
+    发布 model 中所有到期的内容，返回发布数量
+    - model: 查询集带有 due_for_publishing() 方法的模型（Post / Project）
+    - publish: 修改单个对象发布状态的函数，如 lambda post: setattr(post, 'is_draft', False)
+    - update_fields: 需要保存的字段（publish_at 总会被清空并一起保存）
+    """
+    now = now or timezone.now()
+    update_fields = list(update_fields)
+    if 'publish_at' not in update_fields:
+        update_fields.append('publish_at')
+    # 加锁查询和写入都必须在主库上执行（配置了只读副本时 objects.db 可能指向副本）
+    database = router.db_for_write(model)
+    # PostgreSQL：SKIP LOCKED 允许多个调度进程同时运行而不会重复发布同一条
+    skip_locked = connections[database].features.has_select_for_update_skip_locked
+    total = 0
+    while True:
+        with transaction.atomic(using=database):
+            due = model.objects.using(database).due_for_publishing(now).order_by('publish_at', 'pk')
+            if skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            batch = list(due[:batch_size])
+            for obj in batch:
+                publish(obj)
+                obj.publish_at = None
+                obj.save(update_fields=update_fields)
+        total += len(batch)
+        if len(batch) < batch_size:
+            return total
@@ -0,0 +1,509 @@
+# ============================================================
+# 公共组件 - 多个 worker 共享的内存映射缓存（Django 缓存后端）
+# ============================================================
+# 默认的 LocMemCache 每个 gunicorn worker 一份：
+#   - 同一份数据在每个 worker 里各计算、各存一次（3 个 worker 就是 3 次）
+#   - 内容版本号（core/cache.py）、写入标记（core/middleware.py）只在当前 worker 生效，
+#     后台保存文章后其他 worker 还会返回旧缓存，直到过期
+# 部署中没有 Redis，这里用一个内存映射文件（建议放在 /dev/shm）实现共享缓存：
+# 同一个容器内的所有 worker 映射同一个文件，看到的是同一份数据，不需要额外的服务。
+#
+# 文件布局（大小固定，启动后不再变化）：
+#   文件头 | 尺寸档 1 的所有桶 | 尺寸档 2 的所有桶 | ...
+#   - 按序列化后的大小分档（默认 1KB / 4KB / 16KB / 64KB / 256KB / 1MB 的槽位），
+#     每档按权重分配总大小（列表页、首页聚合等几 KB 到十几 KB 的值最多，分到的空间也最多）
+#   - 每档是一张组相联哈希表：键的哈希决定桶，每个桶有 WAYS 个槽位
+#   - 槽位 = 32 字节槽位头（序号、访问位、哈希、过期时间、长度）+ 键 + 值（pickle）
+#   - 超过最大一档的值不缓存（set 直接忽略，与缓存被淘汰的效果相同）
+# 淘汰：桶满时按 CLOCK 算法（近似 LRU）选择：读取命中时置访问位，
+#   写入时从桶的指针处开始扫描，清除访问位，遇到访问位为 0 的槽位就替换
+# 并发：
+#   - 写入（set / add / incr / delete）：先取进程内的线程锁，再用 fcntl 锁住这个桶（跨进程），
+#     incr / add 在锁内“读取 - 修改 - 写回”，对所有 worker 都是原子的
+#   - 同一个键在每个尺寸档中各对应一个桶。set / delete 只锁可能含有这个键的桶；
+#     add 和 incr 的值换档时按偏移顺序锁住这个键在所有档中的桶（_BucketLocks），
+#     否则两个进程同时把同一个键 add 到不同的档时都会成功
+#   - 读取不加锁（顺序锁 seqlock）：写入前后各把槽位序号 +1（写入期间为奇数），
+#     读取前后序号一致且为偶数才算读到完整的数据，否则重读
+# 注意：
+#   - 文件中的数据在 worker 重启后仍然保留；KEY_PREFIX 使用版本号（见 config/settings.py），
+#     部署新版本后旧数据自然不再命中
+#   - 修改大小或分档后文件会被重新初始化，需要同时重启所有 worker
+# 与 LocMemCache、FileBasedCache 的对比见 `python manage.py benchmark_cache`。
+# ============================================================
+
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+MAGIC = b'MYBLOGSC'
+FILE_HEADER = struct.Struct('<8s16s')
+FILE_HEADER_SIZE = 64
+# 槽位头：序号、访问位、是否使用、键哈希、过期时间（0 表示永不过期）、键长度、值长度
+SLOT_HEADER = struct.Struct('<IBBxxQdII')
+SEQ = struct.Struct('<I')
+REF_OFFSET = 4
+# 桶头：CLOCK 指针
+BUCKET_HEADER_SIZE = 8
+
+DEFAULT_SIZE = 32 * 1024 * 1024
+# {槽位大小: 权重}
+DEFAULT_SIZE_CLASSES = {
+    1024: 15,
+    4 * 1024: 25,
+    16 * 1024: 30,
+    64 * 1024: 15,
+    256 * 1024: 10,
+    1024 * 1024: 5,
+}
+DEFAULT_WAYS = 8
+# 进程内线程锁的数量（按桶取模），线程较多时减少无关桶之间的等待
+THREAD_LOCK_STRIPES = 64
+# 读取时遇到并发写入的最大重试次数，超过后加锁读取
+MAX_READ_RETRIES = 8
+
+
+def _key_hash(key):
+    # 不能用内置 hash()：每个进程的随机种子不同
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+
+class _Region:
+    """一个尺寸档：buckets 个桶，每桶 ways 个 slot_size 字节的槽位"""
+
+    def __init__(self, offset, slot_size, buckets, ways):
+        self.offset = offset
+        self.slot_size = slot_size
+        self.buckets = buckets
+        self.ways = ways
+        self.bucket_size = BUCKET_HEADER_SIZE + ways * slot_size
+        self.capacity = slot_size - SLOT_HEADER.size
+        self.end = offset + buckets * self.bucket_size
+
+    def bucket_offset(self, key_hash):
+        return self.offset + (key_hash % self.buckets) * self.bucket_size
+
+    def slots(self, bucket):
+        start = bucket + BUCKET_HEADER_SIZE
+        return range(start, start + self.ways * self.slot_size, self.slot_size)
+
+
+class _SharedFile:
+    """
+    映射到内存的缓存文件
+    Django 的每个线程各创建一个缓存对象，同一进程内同一路径只打开、映射一次
+    （fcntl 锁属于进程，关闭同一文件的任意一个描述符都会释放这个进程的全部锁）
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path, size, size_classes, ways):
+        key = (path, size, tuple(sorted(size_classes.items())), ways)
+        with cls._instances_lock:
+            shared = cls._instances.get(key)
+            if shared is None:
+                shared = cls._instances[key] = cls(path, size, size_classes, ways)
+            return shared
+
+    def __init__(self, path, size, size_classes, ways):
+        self.regions = []
+        offset = FILE_HEADER_SIZE
+        total_weight = sum(size_classes.values())
+        for slot_size, weight in sorted(size_classes.items()):
+            share = size * weight // total_weight
+            bucket_size = BUCKET_HEADER_SIZE + ways * slot_size
+            region = _Region(offset, slot_size, max(1, share // bucket_size), ways)
+            self.regions.append(region)
+            offset = region.end
+        self.size = offset
+        layout = f'{self.size}:{sorted(size_classes.items())}:{ways}'.encode()
+        self.header = FILE_HEADER.pack(MAGIC, hashlib.blake2b(layout, digest_size=16).digest())
+
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.file_lock(0, exclusive=True)
+        try:
+            if os.fstat(self.fd).st_size != self.size or os.pread(self.fd, FILE_HEADER.size, 0) != self.header:
+                # 新文件或布局变化：清零后写入文件头
+                os.ftruncate(self.fd, 0)
+                os.ftruncate(self.fd, self.size)
+                os.pwrite(self.fd, self.header, 0)
+        finally:
+            self.file_unlock(0)
+        self.mm = mmap.mmap(self.fd, self.size)
+        self.reset_thread_locks()
+        # 在 fork 之前打开（如 wsgi.py 启动时已经读写缓存）：子进程继承映射和描述符，
+        # fcntl 锁按进程区分不受影响；线程锁在 fork 时可能正被其他线程持有，需要重新创建
+        os.register_at_fork(after_in_child=self.reset_thread_locks)
+
+    def reset_thread_locks(self):
+        self.thread_locks = [threading.Lock() for _ in range(THREAD_LOCK_STRIPES)]
+
+    def file_lock(self, offset, exclusive=True):
+        fcntl.lockf(self.fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH, 1, offset)
+
+    def file_unlock(self, offset):
+        fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, offset)
+
+    def region_for(self, length):
+        for region in self.regions:
+            if length <= region.capacity:
+                return region
+        return None
+
+
+class _BucketLock:
+    """锁住一个桶：进程内线程锁 + 桶第一个字节上的 fcntl 锁"""
+
+    def __init__(self, shared, bucket):
+        self.shared = shared
+        self.bucket = bucket
+        self.thread_lock = shared.thread_locks[(bucket // 8) % THREAD_LOCK_STRIPES]
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            self.shared.file_lock(self.bucket)
+        except BaseException:
+            self.thread_lock.release()
+            raise
+
+    def __exit__(self, *exc_info):
+        try:
+            self.shared.file_unlock(self.bucket)
+        finally:
+            self.thread_lock.release()
+
+
+class _BucketLocks:
+    """
+    同时锁住多个桶：线程锁按编号、fcntl 锁按偏移从小到大获取，
+    所有同时锁多个桶的调用方顺序一致，不会互相等待形成死锁
+    （只锁一个桶的 _BucketLock 拿到文件锁后不再等待其他锁，也不会参与死锁）
+    """
+
+    def __init__(self, shared, buckets):
+        self.shared = shared
+        self.buckets = sorted(set(buckets))
+        stripes = sorted({(bucket // 8) % THREAD_LOCK_STRIPES for bucket in self.buckets})
+        self.thread_locks = [shared.thread_locks[stripe] for stripe in stripes]
+
+    def __enter__(self):
+        acquired = []
+        try:
+            for lock in self.thread_locks:
+                lock.acquire()
+                acquired.append(lock)
+            for bucket in self.buckets:
+                self.shared.file_lock(bucket)
+                acquired.append(bucket)
+        except BaseException:
+            self._release(acquired)
+            raise
+
+    def __exit__(self, *exc_info):
+        self._release([*self.thread_locks, *self.buckets])
+
+    def _release(self, acquired):
+        for item in reversed(acquired):
+            if isinstance(item, int):
+                self.shared.file_unlock(item)
+            else:
+                item.release()
+
+
+class SharedMemoryCache(BaseCache):
+    """
+    CACHES 配置示例：
+        'default': {
+            'BACKEND': 'core.shmcache.SharedMemoryCache',
+            'LOCATION': '/dev/shm/myblog-cache',
+            'OPTIONS': {'SIZE': 32 * 1024 * 1024, 'SIZE_CLASSES': {1024: 50, 16384: 50}, 'WAYS': 8},
+        }
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared = _SharedFile.open(
+            location,
+            int(options.get('SIZE', DEFAULT_SIZE)),
+            {int(slot_size): weight for slot_size, weight in options.get('SIZE_CLASSES', DEFAULT_SIZE_CLASSES).items()},
+            int(options.get('WAYS', DEFAULT_WAYS)),
+        )
+
+    # ======== 槽位读写 ========
+
+    def _find(self, region, bucket, key_hash, key):
+        """在桶中查找键（调用方持有桶锁），返回 (槽位偏移, 槽位头) 或 (None, None)"""
+        mm = self._shared.mm
+        for slot in region.slots(bucket):
+            header = SLOT_HEADER.unpack_from(mm, slot)
+            if header[2] and header[3] == key_hash and mm[slot + SLOT_HEADER.size:slot + SLOT_HEADER.size + header[5]] == key:
+                return slot, header
+        return None, None
+
+    def _may_contain(self, region, bucket, key_hash):
+        """
+        不加锁检查桶中是否有这个哈希：不在的尺寸档不需要加锁
+        （每个文件锁是两次系统调用，写入时逐档加锁会比查找本身慢得多）
+        """
+        mm = self._shared.mm
+        for slot in region.slots(bucket):
+            _seq, _ref, used, slot_hash = SLOT_HEADER.unpack_from(mm, slot)[:4]
+            if used and slot_hash == key_hash:
+                return True
+        return False
+
+    def _read(self, key):
+        """不加锁读取：返回 pickle 数据，未命中或已过期返回 None"""
+        key_hash = _key_hash(key)
+        mm = self._shared.mm
+        now = time.time()
+        for region in self._shared.regions:
+            bucket = region.bucket_offset(key_hash)
+            for slot in region.slots(bucket):
+                for _ in range(MAX_READ_RETRIES):
+                    seq, _ref, used, slot_hash, expires, key_len, value_len = SLOT_HEADER.unpack_from(mm, slot)
+                    if seq & 1:
+                        continue
+                    if not used or slot_hash != key_hash:
+                        data = None
+                    else:
+                        start = slot + SLOT_HEADER.size
+                        stored_key = mm[start:start + key_len]
+                        data = mm[start + key_len:start + key_len + value_len]
+                    if SEQ.unpack_from(mm, slot)[0] != seq:
+                        continue
+                    break
+                else:
+                    # 一直在被写入：加锁读这个桶
+                    with _BucketLock(self._shared, bucket):
+                        found, header = self._find(region, bucket, key_hash, key)
+                        if found is None:
+                            break
+                        start = found + SLOT_HEADER.size + header[5]
+                        stored_key, data, expires = key, mm[start:start + header[6]], header[4]
+                if data is None or stored_key != key:
+                    continue
+                if expires and expires <= now:
+                    return None
+                mm[slot + REF_OFFSET] = 1
+                return data
+        return None
+
+    def _remove_locked(self, region, bucket, key_hash, key):
+        slot, _header = self._find(region, bucket, key_hash, key)
+        if slot is None:
+            return False
+        self._write_slot(slot, None)
+        return True
+
+    def _live(self, header, now):
+        return not (header[4] and header[4] <= now)
+
+    def _put_locked(self, region, bucket, key_hash, key, entry, now):
+        """把键写入这个桶（entry 为 None 时删除），调用方持有桶锁"""
+        if entry is None:
+            self._remove_locked(region, bucket, key_hash, key)
+            return
+        slot, _header = self._find(region, bucket, key_hash, key)
+        if slot is None:
+            slot = self._victim(region, bucket, now)
+        self._write_slot(slot, entry)
+
+    def _all_buckets(self, key_hash):
+        """这个键在每个尺寸档中对应的桶：[(尺寸档, 桶偏移)]"""
+        return [(region, region.bucket_offset(key_hash)) for region in self._shared.regions]
+
+    def _victim(self, region, bucket, now):
+        """选择写入的槽位：空槽位 > 过期槽位 > CLOCK 淘汰"""
+        mm = self._shared.mm
+        slots = region.slots(bucket)
+        for slot in slots:
+            _seq, _ref, used, _hash, expires, _key_len, _value_len = SLOT_HEADER.unpack_from(mm, slot)
+            if not used or (expires and expires <= now):
+                return slot
+        hand = mm[bucket] % region.ways
+        while True:
+            slot = slots[hand]
+            hand = (hand + 1) % region.ways
+            if mm[slot + REF_OFFSET]:
+                mm[slot + REF_OFFSET] = 0
+            else:
+                mm[bucket] = hand
+                return slot
+
+    def _write_slot(self, slot, entry):
+        """
+        写入槽位（调用方持有桶锁）；entry 为 None 表示清空
+        不能用 struct.pack_into 直接写入映射：它先把目标区域清零再写入，
+        其他进程不加锁读取（_read、_may_contain）时可能看到 used = 0、哈希为 0 的中间状态。
+        先打包成 bytes 再整体赋值，未变化的字段在写入过程中始终保持原值。
+        """
+        mm = self._shared.mm
+        seq = SEQ.unpack_from(mm, slot)[0]
+        mm[slot:slot + SEQ.size] = SEQ.pack((seq + 1) & 0xFFFFFFFF)
+        if entry is None:
+            mm[slot + 5] = 0
+        else:
+            key_hash, expires, key, data = entry
+            start = slot + SLOT_HEADER.size
+            mm[start:start + len(key)] = key
+            mm[start + len(key):start + len(key) + len(data)] = data
+            mm[slot:start] = SLOT_HEADER.pack(
+                (seq + 1) & 0xFFFFFFFF, 0, 1, key_hash, expires, len(key), len(data)
+            )
+        mm[slot:slot + SEQ.size] = SEQ.pack((seq + 2) & 0xFFFFFFFF)
+
+    def _store(self, key, value, timeout, only_if_missing=False):
+        key_hash = _key_hash(key)
+        data = pickle.dumps(value, self.pickle_protocol)
+        target = self._shared.region_for(len(key) + len(data))
+        expires = self.get_backend_timeout(timeout)
+        expires = 0.0 if expires is None else expires
+        now = time.time()
+        if expires and expires <= now:
+            # 立即过期（timeout=0 等）：不写入，只删除旧值
+            target = None
+        entry = (key_hash, expires, key, data)
+        if only_if_missing:
+            # 不加锁的快速检查：已存在时不需要锁住所有尺寸档
+            if self._read(key) is not None:
+                return False
+            return self._add_locked_all(key_hash, key, entry, target, now)
+        # 同一个键只能存在于一个尺寸档：写入目标档，并删除其他档中的旧值
+        for region, bucket in self._all_buckets(key_hash):
+            if region is not target and not self._may_contain(region, bucket, key_hash):
+                continue
+            with _BucketLock(self._shared, bucket):
+                self._put_locked(region, bucket, key_hash, key, entry if region is target else None, now)
+        return target is not None
+
+    def _add_locked_all(self, key_hash, key, entry, target, now):
+        """
+        add：锁住这个键在所有尺寸档中的桶，再检查、写入
+        只锁目标档时，另一个进程可以同时把同一个键写入别的档（值大小不同），两次 add 都会成功
+        """
+        buckets = self._all_buckets(key_hash)
+        with _BucketLocks(self._shared, [bucket for _, bucket in buckets]):
+            for region, bucket in buckets:
+                slot, header = self._find(region, bucket, key_hash, key)
+                if slot is not None and self._live(header, now):
+                    return False
+            for region, bucket in buckets:
+                self._put_locked(region, bucket, key_hash, key, entry if region is target else None, now)
+        return target is not None
+
+    # ======== Django 缓存接口 ========
+
+    def _encode_key(self, key, version):
+        key = self.make_and_validate_key(key, version=version)
+        return key.encode()
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._store(self._encode_key(key, version), value, timeout, only_if_missing=True)
+
+    def get(self, key, default=None, version=None):
+        data = self._read(self._encode_key(key, version))
+        if data is None:
+            return default
+        return pickle.loads(data)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._store(self._encode_key(key, version), value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._encode_key(key, version)
+        key_hash = _key_hash(key)
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        for region in self._shared.regions:
+            bucket = region.bucket_offset(key_hash)
+            if not self._may_contain(region, bucket, key_hash):
+                continue
+            with _BucketLock(self._shared, bucket):
+                slot, header = self._find(region, bucket, key_hash, key)
+                if slot is None or (header[4] and header[4] <= now):
+                    continue
+                start = slot + SLOT_HEADER.size
+                data = self._shared.mm[start + header[5]:start + header[5] + header[6]]
+                self._write_slot(slot, (key_hash, 0.0 if expires is None else expires, key, data))
+                return True
+        return False
+
+    def delete(self, key, version=None):
+        key = self._encode_key(key, version)
+        key_hash = _key_hash(key)
+        deleted = False
+        for region in self._shared.regions:
+            bucket = region.bucket_offset(key_hash)
+            if not self._may_contain(region, bucket, key_hash):
+                continue
+            with _BucketLock(self._shared, bucket):
+                deleted = self._remove_locked(region, bucket, key_hash, key) or deleted
+        return deleted
+
+    def has_key(self, key, version=None):
+        return self._read(self._encode_key(key, version)) is not None
+
+    def incr(self, key, delta=1, version=None):
+        """在桶锁内读取、修改、写回：多个 worker 同时 incr 也不会丢失"""
+        key = self._encode_key(key, version)
+        key_hash = _key_hash(key)
+        now = time.time()
+        for region, bucket in self._all_buckets(key_hash):
+            if not self._may_contain(region, bucket, key_hash):
+                continue
+            with _BucketLock(self._shared, bucket):
+                slot, header = self._find(region, bucket, key_hash, key)
+                if slot is None or not self._live(header, now):
+                    continue
+                start = slot + SLOT_HEADER.size + header[5]
+                value = pickle.loads(self._shared.mm[start:start + header[6]]) + delta
+                data = pickle.dumps(value, self.pickle_protocol)
+                if len(key) + len(data) <= region.capacity:
+                    self._write_slot(slot, (key_hash, header[4], key, data))
+                    return value
+            # 新值超出这一档（很少见）：锁住所有档后重新读取，写入合适的一档
+            return self._incr_locked_all(key, key_hash, delta)
+        raise ValueError("Key '%s' not found" % key.decode())
+
+    def _incr_locked_all(self, key, key_hash, delta):
+        buckets = self._all_buckets(key_hash)
+        now = time.time()
+        with _BucketLocks(self._shared, [bucket for _, bucket in buckets]):
+            for region, bucket in buckets:
+                slot, header = self._find(region, bucket, key_hash, key)
+                if slot is None or not self._live(header, now):
+                    continue
+                start = slot + SLOT_HEADER.size + header[5]
+                value = pickle.loads(self._shared.mm[start:start + header[6]]) + delta
+                data = pickle.dumps(value, self.pickle_protocol)
+                # 超过最大一档时与 set 相同：不缓存，只删除旧值
+                target = self._shared.region_for(len(key) + len(data))
+                entry = (key_hash, header[4], key, data)
+                for other, other_bucket in buckets:
+                    self._put_locked(other, other_bucket, key_hash, key, entry if other is target else None, now)
+                return value
+        raise ValueError("Key '%s' not found" % key.decode())
+
+    def clear(self):
+        mm = self._shared.mm
+        for region in self._shared.regions:
+            for index in range(region.buckets):
+                bucket = region.offset + index * region.bucket_size
+                with _BucketLock(self._shared, bucket):
+                    for slot in region.slots(bucket):
+                        if mm[slot + 5]:
+                            self._write_slot(slot, None)
@@ -0,0 +1,128 @@
+# ============================================================
+# 公共组件 - 详情页 slug 过滤（不存在的 slug 直接 404）
+# ============================================================
+# 爬虫扫描、失效链接会请求大量不存在的 /api/posts/<slug>/，
+# 每次都要查一次数据库，再走一遍 DRF 的异常处理渲染 404。
+# 做法：每个进程在内存中保存“已发布内容的 slug 集合”，
+#   集合中没有的 slug 直接返回预先生成好的 404 响应，不访问数据库；
+#   集合中有的 slug 照常查询（集合允许“多”：改名后的旧 slug、刚撤回的文章，
+#   只是多查一次数据库，结果仍然正确）。
+# 维护：
+#   - 本进程的保存 / 删除通过信号增量更新（事务提交后）
+#   - 内容版本号变化或距离上次构建超过 SLUG_FILTER_MAX_AGE 秒时，后台线程全量重建
+#   - 集合不是最新的（重建完成之前）不做拦截，全部交给数据库判断
+# 注意：内容版本号保存在 Django 缓存中。多个 worker 使用进程内缓存（默认 LocMem）时，
+# 其他 worker（或 scheduler）新发布的内容要等本进程下一次重建（最多 SLUG_FILTER_MAX_AGE 秒）
+# 才能识别，这期间会被误判为不存在而返回 404；
+# 使用共享缓存（SHARED_CACHE_PATH、Redis 等）时版本号变化会立即被所有 worker 发现。
+# 因此 SLUG_FILTER_MAX_AGE 默认只在设置了 SHARED_CACHE_PATH 时为 60，否则为 0（关闭拦截）。
+# ============================================================
+
+import json
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+
+from .cache import get_content_version
+
+logger = logging.getLogger(__name__)
+
+
+class SlugFilter:
+    """某个模型已发布内容的 slug 集合（模型需要有 published() 查询集方法）"""
+
+    def __init__(self, model_label):
+        self.model_label = model_label
+        # 预先生成的 404 响应内容，与 DRF get_object() 找不到对象时的响应一致
+        object_name = model_label.split('.')[-1]
+        self.not_found_body = json.dumps(
+            {'detail': f'No {object_name} matches the given query.'},
+            ensure_ascii=False, separators=(',', ':'),
+        ).encode('utf-8')
+        self.slugs = frozenset()
+        self.version = None
+        self.built_at = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'SLUG_FILTER_MAX_AGE', 0)
+
+    def rebuild(self):
+        version = get_content_version()
+        model = apps.get_model(self.model_label)
+        slugs = frozenset(model.objects.published().values_list('slug', flat=True).iterator())
+        with self._lock:
+            self.slugs, self.version, self.built_at = slugs, version, time.monotonic()
+        logger.info('%s slug 集合已构建：%d 个', self.model_label, len(slugs))
+
+    def rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception('%s slug 集合构建失败', self.model_label)
+            finally:
+                self._rebuilding = False
+                close_old_connections()
+
+        threading.Thread(target=run, name='slug-filter-rebuild', daemon=True).start()
+
+    def is_fresh(self):
+        if self.built_at is None or self.max_age <= 0:
+            return False
+        return (
+            self.version == get_content_version()
+            and time.monotonic() - self.built_at < self.max_age
+        )
+
+    def definitely_missing(self, slug):
+        """
+        True 表示 slug 一定不存在（可以直接 404）
+        集合不是最新时返回 False 并触发后台重建，本次请求交给数据库判断
+        """
+        if self.max_age <= 0:
+            return False
+        if not self.is_fresh():
+            self.rebuild_in_background()
+            return False
+        return slug not in self.slugs
+
+    # ======== 信号中使用（写时复制，读取无需加锁） ========
+
+    def add(self, slug):
+        with self._lock:
+            self.slugs = self.slugs | {slug}
+
+    def discard(self, slug):
+        with self._lock:
+            self.slugs = self.slugs - {slug}
+
+
+post_slugs = SlugFilter('blog.Post')
+project_slugs = SlugFilter('project.Project')
+
+
+class SlugFilterViewMixin:
+    """
+    详情视图混入：slug 一定不存在时，在 DRF 处理请求之前直接返回 404
+    子类设置 slug_filter = post_slugs 等
+    """
+    slug_filter = None
+
+    def dispatch(self, request, *args, **kwargs):
+        slug = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if self.slug_filter is not None and slug is not None and self.slug_filter.definitely_missing(slug):
+            return HttpResponse(self.slug_filter.not_found_body, status=404, content_type='application/json')
+        return super().dispatch(request, *args, **kwargs)
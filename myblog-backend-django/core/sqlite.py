@@ -0,0 +1,43 @@
+# ============================================================
+# 公共组件 - SQLite 生产模式（连接参数调优）
+# ============================================================
+# 未设置 POSTGRES_DB 时使用 SQLite，不少小型部署就这样直接上线。
+# SQLite 默认配置下：
+#   - 回滚日志模式（journal_mode=DELETE）：后台保存文章提交时会锁住整个数据库，读请求只能等待
+#   - 每次提交都 fsync 两次，页面缓存只有约 2MB，读取需要频繁的小块 I/O
+# 设置 SQLITE_PRODUCTION=1 后，每个新连接建立时（connection_created 信号）执行以下 PRAGMA：
+#   journal_mode=WAL      写入追加到 -wal 文件，读写互不阻塞（读者看到提交前的快照）
+#   synchronous=NORMAL    WAL 模式下只在检查点 fsync，断电最多丢失最近的事务，不会损坏数据库
+#   mmap_size             用内存映射读取数据库文件，减少 read() 系统调用和内存复制
+#   cache_size            每个连接的页面缓存（负数表示 KiB）
+#   busy_timeout          遇到写锁时最多等待的毫秒数，而不是立即报 database is locked
+#   temp_store=MEMORY     排序、GROUP BY 的临时表放在内存中
+# 另外可开启“立即事务”（SQLITE_IMMEDIATE_TRANSACTIONS，见 config/settings.py）：
+# transaction.atomic() 一开始就获取写锁（BEGIN IMMEDIATE），
+# 避免两个事务都“先读后写”时，后升级为写锁的一方不经等待直接报 database is locked。
+# 具体取值见 settings.SQLITE_PRAGMAS；读者吞吐的对比见 `python manage.py benchmark_sqlite`。
+# ============================================================
+
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def pragma_statements(pragmas):
+    """{'journal_mode': 'wal', ...} → ['PRAGMA journal_mode=wal', ...]"""
+    return [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """connection_created 信号处理函数：只处理 SQLite 连接"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(pragmas):
+            cursor.execute(statement)
+    logger.debug('SQLite 连接已应用 PRAGMA：%s', pragmas)
@@ -0,0 +1,232 @@
+# ============================================================
+# 公共组件 - 搜索联想（输入即提示）的内存前缀索引
+# ============================================================
+# /api/search/suggest/?q= 每次按键都会请求，不能每次都查数据库（LIKE 无法走普通索引）。
+# 做法：把文章标题、项目标题、分类名、标签名放进内存中的“后缀数组”：
+#   - 每个条目（entry）保存归一化后的文本（NFKC + casefold，忽略大小写和全角半角）
+#   - 对每个可作为匹配起点的位置（开头、每个单词开头、每个中文字符）记录 (条目, 位置)
+#   - 这些位置按 “文本[位置:]” 排序存放在 array 中，每个只占 8 字节
+# 查询 q 时用 bisect 二分找到第一个 >= q 的后缀，向后扫描所有以 q 开头的后缀即可，
+# 复杂度 O(log n + 结果数)，一次查询在微秒级，不访问数据库。
+#
+# 维护：
+#   - worker 启动时全量构建（config/wsgi.py），失败时在第一次请求时后台构建
+#   - 本进程内的保存 / 删除通过信号增量更新（事务提交后）
+#   - 其他 worker 的修改：发现内容版本号变化时在后台线程全量重建，重建期间继续使用旧索引
+#   - 缓存不共享（默认 LocMem）时看不到其他进程（其他 worker、scheduler）修改的版本号，
+#     因此距离上次构建超过 LOCAL_CONTENT_CACHE_TTL 秒也会重建（与 core/cache.py 的缓存上限一致）
+# 更新采用“写时复制”：先构建新数组再整体替换引用，读请求无需加锁。
+# ============================================================
+
+import logging
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .cache import cache_is_shared, get_content_version
+
+logger = logging.getLogger(__name__)
+
+# 位置编码为 条目序号 << 8 | 偏移：标题最长 200 字符，只索引前 255 个字符
+OFFSET_BITS = 8
+MAX_OFFSET = (1 << OFFSET_BITS) - 1
+# 一次查询最多收集的候选条目数（再从中排序取前 limit 个）
+MAX_CANDIDATES = 50
+
+# 单词开头：开头或非字母数字之后；中文每个字符都可以作为起点
+WORD_START_RE = re.compile(r'(?:^|(?<=\W))\w|[\u4e00-\u9fff]')
+
+# 排序时类型的先后
+KIND_ORDER = {'category': 0, 'tag': 1, 'post': 2, 'project': 3}
+
+
+def normalize(text):
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+class Entry(NamedTuple):
+    kind: str     # post / project / category / tag
+    id: int
+    label: str    # 原始文本（标题或名称），用于显示
+    slug: str     # 文章 / 项目的 slug，分类 / 标签为空
+    text: str     # 归一化后的文本，用于匹配
+
+
+class Snapshot(NamedTuple):
+    # 条目列表：删除后留下 None（序号不变），全量重建时整理
+    entries: list
+    # 条目的查找表：(kind, id) → 序号
+    positions: dict
+    # 按后缀文本排序的 (序号 << 8 | 偏移)
+    suffixes: array
+
+    def key(self, code):
+        entry = self.entries[code >> OFFSET_BITS]
+        return entry.text[code & MAX_OFFSET:] if entry is not None else ''
+
+
+def _starts(text):
+    return [match.start() for match in WORD_START_RE.finditer(text) if match.start() <= MAX_OFFSET]
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 三个结构放在同一个不可变快照中，更新时整体替换：
+        # 读请求只读取一次 self.snapshot，不会拿到“新条目 + 旧数组”这种不一致的组合
+        self.snapshot = Snapshot([], {}, array('Q'))
+        self.version = None
+        self.built_at = None
+        self.ready = False
+        self._rebuilding = False
+
+    # ======== 查询 ========
+
+    def suggest(self, query, limit=8):
+        """返回匹配 query 前缀的条目，标题开头匹配优先，其次按类型、长度排序"""
+        query = normalize(query.strip())
+        if not query:
+            return []
+        snapshot = self.snapshot
+        entries, suffixes, key = snapshot.entries, snapshot.suffixes, snapshot.key
+        found = {}
+        index = bisect_left(suffixes, query, key=key)
+        while index < len(suffixes) and len(found) < MAX_CANDIDATES:
+            code = suffixes[index]
+            index += 1
+            suffix = key(code)
+            if not suffix.startswith(query):
+                break
+            number, offset = code >> OFFSET_BITS, code & MAX_OFFSET
+            found[number] = min(offset, found.get(number, offset))
+
+        ranked = sorted(
+            found.items(),
+            key=lambda item: (
+                item[1] != 0,
+                KIND_ORDER[entries[item[0]].kind],
+                len(entries[item[0]].label),
+            ),
+        )
+        return [entries[number] for number, _ in ranked[:limit]]
+
+    # ======== 全量构建 ========
+
+    def build(self, rows):
+        """rows 为 (kind, id, label, slug) 的可迭代对象"""
+        entries = []
+        codes = []
+        for kind, pk, label, slug in rows:
+            entry = Entry(kind, pk, label, slug or '', normalize(label))
+            number = len(entries)
+            entries.append(entry)
+            codes.extend((number << OFFSET_BITS) | start for start in _starts(entry.text))
+        positions = {(entry.kind, entry.id): number for number, entry in enumerate(entries)}
+        snapshot = Snapshot(entries, positions, array('Q'))
+        codes.sort(key=snapshot.key)
+        snapshot.suffixes.extend(codes)
+        with self._lock:
+            self.snapshot = snapshot
+            self.ready = True
+
+    def rebuild(self):
+        """从数据库全量重建，并记录对应的内容版本号"""
+        version = get_content_version()
+        self.build(load_rows())
+        self.version, self.built_at = version, time.monotonic()
+        logger.info(
+            '搜索联想索引已构建：%d 个条目，%d 个后缀',
+            len(self.snapshot.entries), len(self.snapshot.suffixes),
+        )
+
+    def rebuild_in_background(self):
+        """在后台线程重建（同一时间只有一个重建线程），期间继续使用旧索引"""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception('搜索联想索引构建失败')
+            finally:
+                self._rebuilding = False
+                close_old_connections()
+
+        threading.Thread(target=run, name='suggest-index-rebuild', daemon=True).start()
+
+    def is_fresh(self):
+        if self.built_at is None or self.version != get_content_version():
+            return False
+        if cache_is_shared():
+            return True
+        return time.monotonic() - self.built_at < getattr(settings, 'LOCAL_CONTENT_CACHE_TTL', 60)
+
+    def ensure_fresh(self):
+        """请求中调用：索引不是最新时触发后台重建（只读缓存，不查数据库）"""
+        if not self.is_fresh():
+            self.rebuild_in_background()
+
+    # ======== 增量更新（写时复制） ========
+
+    def upsert(self, kind, pk, label, slug=''):
+        with self._lock:
+            current = self.snapshot
+            entries, positions = list(current.entries), dict(current.positions)
+            old = positions.pop((kind, pk), None)
+            if old is not None:
+                entries[old] = None
+            number = len(entries)
+            entry = Entry(kind, pk, label, slug or '', normalize(label))
+            entries.append(entry)
+            positions[(kind, pk)] = number
+            snapshot = Snapshot(entries, positions, _without(current.suffixes, old))
+            for start in _starts(entry.text):
+                insort(snapshot.suffixes, (number << OFFSET_BITS) | start, key=snapshot.key)
+            self.snapshot = snapshot
+
+    def remove(self, kind, pk):
+        with self._lock:
+            current = self.snapshot
+            positions = dict(current.positions)
+            old = positions.pop((kind, pk), None)
+            if old is None:
+                return
+            entries = list(current.entries)
+            entries[old] = None
+            self.snapshot = Snapshot(entries, positions, _without(current.suffixes, old))
+
+
+def _without(suffixes, number):
+    """返回去掉某个条目所有后缀后的新数组（number 为 None 时只复制）"""
+    if number is None:
+        return array('Q', suffixes)
+    return array('Q', (code for code in suffixes if code >> OFFSET_BITS != number))
+
+
+def load_rows():
+    """从数据库读取需要建立索引的条目（只读取需要的列）"""
+    from blog.models import Category, Post, Tag
+    from project.models import Project
+
+    for pk, title, slug in Post.objects.published().values_list('id', 'title', 'slug').iterator():
+        yield 'post', pk, title, slug
+    for pk, title, slug in Project.objects.published().values_list('id', 'title', 'slug').iterator():
+        yield 'project', pk, title, slug
+    for pk, name in Category.objects.values_list('id', 'name').iterator():
+        yield 'category', pk, name, ''
+    for pk, name in Tag.objects.values_list('id', 'name').iterator():
+        yield 'tag', pk, name, ''
+
+
+# 全局单例
+suggest_index = PrefixIndex()
@@ -0,0 +1,213 @@
+# ============================================================
+# 公共组件 - 增量同步（/api/sync/?since=<cursor>）
+# ============================================================
+# 客户端（前端 SPA、离线阅读镜像）保存上次返回的游标，下次只取之后的变化：
+#   - 新建 / 修改：各表的 updated_at 大于游标的行
+#   - 删除 / 撤回发布：Tombstone 表中的记录（由信号写入）
+# 所有来源按 (时间, 类型, id) 统一排序，游标就是上一页最后一条的这个三元组（键集分页）：
+#   WHERE (updated_at, id) > (游标时间, 游标 id) ORDER BY updated_at, id LIMIT n
+# 每个来源只需在 (updated_at, id) 索引上做一次范围扫描，
+# 开销与变化的数量成正比，与文章总数无关。
+# ============================================================
+
+import base64
+import heapq
+from datetime import timedelta
+from itertools import islice
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import Tombstone
+
+# updated_at 取自 save() 的时刻，早于事务提交的时刻：
+# 如果立刻返回最新的行，游标可能越过一条时间更早、但稍后才提交的记录，客户端就永远拿不到它。
+# 所以只返回 SETTLE_SECONDS 秒之前的变化（客户端最多晚几秒看到修改）
+SETTLE_SECONDS = 2
+
+
+class Cursor(NamedTuple):
+    ts: object
+    kind: str
+    id: int
+
+
+def encode_cursor(cursor):
+    raw = f'{cursor.ts.isoformat()}|{cursor.kind}|{cursor.id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(value):
+    """
+    解析游标；也接受 ISO 时间（?since=2025-10-01T00:00:00Z），表示“该时刻及之后的变化”
+    空值返回 None（从头同步）
+    """
+    if not value:
+        return None
+    try:
+        # 查询字符串中未编码的 "+08:00" 会变成空格
+        ts = parse_datetime(value.replace(' ', '+'))
+        if ts is not None:
+            if timezone.is_naive(ts):
+                ts = timezone.make_aware(ts)
+            return Cursor(ts, '', 0)
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode('utf-8')
+        ts_text, kind, pk = raw.split('|')
+        ts = parse_datetime(ts_text)
+        if ts is None:
+            raise ValueError(ts_text)
+        return Cursor(ts, kind, int(pk))
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError({'since': '无效的同步游标'})
+
+
+class SyncSource:
+    """
+    一个同步来源（一张表）
+    name：响应中的键名；queryset：客户端可见的行；ts_field：排序用的时间字段
+    """
+
+    def __init__(self, name, queryset, serializer_class=None, ts_field='updated_at'):
+        self.name = name
+        self.queryset = queryset
+        self.serializer_class = serializer_class
+        self.ts_field = ts_field
+        self.label = queryset.model._meta.label_lower
+
+    def after(self, cursor):
+        """(ts, name, id) > cursor 的过滤条件"""
+        ts = self.ts_field
+        if self.name < cursor.kind:
+            return Q(**{f'{ts}__gt': cursor.ts})
+        if self.name > cursor.kind:
+            return Q(**{f'{ts}__gte': cursor.ts})
+        return Q(**{f'{ts}__gt': cursor.ts}) | Q(**{ts: cursor.ts, 'pk__gt': cursor.id})
+
+    def keys(self, cursor, until, limit):
+        """只读取 (时间, id)，可以直接由 (updated_at, id) 索引返回"""
+        queryset = self.queryset.filter(**{f'{self.ts_field}__lte': until})
+        if cursor is not None:
+            queryset = queryset.filter(self.after(cursor))
+        rows = queryset.order_by(self.ts_field, 'pk').values_list(self.ts_field, 'pk')[:limit]
+        return [Cursor(ts, self.name, pk) for ts, pk in rows]
+
+
+def retention_horizon():
+    """早于该时间的删除记录可以清理；游标早于该时间的客户端需要全量重新同步"""
+    days = getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 90)
+    return timezone.now() - timedelta(days=days)
+
+
+def collect_changes(sources, cursor, limit, context=None):
+    """
+    返回一页变化：
+    {
+        "<source.name>": [...],   # 新建或修改的对象（序列化后）
+        "deleted": [...],         # 删除 / 撤回发布：{"type", "id", "slug", "reason", "deleted_at"}
+        "cursor": "...",          # 下一次请求的 since
+        "has_more": true/false,   # 为 true 时应立即用新游标继续请求
+        "reset": true/false       # 为 true 时客户端应清空本地数据（游标过旧，删除记录已被清理）
+    }
+    """
+    reset = cursor is not None and cursor.ts < retention_horizon()
+    if reset:
+        cursor = None
+    until = timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+
+    # 第一步：每个来源最多取 limit + 1 个键，归并后截取一页
+    tombstone_source = SyncSource('deleted', Tombstone.objects.all(), ts_field='created_at')
+    streams = [
+        source.keys(cursor, until, limit + 1) for source in [*sources, tombstone_source]
+    ]
+    keys = list(islice(heapq.merge(*streams), limit + 1))
+    has_more = len(keys) > limit
+    keys = keys[:limit]
+
+    # 第二步：只为这一页的键读取完整的行
+    by_name = {source.name: source for source in sources}
+    objects = {}
+    for name, source in by_name.items():
+        ids = [key.id for key in keys if key.kind == name]
+        objects[name] = source.queryset.in_bulk(ids) if ids else {}
+    tombstone_ids = [key.id for key in keys if key.kind == 'deleted']
+    tombstones = Tombstone.objects.in_bulk(tombstone_ids) if tombstone_ids else {}
+
+    # 同一页内同一个对象可能既被修改又被删除（或撤回后重新发布），只保留最后一次变化
+    latest = {}
+    for key in keys:
+        if key.kind == 'deleted':
+            item = tombstones.get(key.id)
+            identity = item and (item.model, item.object_id)
+        else:
+            # 两次查询之间被删除 / 撤回的行：跳过，对应的删除记录会出现在后面的页中
+            item = objects[key.kind].get(key.id)
+            identity = item and (by_name[key.kind].label, item.pk)
+        if item is None:
+            continue
+        latest.pop(identity, None)
+        latest[identity] = (key.kind, item)
+
+    names = {source.label: source.name for source in sources}
+    data = {source.name: [] for source in sources}
+    data['deleted'] = []
+    grouped = {source.name: [] for source in sources}
+    for kind, item in latest.values():
+        if kind == 'deleted':
+            data['deleted'].append({
+                'type': names.get(item.model, item.model),
+                'id': item.object_id,
+                'slug': item.slug,
+                'reason': item.reason,
+                'deleted_at': item.created_at,
+            })
+        else:
+            grouped[kind].append(item)
+    for name, items in grouped.items():
+        if items:
+            data[name] = by_name[name].serializer_class(items, many=True, context=context).data
+
+    if keys:
+        next_cursor = encode_cursor(keys[-1])
+    else:
+        next_cursor = encode_cursor(cursor) if cursor is not None else None
+    data.update(cursor=next_cursor, has_more=has_more, reset=reset)
+    return data
+
+
+# ======== 信号中使用的辅助函数 ========
+
+def record_tombstone(instance, reason=Tombstone.Reason.DELETED):
+    """记录一条删除 / 撤回发布（与删除操作处于同一个事务中）"""
+    Tombstone.objects.create(
+        model=instance._meta.label_lower,
+        object_id=instance.pk,
+        slug=getattr(instance, 'slug', '') or '',
+        reason=reason,
+    )
+
+
+def touch(model, pks):
+    """
+    更新 updated_at，使对象出现在下一次同步中
+    用于多对多关系变化（如文章增删标签）：这类修改不会调用 save()，auto_now 不会生效
+    """
+    if pks:
+        model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+def touch_m2m(instance, action, reverse, model, pk_set):
+    """
+    m2m_changed 信号的处理：更新“持有”多对多字段一侧的对象（如文章）的 updated_at
+    正向（post.tags.add(...)）更新 instance；反向（tag.post_set.add(...)）更新 pk_set 中的对象
+    """
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        touch(type(instance), [instance.pk])
+    elif pk_set:
+        # 反向 clear() 不提供 pk_set，这种情况很少见（删除标签会单独记录删除记录）
+        touch(model, pk_set)
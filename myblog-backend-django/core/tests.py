@@ -0,0 +1,747 @@
+import functools
+import json
+import multiprocessing
+import os
+import base64
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Category, Post, Tag
+
+from . import coalesce, counters, purge, routers, suggest, sync, throttling
+from .listjson import FragmentJSONRenderer, JSONFragment
+from .shmcache import SharedMemoryCache, _key_hash
+from .slugs import SlugFilter
+from .suggest import PrefixIndex
+from .counters import ViewCounterBuffer
+
+
+def create_post(slug='post', **fields):
+    author = User.objects.get_or_create(username='author')[0]
+    return Post.objects.create(
+        title=slug, slug=slug, summary='', content='', author=author, is_draft=False, **fields
+    )
+
+
+class ViewCounterBufferTests(TestCase):
+    """阅读量计数缓冲：core/counters.py"""
+
+    def setUp(self):
+        self.post = create_post()
+        self.buffer = ViewCounterBuffer()
+        # 视为本进程的刷新线程已经启动：测试中手动调用 flush()，不启动后台线程
+        self.buffer._pid = os.getpid()
+
+    def views(self):
+        return Post.objects.values_list('views', flat=True).get(pk=self.post.pk)
+
+    @override_settings(VIEW_COUNTER_SPOOL_DIR='')
+    def test_flush_writes_accumulated_increments(self):
+        for _ in range(3):
+            self.buffer.increment(self.post)
+        other = create_post('other')
+        self.buffer.increment(other, amount=2)
+
+        self.assertEqual(self.views(), 0)
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.views(), 3)
+        self.assertEqual(Post.objects.get(pk=other.pk).views, 2)
+        # 已写入的增量不会再写一次
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.views(), 3)
+
+    @override_settings(VIEW_COUNTER_SPOOL_DIR='')
+    def test_failed_flush_keeps_increments(self):
+        self.buffer.increment(self.post)
+        with mock.patch.object(counters, 'write_deltas', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.buffer.flush()
+        # 失败期间的新访问与放回的增量合并
+        self.buffer.increment(self.post)
+        self.buffer.flush()
+        self.assertEqual(self.views(), 2)
+
+    def test_spool_merges_files_and_removes_them(self):
+        with tempfile.TemporaryDirectory() as spool_dir, override_settings(VIEW_COUNTER_SPOOL_DIR=spool_dir):
+            # 另一个 worker 留下的增量文件
+            Path(spool_dir, '1-1.json').write_text(json.dumps([['blog.post', self.post.pk, 4]]))
+            self.buffer.increment(self.post)
+            self.assertEqual(self.buffer.flush(), 1)
+            self.assertEqual(self.views(), 5)
+            self.assertEqual(list(Path(spool_dir).glob('*.json')), [])
+
+    def test_spool_recovers_after_failed_write(self):
+        with tempfile.TemporaryDirectory() as spool_dir, override_settings(VIEW_COUNTER_SPOOL_DIR=spool_dir):
+            self.buffer.increment(self.post, amount=3)
+            with mock.patch.object(counters, 'write_deltas', side_effect=RuntimeError):
+                with self.assertRaises(RuntimeError):
+                    self.buffer.flush()
+            # 写库失败：增量文件留在目录中，内存中的缓冲已清空
+            self.assertEqual(len(list(Path(spool_dir).glob('*.json'))), 1)
+            self.assertEqual(self.views(), 0)
+
+            # 下一个周期（可能是另一个 worker）合并遗留的文件，只写入一次
+            self.assertEqual(ViewCounterBuffer().flush(), 1)
+            self.assertEqual(self.views(), 3)
+            self.assertEqual(self.buffer.flush(), 0)
+            self.assertEqual(self.views(), 3)
+
+
+class CounterFieldsAdminTests(TestCase):
+    """后台保存不覆盖计数缓冲写入的阅读量：core/admin.py"""
+
+    def test_admin_save_keeps_flushed_views(self):
+        post = create_post()
+        model_admin = admin.site._registry[Post]
+        self.assertIn('views', model_admin.get_readonly_fields(None, post))
+
+        # 编辑页打开之后，计数缓冲写入了新的阅读量
+        counters.write_deltas({('blog.post', post.pk): 7})
+        post.title = '新标题'
+        model_admin.save_model(None, post, None, change=True)
+
+        post.refresh_from_db()
+        self.assertEqual(post.title, '新标题')
+        self.assertEqual(post.views, 7)
+
+
+class HomeViewTests(TestCase):
+    """首页聚合接口的 ETag：/api/home/"""
+
+    def setUp(self):
+        cache.clear()
+        self.post = create_post()
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get('/api/home/').headers['ETag']
+        response = self.client.get('/api/home/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_with_content(self):
+        etag = self.client.get('/api/home/').headers['ETag']
+        # 另一个进程修改了内容：本进程的版本号没有变化，缓存过期后重新生成
+        Post.objects.filter(pk=self.post.pk).update(title='新标题')
+        cache.clear()
+        response = self.client.get('/api/home/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+
+class CachedXMLViewTests(TestCase):
+    """订阅、站点地图的缓存时间：core/views.py CachedXMLView"""
+
+    def setUp(self):
+        cache.clear()
+        create_post()
+
+    def cache_timeouts(self):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            b''.join(self.client.get('/sitemap.xml').streaming_content)
+        return [call.args[2] for call in cache_set.call_args_list if ':xml:' in call.args[0]]
+
+    @override_settings(LOCAL_CONTENT_CACHE_TTL=60)
+    def test_per_process_cache_uses_short_timeout(self):
+        self.assertEqual(self.cache_timeouts(), [60, 60])
+
+    def test_shared_cache_keeps_long_timeout(self):
+        with mock.patch('core.views.content_cache_timeout', side_effect=lambda timeout: timeout):
+            self.assertEqual(set(self.cache_timeouts()), {60 * 60 * 24})
+
+
+# 测试中立即返回刚发生的变化
+@mock.patch.object(sync, 'SETTLE_SECONDS', 0)
+class SyncViewTests(TestCase):
+    """增量同步：/api/sync/（core/sync.py）"""
+
+    def sync(self, since=None, **params):
+        if since is not None:
+            params['since'] = since
+        response = self.client.get('/api/sync/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_tombstones_for_deleted_and_unpublished_posts(self):
+        deleted = create_post('deleted')
+        unpublished = create_post('unpublished')
+        cursor = self.sync()['cursor']
+
+        deleted.delete()
+        unpublished.is_draft = True
+        unpublished.save()
+
+        data = self.sync(cursor)
+        self.assertEqual(data['posts'], [])
+        self.assertEqual(
+            sorted((item['type'], item['slug'], item['reason']) for item in data['deleted']),
+            [('posts', 'deleted', 'deleted'), ('posts', 'unpublished', 'unpublished')],
+        )
+
+    def test_tombstone_replaces_change_in_same_page(self):
+        post = create_post()
+        post.delete()
+        data = self.sync()
+        # 同一页里先修改后删除：只返回删除记录
+        self.assertEqual(data['posts'], [])
+        self.assertEqual([item['slug'] for item in data['deleted']], ['post'])
+
+    def test_cursor_continues_across_equal_timestamps(self):
+        for index in range(5):
+            create_post(f'post-{index}')
+        # 所有文章的 updated_at 相同：游标需要靠 id 区分同一时刻的行
+        Post.objects.update(updated_at=timezone.now())
+
+        seen = []
+        cursor = None
+        for _ in range(5):
+            data = self.sync(cursor, limit=2)
+            seen += [item['slug'] for item in data['posts']]
+            cursor = data['cursor']
+            if not data['has_more']:
+                break
+        self.assertEqual(sorted(seen), [f'post-{index}' for index in range(5)])
+        # 同步完成后再请求：没有新的变化，游标保持不变
+        data = self.sync(cursor)
+        self.assertEqual(data['posts'], [])
+        self.assertEqual(data['cursor'], cursor)
+
+    def test_invalid_cursor_returns_400(self):
+        for value in [
+            'not a cursor',
+            base64.urlsafe_b64encode(b'missing|fields').decode(),
+            base64.urlsafe_b64encode(b'yesterday|posts|1').decode(),
+            base64.urlsafe_b64encode(b'2025-10-01T00:00:00+00:00|posts|x').decode(),
+        ]:
+            with self.subTest(value=value):
+                response = self.client.get('/api/sync/', {'since': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('since', response.json())
+
+
+class ReplicaRouterTests(TestCase):
+    """读写分离路由：core/routers.py"""
+
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        token = routers.set_state(routers.RoutingState(replica='replica'))
+        self.addCleanup(routers.reset_state, token)
+
+    def test_content_reads_use_replica(self):
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+
+    def test_auth_and_session_reads_stay_on_primary(self):
+        # request.user 惰性求值：在已经决定读副本的视图中才查询会话和用户
+        for model in (User, Session):
+            with self.subTest(model=model):
+                self.assertEqual(self.router.db_for_read(model), routers.PRIMARY)
+
+    def test_reads_after_write_use_primary(self):
+        self.router.db_for_write(Post)
+        self.assertEqual(self.router.db_for_read(Post), routers.PRIMARY)
+
+
+class SparseFieldsetTests(TestCase):
+    """稀疏字段集：core/fieldsets.py"""
+
+    LIST_FIELDS = {'id', 'title', 'slug', 'summary', 'created_at', 'author', 'category', 'tags'}
+
+    def setUp(self):
+        cache.clear()
+        post = create_post(category=Category.objects.create(name='Django', description='框架'))
+        post.tags.add(Tag.objects.create(name='python'))
+
+    def get(self, path, params, fields=None):
+        with CaptureQueriesContext(connection) as queries, mock.patch.object(counters.view_counter, 'increment'):
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        sql = [query['sql'] for query in queries.captured_queries if 'blog_' in query['sql']]
+        return response.json(), sql
+
+    def list_items(self, params):
+        data, sql = self.get('/api/posts/', {'page_size': 50, **params})
+        return data['results'], sql
+
+    def test_fields_limits_keys_and_columns(self):
+        items, sql = self.list_items({'fields': 'id,title'})
+        self.assertEqual(items, [{'id': items[0]['id'], 'title': 'post'}])
+        # 不读取其他列，不 JOIN 分类，不预取标签
+        self.assertFalse(any('"summary"' in query or 'blog_category' in query for query in sql))
+        self.assertFalse(any('blog_post_tags' in query for query in sql))
+
+    def test_omit_on_detail(self):
+        data, sql = self.get('/api/posts/post/', {'omit': 'content,tags'})
+        self.assertNotIn('content', data)
+        self.assertNotIn('tags', data)
+        self.assertIn('summary', data)
+        post_queries = [query for query in sql if 'FROM "blog_post"' in query]
+        self.assertFalse(any('"blog_post"."content"' in query for query in post_queries))
+        self.assertFalse(any('blog_post_tags' in query for query in sql))
+
+    def test_nested_and_related_fields_stay_complete(self):
+        items, sql = self.list_items({'fields': 'id,category,tags'})
+        self.assertEqual(set(items[0]), {'id', 'category', 'tags'})
+        # 只裁剪最外层，嵌套的分类 / 标签保持完整
+        self.assertEqual(items[0]['category'], {'id': items[0]['category']['id'], 'name': 'Django', 'description': '框架'})
+        self.assertEqual([tag['name'] for tag in items[0]['tags']], ['python'])
+        self.assertTrue(any('JOIN "blog_category"' in query for query in sql))
+        self.assertTrue(any('blog_post_tags' in query for query in sql))
+
+    def test_unknown_fields_are_ignored(self):
+        items, _sql = self.list_items({'fields': 'id,missing'})
+        self.assertEqual(set(items[0]), {'id'})
+        items, _sql = self.list_items({'omit': 'missing'})
+        self.assertEqual(set(items[0]), self.LIST_FIELDS)
+        # 全部是未知字段：返回空对象，不报错
+        items, _sql = self.list_items({'fields': 'missing'})
+        self.assertEqual(items, [{}])
+
+    def test_full_response_without_params(self):
+        items, _sql = self.list_items({})
+        self.assertEqual(set(items[0]), self.LIST_FIELDS)
+
+
+class FragmentJSONRendererTests(SimpleTestCase):
+    """预先编码的 JSON 片段：core/listjson.py"""
+
+    def render(self, data):
+        return FragmentJSONRenderer().render(data).decode('utf-8')
+
+    def test_fragment_is_output_as_is(self):
+        self.assertEqual(self.render(JSONFragment('[{"id":1}]')), '[{"id":1}]')
+
+    def test_fragments_replace_placeholders(self):
+        data = {
+            'count': 2,
+            # 与片段内容相同的普通字符串仍按字符串编码
+            'note': '[{"id":1}]',
+            'results': JSONFragment('[{"id":1},{"id":2}]'),
+            'facets': JSONFragment('{"tags":[]}'),
+        }
+        self.assertEqual(json.loads(self.render(data)), {
+            'count': 2, 'note': '[{"id":1}]', 'results': [{'id': 1}, {'id': 2}], 'facets': {'tags': []},
+        })
+
+    def test_plain_data_uses_json_renderer(self):
+        self.assertEqual(json.loads(self.render({'a': [1, '中文']})), {'a': [1, '中文']})
+
+
+class CoalescedListTests(TestCase):
+    """并发请求合并：core/coalesce.py"""
+
+    def test_concurrent_calls_share_one_result(self):
+        flights = coalesce.SingleFlight()
+        waiting = threading.Event()
+
+        class Done(threading.Event):
+            def wait(self, timeout=None):
+                # 第二个请求开始等待 leader 时通知 leader 继续
+                waiting.set()
+                return super().wait(timeout)
+
+        class Call(coalesce._Call):
+            def __init__(self):
+                super().__init__()
+                self.done = Done()
+
+        calls = []
+
+        def work():
+            calls.append(1)
+            waiting.wait(5)
+            return len(calls)
+
+        results = []
+        with mock.patch.object(coalesce, '_Call', Call):
+            threads = [threading.Thread(target=lambda: results.append(flights.do('key', work))) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(results, [1, 1])
+        self.assertEqual(len(calls), 1)
+
+    @override_settings(ALLOWED_HOSTS=['a.example.com', 'b.example.com'])
+    def test_key_includes_scheme_and_host(self):
+        keys = []
+
+        def do(key, func):
+            keys.append(key)
+            return func()
+
+        with mock.patch.object(coalesce.flights, 'do', side_effect=do):
+            self.client.get('/api/posts/', HTTP_HOST='a.example.com')
+            self.client.get('/api/posts/', HTTP_HOST='b.example.com')
+            self.client.get('/api/posts/', HTTP_HOST='a.example.com', secure=True)
+        self.assertEqual(
+            [key[1:3] for key in keys],
+            [('http', 'a.example.com'), ('http', 'b.example.com'), ('https', 'a.example.com')],
+        )
+
+
+@override_settings(
+    PROXY_CACHE_REFRESH_URL='http://proxy:8081', PROXY_CACHE_TTL=600, PROXY_CACHE_DETAIL_TTL=5,
+    PROXY_CACHE_REFRESH_HOST='api.example.com', PROXY_CACHE_REFRESH_SCHEME='https',
+    CORS_ALLOWED_ORIGINS=['https://www.example.com'],
+)
+class ProxyCacheTests(TestCase):
+    """Nginx API 缓存刷新：core/purge.py"""
+
+    def setUp(self):
+        cache.clear()
+        create_post()
+
+    def accel_expires(self, path, data=None):
+        return self.client.get(path, data).headers.get('X-Accel-Expires')
+
+    def test_cache_ttl_for_canonical_urls(self):
+        self.assertEqual(self.accel_expires('/api/posts/'), '600')
+        category = Category.objects.create(name='Django')
+        self.assertEqual(self.accel_expires('/api/posts/', {'category': category.pk}), '600')
+        # 详情页会累加阅读量：不写入全局计数缓冲（进程退出时测试数据库已经删除）
+        with mock.patch.object(counters.view_counter, 'increment'):
+            self.assertEqual(self.accel_expires('/api/posts/post/'), '5')
+        self.assertEqual(self.accel_expires('/api/sync/'), '0')
+        # 非规范地址（任意查询参数）不会被刷新：只使用 Nginx 的默认微缓存
+        self.assertIsNone(self.accel_expires('/api/posts/', {'search': 'django'}))
+        self.assertIsNone(self.accel_expires('/api/posts/', {'category': 'x'}))
+
+    @override_settings(PROXY_CACHE_REFRESH_URL='')
+    def test_no_long_ttl_without_refresh_url(self):
+        self.assertIsNone(self.accel_expires('/api/posts/'))
+        self.assertEqual(self.accel_expires('/api/sync/'), '0')
+
+    def test_post_urls(self):
+        urls = purge.post_urls(['slug'], category_ids=[1, None], tag_ids=[2])
+        self.assertLessEqual(
+            {'/api/posts/', '/api/home/', '/api/posts/slug/', '/api/posts/?category=1', '/api/posts/?tags=2'},
+            urls,
+        )
+
+    def test_refresh_waits_for_commit(self):
+        with mock.patch.object(purge.refresher, 'submit') as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                purge.refresh_after_commit(['/api/posts/'])
+                submit.assert_not_called()
+            submit.assert_called_once_with({'/api/posts/'})
+
+    def test_synchronous_refresh_requests_each_origin(self):
+        refresher = purge.CacheRefresher()
+        refresher.synchronous = True
+        with mock.patch('urllib.request.urlopen') as urlopen:
+            refresher.submit({'/api/posts/'})
+        requests = [call.args[0] for call in urlopen.call_args_list]
+        self.assertEqual([request.full_url for request in requests], ['http://proxy:8081/api/posts/'] * 2)
+        self.assertEqual([request.get_header('Origin') for request in requests], [None, 'https://www.example.com'])
+        self.assertEqual(requests[0].get_header('Host'), 'api.example.com')
+        self.assertEqual(requests[0].get_header('X-forwarded-proto'), 'https')
+        self.assertIsNone(refresher._thread)
+
+    def test_one_shot_publish_scheduled_refreshes_synchronously(self):
+        from .management.commands.publish_scheduled import Command
+
+        seen = []
+        with mock.patch.object(
+            Command, 'run_once', autospec=True,
+            side_effect=lambda command, options: seen.append(purge.refresher.synchronous),
+        ):
+            call_command('publish_scheduled', stdout=StringIO())
+        self.assertEqual(seen, [True])
+        self.assertFalse(purge.refresher.synchronous)
+
+
+THROTTLE_TEST_SETTINGS = {
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {'ip': None, 'post-list': '2/min', 'post-search': '1/min', 'project-list': None},
+}
+
+
+@override_settings(REST_FRAMEWORK=THROTTLE_TEST_SETTINGS)
+class ThrottleTests(TestCase):
+    """令牌桶限流：core/throttling.py"""
+
+    def setUp(self):
+        cache.clear()
+        throttling.buckets.clear()
+        self.addCleanup(throttling.buckets.clear)
+
+    def statuses(self, count, params=None, **headers):
+        return [self.client.get('/api/posts/', params, **headers).status_code for _ in range(count)]
+
+    def test_token_bucket_refills(self):
+        store = throttling.TokenBucketStore()
+        now = time.monotonic()
+        with mock.patch.object(throttling.time, 'monotonic', return_value=now):
+            self.assertEqual(store.consume('key', 2, 60), 0)
+            self.assertEqual(store.consume('key', 2, 60), 0)
+            self.assertAlmostEqual(store.consume('key', 2, 60), 30)
+        # 30 秒补充 1 个令牌
+        with mock.patch.object(throttling.time, 'monotonic', return_value=now + 30):
+            self.assertEqual(store.consume('key', 2, 60), 0)
+        self.assertEqual(throttling.parse_rate('120/min'), (120, 60))
+        self.assertIsNone(throttling.parse_rate(None))
+
+    def test_scope_from_view(self):
+        throttle = throttling.TokenBucketThrottle()
+        view = mock.Mock(spec=['throttle_scope'], throttle_scope='project-list')
+        self.assertEqual(throttle.get_scope(None, view), 'project-list')
+        self.assertIsNone(throttle.get_scope(None, object()))
+
+    def test_list_and_search_use_separate_scopes(self):
+        self.assertEqual(self.statuses(3), [200, 200, 429])
+        response = self.client.get('/api/posts/')
+        self.assertIn('Retry-After', response.headers)
+        # 搜索使用 post-search 的速率，与列表分开计数
+        self.assertEqual(self.statuses(2, {'search': 'django'}), [200, 429])
+
+    def test_x_real_ip_ignored_by_default(self):
+        # 没有可信代理时请求头可以伪造：换一个 X-Real-IP 也不能绕过限流
+        self.assertEqual(self.statuses(2, HTTP_X_REAL_IP='10.0.0.1'), [200, 200])
+        self.assertEqual(self.statuses(1, HTTP_X_REAL_IP='10.0.0.2'), [429])
+
+    @override_settings(RATE_LIMIT_TRUST_X_REAL_IP=True)
+    def test_x_real_ip_trusted_behind_proxy(self):
+        self.assertEqual(self.statuses(3, HTTP_X_REAL_IP='10.0.0.1'), [200, 200, 429])
+        self.assertEqual(self.statuses(1, HTTP_X_REAL_IP='10.0.0.2'), [200])
+
+
+class SlugFilterTests(TestCase):
+    """详情页 slug 过滤：core/slugs.py"""
+
+    def setUp(self):
+        cache.clear()
+        self.filter = SlugFilter('blog.Post')
+        create_post('existing')
+
+    def test_disabled_by_default_without_shared_cache(self):
+        # 测试环境使用进程内缓存：默认关闭拦截，其他 worker 新发布的文章不会被误判为 404
+        self.assertEqual(settings.SLUG_FILTER_MAX_AGE, 0)
+        self.filter.rebuild()
+        self.assertFalse(self.filter.definitely_missing('missing'))
+
+    @override_settings(SLUG_FILTER_MAX_AGE=60)
+    def test_enabled_filter_rejects_unknown_slugs(self):
+        self.filter.rebuild()
+        self.assertTrue(self.filter.definitely_missing('missing'))
+        self.assertFalse(self.filter.definitely_missing('existing'))
+
+
+class SuggestIndexTests(TestCase):
+    """搜索联想前缀索引：core/suggest.py"""
+
+    def setUp(self):
+        cache.clear()
+        self.index = PrefixIndex()
+
+    def labels(self, query, limit=8):
+        return [entry.label for entry in self.index.suggest(query, limit)]
+
+    def test_matches_word_starts_and_chinese_characters(self):
+        self.index.build([
+            ('post', 1, 'Django ORM 优化', 'django-orm'),
+            ('post', 2, 'React Hooks', 'react-hooks'),
+        ])
+        self.assertEqual(self.labels('orm'), ['Django ORM 优化'])
+        self.assertEqual(self.labels('优化'), ['Django ORM 优化'])
+        # 全角、大小写归一化
+        self.assertEqual(self.labels('ＨＯＯＫ'), ['React Hooks'])
+        # 只匹配单词开头，不匹配单词中间
+        self.assertEqual(self.labels('ango'), [])
+
+    def test_ranking(self):
+        self.index.build([
+            ('project', 1, 'Django Blog', 'django-blog'),
+            ('post', 2, 'Learning Django', 'learning-django'),
+            ('post', 3, 'Django Tips and Tricks', 'django-tips'),
+            ('post', 4, 'Django', 'django'),
+            ('category', 5, 'Django', ''),
+        ])
+        # 开头匹配优先，其次分类 < 标签 < 文章 < 项目，最后标题越短越靠前
+        self.assertEqual(
+            [(entry.kind, entry.id) for entry in self.index.suggest('dj')],
+            [('category', 5), ('post', 4), ('post', 3), ('project', 1), ('post', 2)],
+        )
+        self.assertEqual(len(self.index.suggest('dj', limit=2)), 2)
+
+    def test_upsert_and_remove(self):
+        self.index.build([('post', 1, 'Django', 'django')])
+        self.index.upsert('post', 1, 'Flask', 'flask')
+        self.index.upsert('tag', 2, 'django-orm')
+        self.assertEqual(self.labels('django'), ['django-orm'])
+        self.assertEqual(self.labels('fla'), ['Flask'])
+        self.index.remove('post', 1)
+        self.assertEqual(self.labels('fla'), [])
+
+    def test_rebuild_reads_published_content(self):
+        create_post('published-post')
+        create_post('draft-post')
+        Post.objects.filter(slug='draft-post').update(is_draft=True)
+        self.index.rebuild()
+        self.assertEqual(self.labels('post'), ['published-post'])
+
+    def test_stale_after_content_version_change(self):
+        self.index.rebuild()
+        self.assertTrue(self.index.is_fresh())
+        with self.captureOnCommitCallbacks(execute=True):
+            create_post()
+        self.assertFalse(self.index.is_fresh())
+
+    @override_settings(LOCAL_CONTENT_CACHE_TTL=60)
+    def test_per_process_cache_rebuilds_after_max_age(self):
+        # 进程内缓存看不到其他进程的版本号变化：超过 LOCAL_CONTENT_CACHE_TTL 秒也视为过期
+        self.index.rebuild()
+        later = time.monotonic() + 61
+        with mock.patch.object(suggest.time, 'monotonic', return_value=later):
+            self.assertFalse(self.index.is_fresh())
+            with mock.patch.object(suggest, 'cache_is_shared', return_value=True):
+                self.assertTrue(self.index.is_fresh())
+
+
+def _incr_many(cache, key, times):
+    for _ in range(times):
+        cache.incr(key)
+
+
+class SharedMemoryCacheTests(SimpleTestCase):
+    """共享内存缓存后端：core/shmcache.py"""
+
+    def make_cache(self, **options):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        options.setdefault('SIZE', 256 * 1024)
+        options.setdefault('SIZE_CLASSES', {256: 50, 4096: 50})
+        return SharedMemoryCache(os.path.join(directory.name, 'cache'), {'OPTIONS': options})
+
+    def test_set_get_add_incr_delete(self):
+        cache = self.make_cache()
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual(cache.get('missing', 'default'), 'default')
+
+        cache.set('key', {'a': [1, 2]})
+        self.assertEqual(cache.get('key'), {'a': [1, 2]})
+        self.assertTrue(cache.has_key('key'))
+
+        self.assertFalse(cache.add('key', 'other'))
+        self.assertEqual(cache.get('key'), {'a': [1, 2]})
+        self.assertTrue(cache.add('new', 1))
+
+        self.assertEqual(cache.incr('new'), 2)
+        self.assertEqual(cache.incr('new', 10), 12)
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+
+        self.assertTrue(cache.delete('key'))
+        self.assertFalse(cache.delete('key'))
+        self.assertIsNone(cache.get('key'))
+
+        cache.clear()
+        self.assertIsNone(cache.get('new'))
+
+    def test_expiry(self):
+        cache = self.make_cache()
+        cache.set('short', 'value', timeout=10)
+        cache.set('forever', 'value', timeout=None)
+        self.assertEqual(cache.get('short'), 'value')
+
+        with mock.patch('time.time', return_value=time.time() + 60):
+            self.assertIsNone(cache.get('short'))
+            self.assertEqual(cache.get('forever'), 'value')
+            # 过期的键可以再次 add，不能 incr
+            with self.assertRaises(ValueError):
+                cache.incr('short')
+            self.assertTrue(cache.add('short', 'again'))
+            self.assertEqual(cache.get('short'), 'again')
+
+        # timeout=0 表示立即过期：不写入，并删除旧值
+        cache.set('forever', 'value', timeout=0)
+        self.assertIsNone(cache.get('forever'))
+
+    def regions_holding(self, cache, key):
+        """键所在的尺寸档（槽位大小）"""
+        encoded = cache._encode_key(key, None)
+        key_hash = _key_hash(encoded)
+        return [
+            region.slot_size for region in cache._shared.regions
+            if cache._find(region, region.bucket_offset(key_hash), key_hash, encoded)[0] is not None
+        ]
+
+    def test_value_moves_between_size_classes(self):
+        cache = self.make_cache()
+        small, large = 'x' * 10, 'x' * 2000
+        regions_holding = functools.partial(self.regions_holding, cache)
+
+        cache.set('key', small)
+        self.assertEqual(regions_holding('key'), [256])
+        # 值变大：写入更大的一档，删除小档中的旧值，不会读到旧值
+        cache.set('key', large)
+        self.assertEqual(cache.get('key'), large)
+        self.assertEqual(regions_holding('key'), [4096])
+        cache.set('key', small)
+        self.assertEqual(cache.get('key'), small)
+        self.assertEqual(regions_holding('key'), [256])
+
+        # 超过最大一档的值不缓存，同时删除旧值
+        cache.set('key', 'x' * 10000)
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(regions_holding('key'), [])
+
+    def test_incr_moves_value_that_outgrows_its_size_class(self):
+        cache = self.make_cache()
+        cache.set('counter', 1)
+        self.assertEqual(self.regions_holding(cache, 'counter'), [256])
+        big = 10 ** 600
+        self.assertEqual(cache.incr('counter', big), big + 1)
+        self.assertEqual(cache.get('counter'), big + 1)
+        self.assertEqual(self.regions_holding(cache, 'counter'), [4096])
+        self.assertEqual(cache.incr('counter'), big + 2)
+
+    def test_add_checks_every_size_class_under_lock(self):
+        cache = self.make_cache()
+        cache.set('key', 'small')
+        # 模拟另一个进程在不加锁的快速检查之后写入了较小的一档：add 较大的值仍然不能成功
+        with mock.patch.object(cache, '_read', return_value=None):
+            self.assertFalse(cache.add('key', 'x' * 2000))
+        self.assertEqual(cache.get('key'), 'small')
+        self.assertEqual(self.regions_holding(cache, 'key'), [256])
+
+    def test_clock_eviction_keeps_recently_read_keys(self):
+        # 只有一档、一个桶、4 个槽位：第 5 个键必须淘汰一个
+        cache = self.make_cache(SIZE=8 + 4 * 256, SIZE_CLASSES={256: 1}, WAYS=4)
+        self.assertEqual(cache._shared.regions[0].buckets, 1)
+        for index in range(4):
+            cache.set(f'key-{index}', index)
+        # 读取置访问位：key-0 在这一轮中被跳过，淘汰下一个未被访问的 key-1
+        self.assertEqual(cache.get('key-0'), 0)
+        cache.set('key-4', 4)
+
+        self.assertEqual(cache.get('key-0'), 0)
+        self.assertIsNone(cache.get('key-1'))
+        for index in (2, 3, 4):
+            self.assertEqual(cache.get(f'key-{index}'), index)
+
+    def test_incr_is_atomic_across_processes(self):
+        cache = self.make_cache()
+        cache.set('counter', 0, timeout=None)
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=_incr_many, args=(cache, 'counter', 2000)) for _ in range(2)]
+        for process in processes:
+            process.start()
+        # 当前进程同时累加
+        _incr_many(cache, 'counter', 2000)
+        for process in processes:
+            process.join(30)
+            self.assertEqual(process.exitcode, 0)
+        self.assertEqual(cache.get('counter'), 6000)
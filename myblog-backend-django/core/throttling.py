@@ -0,0 +1,131 @@
+# ============================================================
+# 公共组件 - 令牌桶限流（DRF throttle）
+# ============================================================
+# 列表和搜索（/api/posts/?search=）是最耗数据库的接口，需要防止单个客户端反复刷。
+# DRF 自带的 SimpleRateThrottle 在缓存里保存每个客户端的请求时间列表，
+# 每次请求都要读写一次缓存并复制整个列表；这里改为进程内的令牌桶：
+#   - 每个 (范围, 客户端 IP) 一个桶，容量为 N，每秒补充 N / 周期 个令牌
+#   - 请求消耗 1 个令牌，桶空时返回 429，并在 Retry-After 中告知需要等待的秒数
+#   - 整个判断是一次字典查找 + 几次浮点运算，不访问缓存和数据库
+# 两类限流（settings.REST_FRAMEWORK 中启用，速率见 DEFAULT_THROTTLE_RATES）：
+#   - IPRateThrottle：按 IP 限制所有 API 请求的总速率（范围 ip）
+#   - RouteRateThrottle：按 IP 限制某个接口的速率，视图通过 throttle_scope
+#     或 get_throttle_scope() 声明范围（如 post-list / post-search）
+# 客户端 IP：RATE_LIMIT_TRUST_X_REAL_IP 开启时（前面有 Nginx 覆盖该请求头，见 nginx/conf.d/default.conf）
+# 取 X-Real-IP，否则取连接的 REMOTE_ADDR（请求头可以由客户端伪造）。
+# 注意：桶保存在各个 worker 进程内，N 个 worker 时实际上限约为配置值的 N 倍（按最坏情况估算即可）。
+# ============================================================
+
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# 超过这个数量的桶时清理已经“回满”的桶（回满的桶与不存在等价）
+MAX_BUCKETS = 10000
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    '120/min' → (120, 60)，格式与 DRF 的 DEFAULT_THROTTLE_RATES 相同
+    rate 为空时返回 None（不限流）
+    """
+    if not rate:
+        return None
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class TokenBucketStore:
+    """进程内的令牌桶集合：key → (剩余令牌, 上次更新时间)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def consume(self, key, capacity, period):
+        """
+        从 key 对应的桶中取 1 个令牌
+        返回 0 表示放行；否则返回需要等待的秒数
+        """
+        refill = capacity / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / refill
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > MAX_BUCKETS:
+                self._prune(now, period)
+        return wait
+
+    def _prune(self, now, period):
+        # 距上次更新超过一个周期的桶一定已经回满，删除不影响结果
+        self._buckets = {
+            key: value for key, value in self._buckets.items() if now - value[1] < period
+        }
+        if len(self._buckets) > MAX_BUCKETS:
+            # 仍然过多（大量不同 IP 同时访问）：全部清空，宁可短暂放宽限制也不让内存无限增长
+            self._buckets = {}
+
+    def clear(self):
+        with self._lock:
+            self._buckets = {}
+
+
+buckets = TokenBucketStore()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    范围默认取视图的 get_throttle_scope() 或 throttle_scope（与 DRF 的 ScopedRateThrottle 相同），
+    子类可以重写 get_scope()；没有范围或范围对应的速率为空时不限流
+    """
+
+    def get_scope(self, request, view):
+        if hasattr(view, 'get_throttle_scope'):
+            return view.get_throttle_scope()
+        return getattr(view, 'throttle_scope', None)
+
+    def get_ident(self, request):
+        if getattr(settings, 'RATE_LIMIT_TRUST_X_REAL_IP', False):
+            real_ip = request.META.get('HTTP_X_REAL_IP')
+            if real_ip:
+                return real_ip.strip()
+        return request.META.get('REMOTE_ADDR') or super().get_ident(request)
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = self.get_scope(request, view)
+        if scope is None:
+            return True
+        rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope))
+        if rate is None:
+            return True
+        wait = buckets.consume((scope, self.get_ident(request)), *rate)
+        if wait:
+            self.wait_seconds = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    """所有 API 请求按 IP 的总速率"""
+
+    def get_scope(self, request, view):
+        return 'ip'
+
+
+class RouteRateThrottle(TokenBucketThrottle):
+    """单个接口按 IP 的速率（视图的 throttle_scope / get_throttle_scope()）；视图没有声明范围时不限流"""
@@ -0,0 +1,17 @@
+# ============================================================
+# 公共组件 - URL 路由
+# ============================================================
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    # 首页聚合接口：GET /api/home/
+    path('home/', views.HomeView.as_view(), name='home'),
+    # 增量同步接口：GET /api/sync/?since=<cursor>
+    path('sync/', views.SyncView.as_view(), name='sync'),
+    # 搜索联想：GET /api/search/suggest/?q=
+    path('search/suggest/', views.SearchSuggestView.as_view(), name='search-suggest'),
+    # 当前 worker 的内存统计（仅 staff）：GET /api/debug/memory/?snapshot=1
+    path('debug/memory/', views.MemoryStatsView.as_view(), name='memory-stats'),
+]
@@ -0,0 +1,346 @@
+# ============================================================
+# 公共组件 - 跨模块聚合视图
+# ============================================================
+# 需要同时读取 blog 和 project 数据的接口放在这里，
+# 避免 blog 与 project 两个 app 互相依赖。
+# ============================================================
+
+import hashlib
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.cache import never_cache
+from django.views import View
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from blog import models as blog_models
+from blog import serializers as blog_serializers
+from project import models as project_models
+from project import serializers as project_serializers
+
+from . import feeds, memory, sync
+from .cache import content_cache_timeout, versioned_key
+from .models import Tombstone
+from .routers import stream_with_state
+from .suggest import suggest_index
+
+
+def _int_param(request, name, default, maximum):
+    """读取正整数查询参数，非法值使用默认值，超过上限时截断"""
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        value = default
+    return max(1, min(value, maximum))
+
+
+class HomeView(APIView):
+    """
+    首页聚合接口
+    GET /api/home/?posts=3&projects=6
+
+    一次返回首页需要的全部数据，替代原来的 4 个请求：
+    {
+        "posts": [...],       # 最新 N 篇文章（同 /api/posts/）
+        "projects": [...],    # 精选项目（同 /api/projects/?featured=true）
+        "categories": [...],  # 全部分类
+        "tags": [...]         # 全部标签
+    }
+
+    - 查询数量固定为 6 条（文章 + 标签预取、项目 + 技术栈预取、分类、标签），与数据量无关
+    - 结果按内容版本号缓存；ETag 是返回内容的哈希，与结果一起缓存，客户端重复访问时可直接得到 304
+      （不用版本号生成 ETag：缓存不共享时版本号只在本进程生效，内容变了 ETag 可能不变，
+       客户端会一直拿到 304；内容的哈希只在内容相同时相同）
+    """
+    max_posts = 20
+    max_projects = 20
+    cache_timeout = 300
+
+    def get(self, request):
+        posts_limit = _int_param(request, 'posts', 3, self.max_posts)
+        projects_limit = _int_param(request, 'projects', 6, self.max_projects)
+        # 封面图片使用绝对 URL（依赖请求的 Host），所以 Host 也是缓存键的一部分
+        variant = f'{request.get_host()}|{posts_limit}|{projects_limit}'
+        digest = hashlib.md5(variant.encode('utf-8')).hexdigest()[:16]
+        cache_key = versioned_key('home', digest)
+
+        cached = cache.get(cache_key)
+        if cached is None:
+            data = self.build(posts_limit, projects_limit)
+            etag = f'"home-{hashlib.md5(JSONRenderer().render(data)).hexdigest()[:16]}"'
+            cached = (data, etag)
+            cache.set(cache_key, cached, content_cache_timeout(self.cache_timeout))
+        data, etag = cached
+
+        # 内容没有变化：直接 304，不发送内容
+        if etag in request.headers.get('If-None-Match', ''):
+            return Response(status=304, headers={'ETag': etag})
+        return Response(data, headers={'ETag': etag})
+
+    def build(self, posts_limit, projects_limit):
+        context = {'request': self.request}
+        posts = blog_models.Post.objects.select_related(
+            'author', 'category'
+        ).prefetch_related('tags').published().order_by('-created_at')[:posts_limit]
+        projects = project_models.Project.objects.prefetch_related(
+            'tech_stack'
+        ).published().filter(is_featured=True)[:projects_limit]
+        return {
+            'posts': blog_serializers.PostListSerializer(posts, many=True, context=context).data,
+            'projects': project_serializers.ProjectListSerializer(projects, many=True, context=context).data,
+            'categories': blog_serializers.CategorySerializer(
+                blog_models.Category.objects.all(), many=True
+            ).data,
+            'tags': blog_serializers.TagSerializer(
+                blog_models.Tag.objects.all(), many=True
+            ).data,
+        }
+
+
+class SyncView(APIView):
+    """
+    增量同步接口
+    GET /api/sync/                    首次同步（从头开始）
+    GET /api/sync/?since=<cursor>     上次返回的 cursor 之后的变化
+    GET /api/sync/?since=2025-10-01T00:00:00Z   某个时刻之后的变化
+    可选 ?limit=（默认 200，最大 1000）
+
+    返回：
+    {
+        "posts": [...], "projects": [...],          # 新建或修改（仅公开内容，含正文）
+        "categories": [...], "tags": [...], "tech_stacks": [...],
+        "deleted": [{"type": "posts", "id": 3, "slug": "...", "reason": "unpublished", ...}],
+        "cursor": "...", "has_more": false, "reset": false
+    }
+    客户端按顺序应用：先更新 / 删除，再保存 cursor；has_more 为 true 时继续请求下一页。
+    文章的分类、标签和项目的技术栈只返回 id。删除分类 / 标签时引用它的文章不会逐篇返回，
+    客户端收到删除记录后自行移除对应的引用。
+    """
+    default_limit = 200
+    max_limit = 1000
+    # 游标依赖“SETTLE_SECONDS 之前的行都已可见”，副本的复制延迟会让客户端漏掉变化，只读主库
+    replica_reads = False
+
+    def get_sources(self):
+        return [
+            sync.SyncSource(
+                'posts',
+                blog_models.Post.objects.published().select_related('author').prefetch_related('tags'),
+                blog_serializers.PostSyncSerializer,
+            ),
+            sync.SyncSource(
+                'projects',
+                project_models.Project.objects.published().prefetch_related('tech_stack'),
+                project_serializers.ProjectSyncSerializer,
+            ),
+            sync.SyncSource('categories', blog_models.Category.objects.all(), blog_serializers.CategorySerializer),
+            sync.SyncSource('tags', blog_models.Tag.objects.all(), blog_serializers.TagSerializer),
+            sync.SyncSource(
+                'tech_stacks', project_models.TechStack.objects.all(), project_serializers.TechStackSerializer
+            ),
+        ]
+
+    def get(self, request):
+        cursor = sync.decode_cursor(request.query_params.get('since'))
+        limit = _int_param(request, 'limit', self.default_limit, self.max_limit)
+        data = sync.collect_changes(self.get_sources(), cursor, limit, context={'request': request})
+        return Response(data)
+
+
+class SearchSuggestView(APIView):
+    """
+    搜索联想（输入即提示）
+    GET /api/search/suggest/?q=dja&limit=8
+    返回 [{"type": "post", "id": 1, "title": "Django 入门", "slug": "django-intro"}, ...]
+    type 为 post / project / category / tag；分类和标签的 slug 为空字符串
+
+    数据来自内存中的前缀索引（core/suggest.py），请求中不访问数据库
+    """
+    default_limit = 8
+    max_limit = 20
+    max_query_length = 50
+
+    def get(self, request):
+        suggest_index.ensure_fresh()
+        query = request.query_params.get('q', '')[:self.max_query_length]
+        limit = _int_param(request, 'limit', self.default_limit, self.max_limit)
+        results = [
+            {'type': entry.kind, 'id': entry.id, 'title': entry.label, 'slug': entry.slug}
+            for entry in suggest_index.suggest(query, limit)
+        ]
+        return Response(results)
+
+
+@method_decorator(never_cache, name='dispatch')
+class MemoryStatsView(APIView):
+    """
+    当前 worker 的内存统计（仅 staff 用户，见 core/memory.py）
+    GET /api/debug/memory/?snapshot=1&limit=20
+    返回进程号、已处理请求数、RSS、GC 统计；开启 MEMORY_TRACEMALLOC 时还有占用最多的分配位置，
+    snapshot=1 时再拍一张快照，返回与上一次快照、与启动时相比变化最大的位置。
+    每个请求由某一个 worker 处理，多请求几次可以看到不同 worker（pid 不同）的数据
+    """
+    permission_classes = [IsAdminUser]
+    throttle_classes = []
+    max_limit = 100
+
+    def get(self, request):
+        take_snapshot = request.query_params.get('snapshot') == '1'
+        limit = _int_param(request, 'limit', 20, self.max_limit)
+        return Response(memory.memory_report(take_snapshot, limit))
+
+
+# ======== RSS / Atom 订阅与站点地图 ========
+
+def _site_base(request):
+    """前端站点的根地址：SITE_URL，未设置时使用当前请求的域名"""
+    return settings.SITE_URL.rstrip('/') or f'{request.scheme}://{request.get_host()}'
+
+
+def _deleted_at(*models):
+    """这些模型最近一次删除 / 撤回发布的时间（删除不会改变剩余行的 max(updated_at)）"""
+    labels = [model._meta.label_lower for model in models]
+    return Tombstone.objects.filter(model__in=labels).aggregate(value=Max('created_at'))['value']
+
+
+def _cache_when_done(chunks, key, timeout):
+    """边发送边收集，完整生成后写入缓存（客户端中途断开时不缓存不完整的内容）"""
+    parts = []
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        parts.append(data)
+        yield data
+    cache.set(key, b''.join(parts), timeout)
+
+
+class CachedXMLView(View):
+    """
+    按内容版本号缓存的 XML 响应（订阅、站点地图共用）
+    - 未命中缓存：StreamingHttpResponse 边查询边发送，生成完毕后写入缓存
+    - 命中缓存：直接返回缓存的字节，不访问数据库
+    - Last-Modified 为相关数据的 max(updated_at)，If-Modified-Since 未变化时返回 304
+    子类实现 get_last_modified() 和 generate(base)
+    """
+    content_type = 'application/xml; charset=utf-8'
+    # 内容变化时版本号改变，旧缓存自然失效，所以缓存时间可以很长；
+    # 缓存不共享时版本号只在本进程生效，实际缓存时间由 content_cache_timeout() 缩短（见 core/cache.py）
+    cache_timeout = 60 * 60 * 24
+    # 浏览器 / CDN 缓存时间
+    max_age = 300
+
+    def get_last_modified(self):
+        raise NotImplementedError
+
+    def generate(self, base):
+        """返回 XML 字符串块的迭代器；资源不存在时抛出 Http404（在开始输出之前）"""
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        base = _site_base(request)
+        digest = hashlib.md5(f'{base}|{request.path}'.encode('utf-8')).hexdigest()[:16]
+        prefix = versioned_key('xml', digest)
+        timeout = content_cache_timeout(self.cache_timeout)
+
+        # 缓存为单元素元组：区分“没有缓存”和“没有数据（None）”
+        cached = cache.get(f'{prefix}:lastmod')
+        if cached is None:
+            cached = (self.get_last_modified(),)
+            cache.set(f'{prefix}:lastmod', cached, timeout)
+        self.last_modified = cached[0]
+        timestamp = int(self.last_modified.timestamp()) if self.last_modified else None
+
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        if timestamp is not None and since is not None and timestamp <= since:
+            response = HttpResponseNotModified()
+        else:
+            body = cache.get(f'{prefix}:body')
+            if body is not None:
+                response = HttpResponse(body, content_type=self.content_type)
+            else:
+                chunks = self.generate(base)
+                response = StreamingHttpResponse(
+                    stream_with_state(_cache_when_done(chunks, f'{prefix}:body', timeout)),
+                    content_type=self.content_type,
+                )
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
+
+
+class RSSFeedView(CachedXMLView):
+    """RSS 2.0 订阅：GET /feed/"""
+    content_type = 'application/rss+xml; charset=utf-8'
+    renderer = staticmethod(feeds.render_rss)
+
+    def get_last_modified(self):
+        return feeds.latest(
+            blog_models.Post.objects.published().aggregate(value=Max('updated_at'))['value'],
+            blog_models.Category.objects.aggregate(value=Max('updated_at'))['value'],
+            _deleted_at(blog_models.Post),
+        )
+
+    def generate(self, base):
+        feed_url = self.request.build_absolute_uri()
+        return self.renderer(base, feed_url, feeds.feed_items(), self.last_modified)
+
+
+class AtomFeedView(RSSFeedView):
+    """Atom 订阅：GET /feed/atom/"""
+    content_type = 'application/atom+xml; charset=utf-8'
+    renderer = staticmethod(feeds.render_atom)
+
+
+class SitemapView(CachedXMLView):
+    """
+    站点地图：GET /sitemap.xml
+    URL 总数不超过 50000 时直接返回全部 URL，否则返回索引，列出各类型的分片
+    """
+
+    def get_last_modified(self):
+        return feeds.latest(
+            *(section.last_modified() for section in feeds.sitemap_sections()),
+            _deleted_at(blog_models.Post, project_models.Project, blog_models.Category, blog_models.Tag),
+        )
+
+    def generate(self, base):
+        sections = feeds.sitemap_sections()
+        if sum(section.count() for section in sections) <= feeds.SITEMAP_MAX_URLS:
+            return feeds.render_urlset(base, chain.from_iterable(section.urls() for section in sections))
+        return feeds.render_sitemap_index(base, feeds.sitemap_shards(sections))
+
+
+class SitemapShardView(CachedXMLView):
+    """站点地图分片：GET /sitemap-<类型>-<页码>.xml，如 /sitemap-posts-2.xml"""
+
+    def get_section(self):
+        for section in feeds.sitemap_sections():
+            if section.name == self.kwargs['section']:
+                return section
+        raise Http404
+
+    def get_last_modified(self):
+        section = self.get_section()
+        models = {
+            'posts': [blog_models.Post],
+            'projects': [project_models.Project],
+            'categories': [blog_models.Category],
+            'tags': [blog_models.Tag],
+        }.get(section.name, [])
+        return feeds.latest(section.last_modified(), _deleted_at(*models) if models else None)
+
+    def generate(self, base):
+        section = self.get_section()
+        page = self.kwargs['page']
+        if not 1 <= page <= section.pages():
+            raise Http404
+        return feeds.render_urlset(base, section.urls(page))
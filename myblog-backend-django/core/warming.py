@@ -0,0 +1,182 @@
+# ============================================================
+# 公共组件 - 缓存预热
+# ============================================================
+# 部署或重启后，每个接口的第一个访问者都要承担全部冷启动开销：
+# 数据库连接、ORM / DRF 序列化器的首次初始化、计数 / 首页聚合 / 分面统计等缓存全部为空。
+# 这里按价值列出需要预热的地址（warm_paths）：
+#   - 首页聚合、文章列表、归档、热门文章、分类 / 标签列表、按分类筛选的文章列表
+#   - 项目列表、精选项目、技术栈列表
+#   - 最新和阅读量最高的前 N 篇文章、前 N 个项目的详情页
+# 然后以有限的并发逐个请求（warm）：
+#   - 默认在进程内通过 Django 测试客户端请求（不经过网络），填充本 worker 的缓存；
+#     使用共享缓存（SHARED_CACHE_PATH）时所有 worker 都会受益
+#   - 也可以指定 base_url，通过 HTTP 请求 gunicorn
+# 预热请求带有 X-Cache-Warm 请求头，详情页不计阅读量（Nginx 会去掉客户端发来的同名请求头）。
+# 使用方式：
+#   - `python manage.py warm_caches`：部署后手动执行或写进部署脚本
+#   - WARM_CACHES_ON_START=1：每个 worker 启动时（config/wsgi.py，fork 之后）同步预热，
+#     预热完成前 worker 不接受请求，容器健康检查通过时缓存已经就绪
+#   - WARM_CACHES_AFTER_CHANGE=1：内容变化（内容版本号 +1）后，稍等片刻在后台重新预热列表类地址
+# ============================================================
+
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import reverse
+
+from . import purge
+
+logger = logging.getLogger(__name__)
+
+WARM_HEADER = 'X-Cache-Warm'
+
+
+def is_internal_request(request):
+    """预热请求或 Nginx 缓存刷新请求（core/purge.py）：不是真实访问，不计阅读量"""
+    return WARM_HEADER in request.headers or purge.REFRESH_HEADER in request.headers
+
+
+def list_paths():
+    """列表类地址：内容变化后全部失效，需要重新预热"""
+    from blog.models import Category
+
+    paths = [
+        reverse('home'),
+        reverse('post-list'),
+        reverse('post-archive'),
+        reverse('post-popular'),
+        reverse('category-list'),
+        reverse('tag-list'),
+        reverse('project-list'),
+        f"{reverse('project-list')}?featured=true",
+        reverse('techstack-list'),
+    ]
+    paths += [f"{reverse('post-list')}?category={pk}" for pk in Category.objects.values_list('pk', flat=True)]
+    return paths
+
+
+def detail_paths(limit):
+    """最新、阅读量最高的前 limit 篇文章和前 limit 个项目（默认排序：精选、手动排序、最新）"""
+    from blog.models import Post
+    from project.models import Project
+
+    posts = Post.objects.published()
+    slugs = [
+        *posts.order_by('-created_at').values_list('slug', flat=True)[:limit],
+        *posts.order_by('-views').values_list('slug', flat=True)[:limit],
+    ]
+    paths = [reverse('post-detail', kwargs={'slug': slug}) for slug in slugs]
+    projects = Project.objects.published()
+    slugs = [
+        *projects.values_list('slug', flat=True)[:limit],
+        *projects.order_by('-views').values_list('slug', flat=True)[:limit],
+    ]
+    paths += [reverse('project-detail', kwargs={'slug': slug}) for slug in slugs]
+    return paths
+
+
+def warm_paths(details=None):
+    if details is None:
+        details = getattr(settings, 'WARM_CACHES_DETAILS', 10)
+    # 去重并保持顺序：越靠前越先预热
+    return list(dict.fromkeys(list_paths() + detail_paths(details)))
+
+
+def _fetch_local(path, host):
+    from django.test import Client
+
+    client = Client(HTTP_HOST=host, headers={WARM_HEADER: '1'})
+    try:
+        return client.get(path).status_code
+    finally:
+        close_old_connections()
+
+
+def _fetch_http(base_url, path, host):
+    request = urllib.request.Request(base_url.rstrip('/') + path, headers={'Host': host, WARM_HEADER: '1'})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def warm(paths, concurrency=4, timeout=None, base_url=''):
+    """
+    以最多 concurrency 个并发请求这些地址，返回 [(地址, 状态码, 耗时 ms)]
+    超过 timeout 秒后不再开始新的请求（已经开始的请求仍会完成）；状态码为 None 表示请求出错或未执行
+    """
+    host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def fetch(path):
+        if deadline is not None and time.monotonic() > deadline:
+            return path, None, 0
+        started = time.perf_counter()
+        try:
+            status = _fetch_http(base_url, path, host) if base_url else _fetch_local(path, host)
+        except Exception:
+            logger.exception('预热失败：%s', path)
+            status = None
+        return path, status, (time.perf_counter() - started) * 1000
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='cache-warm') as executor:
+        futures = [executor.submit(fetch, path) for path in paths]
+        wait(futures)
+    return [future.result() for future in futures]
+
+
+def warm_on_start():
+    """worker 启动时预热（config/wsgi.py 调用）"""
+    started = time.monotonic()
+    results = warm(
+        warm_paths(),
+        concurrency=getattr(settings, 'WARM_CACHES_CONCURRENCY', 4),
+        timeout=getattr(settings, 'WARM_CACHES_TIMEOUT', 20),
+    )
+    ok = sum(1 for _, status, _ in results if status == 200)
+    logger.info('缓存预热完成：%s/%s 个地址，耗时 %.1fs', ok, len(results), time.monotonic() - started)
+
+
+class Rewarmer:
+    """内容变化后在后台重新预热列表类地址；连续多次修改只预热一次"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._due = None
+        self._thread = None
+
+    def schedule(self):
+        if not getattr(settings, 'WARM_CACHES_AFTER_CHANGE', False):
+            return
+        with self._lock:
+            # 每次修改都把预热时间往后推：后台连续保存时等最后一次修改之后再预热
+            self._due = time.monotonic() + getattr(settings, 'WARM_CACHES_DELAY', 2)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='cache-rewarm', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                remaining = self._due - time.monotonic()
+                if remaining <= 0:
+                    self._thread = None
+                    break
+            time.sleep(remaining)
+        try:
+            warm(list_paths(), concurrency=getattr(settings, 'WARM_CACHES_CONCURRENCY', 4))
+        except Exception:
+            logger.exception('内容变化后的缓存预热失败')
+        finally:
+            close_old_connections()
+
+
+rewarmer = Rewarmer()
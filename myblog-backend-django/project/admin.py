@@ -4,8 +4,12 @@
 # 定义 TechStack 和 Project 在 Django 后台管理界面中的显示方式
 # ============================================================
 
+from django.conf import settings
 from django.contrib import admin
+from django.utils.encoding import filepath_to_uri
 from django.utils.html import format_html
+from core.admin import CounterFieldsAdminMixin
+from core.counting import EstimatedCountPaginator
 from . import models
 
 
@@ -22,12 +26,16 @@ class TechStackAdmin(admin.ModelAdmin):
         'official_url'
     )
     
-    # 搜索字段
-    search_fields = ('name',)
+    # 搜索字段（前缀匹配，可使用 UPPER(name) 索引；也供项目编辑页自动补全使用）
+    search_fields = ('^name',)
     
     # 每页显示数量
     list_per_page = 20
     
+    # 不额外统计全部记录数，大表使用估算计数
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    
     def icon_preview(self, obj):
         """显示图标预览"""
         if obj.icon_url:
@@ -51,7 +59,7 @@ class TechStackAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(CounterFieldsAdminMixin, admin.ModelAdmin):
     """
     项目 Admin 配置
     """
@@ -75,10 +83,11 @@ class ProjectAdmin(admin.ModelAdmin):
     )
     
     # 搜索字段
+    # 只做标题/slug 前缀匹配（可使用 UPPER(...) pattern_ops 索引，见迁移 0002）
+    # description/content 的 '%关键词%' 匹配在大表上只能全表扫描
     search_fields = (
-        'title',
-        'description',
-        'content'
+        '^title',
+        '^slug'
     )
     
     # 自动生成 slug
@@ -86,8 +95,8 @@ class ProjectAdmin(admin.ModelAdmin):
         'slug': ('title',)
     }
     
-    # 多对多字段使用水平选择器
-    filter_horizontal = ('tech_stack',)
+    # 多对多字段使用自动补全控件（按关键词查询，不一次性渲染全部技术栈）
+    autocomplete_fields = ('tech_stack',)
     
     # 可直接在列表页编辑的字段
     list_editable = (
@@ -99,6 +108,10 @@ class ProjectAdmin(admin.ModelAdmin):
     # 每页显示数量
     list_per_page = 20
     
+    # 不额外统计全部记录数，大表使用估算计数
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    
     # 按创建时间倒序排列
     ordering = ('-created_at',)
     
@@ -117,19 +130,25 @@ class ProjectAdmin(admin.ModelAdmin):
             'fields': ('tech_stack',)
         }),
         ('状态与展示', {
-            'fields': ('status', 'is_featured', 'is_published', 'sort_order')
+            'fields': ('status', 'is_featured', 'is_published', 'publish_at', 'sort_order', 'views')
         }),
     )
     
-    # 只读字段（时间戳自动生成）
+    # 只读字段（时间戳自动生成；浏览量由 CounterFieldsAdminMixin 设为只读，保存时不写回）
     readonly_fields = ('created_at', 'updated_at')
     
     def cover_preview(self, obj):
-        """显示封面图片预览"""
+        """
+        显示封面图片预览
+        直接用 MEDIA_URL 拼接文件名，不经过存储后端的 url()
+        （远程存储的 url() 可能需要签名或网络请求，列表页每行都会调用）
+        文件名用 filepath_to_uri 做 URL 转义（与 FileSystemStorage.url() 相同），format_html 负责 HTML 转义
+        """
         if obj.cover_image:
             return format_html(
-                '<img src="{}" style="width: 60px; height: 40px; object-fit: cover; border-radius: 4px;" />',
-                obj.cover_image.url
+                '<img src="{}{}" style="width: 60px; height: 40px; object-fit: cover; border-radius: 4px;" />',
+                settings.MEDIA_URL,
+                filepath_to_uri(obj.cover_image.name)
             )
         return '-'
     cover_preview.short_description = '封面'
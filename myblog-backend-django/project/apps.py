@@ -5,3 +5,7 @@ class ProjectConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'project'
     verbose_name = '项目展示'
+
+    def ready(self):
+        # 导入信号处理函数（@receiver 在导入时完成注册）
+        from . import signals  # noqa: F401
@@ -0,0 +1,24 @@
+# ============================================================
+# 项目展示模块 - 过滤器
+# ============================================================
+# 与 blog/filters.py 相同，使用 django-filter 的 FilterSet 声明查询参数。
+# ============================================================
+
+import django_filters
+
+from core.filters import ManyToManyInFilter, MatchModeFilter
+from . import models
+
+
+class ProjectFilter(django_filters.FilterSet):
+    """
+    项目列表过滤参数：
+    - tech_stack: 技术栈 id，可用逗号分隔多个（?tech_stack=1,3）
+    - tech_stack_mode: any（默认，使用任意一个）或 all（同时使用全部）
+    """
+    tech_stack = ManyToManyInFilter(field_name='tech_stack', mode_param='tech_stack_mode')
+    tech_stack_mode = MatchModeFilter()
+
+    class Meta:
+        model = models.Project
+        fields = ['tech_stack']
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0002_prefix_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='定时发布时间'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_published', False), ('publish_at__isnull', False)), fields=['publish_at'], name='project_publish_due_idx'),
+        ),
+    ]
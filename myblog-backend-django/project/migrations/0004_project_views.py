@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0003_project_publish_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='views',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='浏览量'),
+        ),
+    ]
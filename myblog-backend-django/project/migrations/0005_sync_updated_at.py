@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0004_project_views'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='techstack',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='更新时间'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['updated_at', 'id'], name='project_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='techstack',
+            index=models.Index(fields=['updated_at', 'id'], name='project_techstack_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0006_project_list_json'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('list_json_version', '')), fields=['id'], name='project_list_json_stale_idx'),
+        ),
+    ]
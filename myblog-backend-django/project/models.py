@@ -7,6 +7,7 @@
 # ============================================================
 
 from django.db import models
+from django.utils import timezone
 
 
 class TechStack(models.Model):
@@ -42,6 +43,12 @@ class TechStack(models.Model):
         verbose_name="标签颜色"
     )
 
+    # 最后修改时间（增量同步使用）
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="更新时间"
+    )
+
     def __str__(self) -> str:
         return self.name
 
@@ -49,6 +56,25 @@ class TechStack(models.Model):
         verbose_name = "技术栈"
         verbose_name_plural = "技术栈"
         ordering = ['name']  # 按名称排序
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='project_techstack_updated_idx'),
+        ]
+
+
+class ProjectQuerySet(models.QuerySet):
+    """
+    项目查询集的自定义方法
+    """
+    def published(self):
+        # 公开可见 = 已发布（定时发布由 publish_scheduled 命令按时翻转，无需比较当前时间）
+        return self.filter(is_published=True)
+
+    def due_for_publishing(self, now=None):
+        # 到期待发布：未发布，且定时发布时间已到（走部分索引 project_publish_due_idx）
+        return self.filter(
+            is_published=False,
+            publish_at__lte=now or timezone.now()
+        )
 
 
 class Project(models.Model):
@@ -138,12 +164,26 @@ class Project(models.Model):
         verbose_name="是否发布"
     )
     
+    # 定时发布时间（可选）
+    # 设置为将来的时间时项目保持未发布，到期后由 publish_scheduled 命令自动发布
+    publish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="定时发布时间"
+    )
+    
     # 排序权重（数值越大越靠前）
     sort_order = models.IntegerField(
         default=0,
         verbose_name="排序权重"
     )
     
+    # 浏览量（由 core.counters 缓冲后批量写入）
+    views = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="浏览量"
+    )
+    
     # 创建时间
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -155,12 +195,41 @@ class Project(models.Model):
         auto_now=True,
         verbose_name="更新时间"
     )
+    
+    # 列表接口中该项目的 JSON（ProjectListSerializer 的输出，封面图片为相对路径）
+    # 项目或技术栈变化时由信号标记为过期（list_json_version 为空），调度进程重新生成（见 core/listjson.py）
+    list_json = models.TextField(null=True, blank=True, editable=False)
+    list_json_version = models.CharField(max_length=16, blank=True, default='', editable=False)
+
+    objects = ProjectQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        # 定时发布时间还没到：先保持未发布
+        if self.publish_at and self.publish_at > timezone.now():
+            self.is_published = False
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "项目"
         verbose_name_plural = "项目"
         # 默认排序：精选优先，然后按排序权重降序，最后按创建时间降序
         ordering = ['-is_featured', '-sort_order', '-created_at']
+        indexes = [
+            # 增量同步（/api/sync/）按 (updated_at, id) 键集分页
+            models.Index(fields=['updated_at', 'id'], name='project_updated_idx'),
+            # 定时发布任务查找“到期未发布项目”的部分索引
+            models.Index(
+                fields=['publish_at'],
+                name='project_publish_due_idx',
+                condition=models.Q(is_published=False, publish_at__isnull=False)
+            ),
+            # 调度进程查找被信号标记为过期的 list_json 的部分索引（见 core/listjson.py）
+            models.Index(
+                fields=['id'],
+                name='project_list_json_stale_idx',
+                condition=models.Q(list_json_version='')
+            ),
+        ]
@@ -5,10 +5,11 @@
 # ============================================================
 
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsetSerializerMixin
 from . import models
 
 
-class TechStackSerializer(serializers.ModelSerializer):
+class TechStackSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     技术栈序列化器
     用于项目列表和详情中的技术栈展示
@@ -24,7 +25,7 @@ class TechStackSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     项目列表序列化器
     用于项目列表页，不包含详细内容（content）
@@ -55,6 +56,11 @@ class ProjectListSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
+        # 稀疏字段集：非模型字段依赖的模型列
+        field_dependencies = {
+            'cover_image_url': ['cover_image'],
+            'status_display': ['status'],
+        }
     
     def get_cover_image_url(self, obj):
         """
@@ -69,7 +75,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
         return None
 
 
-class ProjectDetailSerializer(serializers.ModelSerializer):
+class ProjectDetailSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     项目详情序列化器
     用于项目详情页，包含完整内容（content）
@@ -96,6 +102,11 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
+        # 稀疏字段集：非模型字段依赖的模型列
+        field_dependencies = {
+            'cover_image_url': ['cover_image'],
+            'status_display': ['status'],
+        }
     
     def get_cover_image_url(self, obj):
         """
@@ -108,3 +119,11 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.cover_image.url)
             return obj.cover_image.url
         return None
+
+
+class ProjectSyncSerializer(ProjectDetailSerializer):
+    """
+    增量同步用项目序列化器（/api/sync/）
+    技术栈只输出 id，技术栈本身作为独立的记录同步
+    """
+    tech_stack = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
@@ -0,0 +1,223 @@
+# ============================================================
+# 项目展示模块 - 信号处理
+# ============================================================
+# - 项目或技术栈变化时让依赖内容的缓存失效（内容版本号 +1）
+# - 删除 / 撤回发布时写入删除记录，供增量同步接口使用（见 core/sync.py）
+# - 增量更新本进程的搜索联想索引（见 core/suggest.py）和 slug 集合（见 core/slugs.py）
+# - 刷新 Nginx 中受影响地址的 API 缓存（见 core/purge.py）
+# - 把受影响项目的列表项 JSON 标记为过期（见 core/listjson.py）
+# 注册方式：在 apps.ProjectConfig.ready() 中导入本模块
+# ============================================================
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core import listjson, purge, sync
+from core.cache import content_changed
+from core.models import Tombstone
+from core.slugs import project_slugs
+from core.suggest import suggest_index
+from . import models, serializers
+
+
+@receiver(post_save, sender=models.Project)
+@receiver(post_delete, sender=models.Project)
+@receiver(post_save, sender=models.TechStack)
+@receiver(post_delete, sender=models.TechStack)
+def invalidate_on_save_or_delete(sender, **kwargs):
+    content_changed()
+
+
+@receiver(m2m_changed, sender=models.Project.tech_stack.through)
+def invalidate_on_tech_stack_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        content_changed()
+
+
+# ======== 增量同步：删除记录 ========
+@receiver(post_delete, sender=models.Project)
+def record_project_deleted(sender, instance, **kwargs):
+    # 未发布的项目从未对外公开，无需通知客户端
+    if instance.is_published:
+        sync.record_tombstone(instance)
+
+
+@receiver(post_delete, sender=models.TechStack)
+def record_tech_stack_deleted(sender, instance, **kwargs):
+    sync.record_tombstone(instance)
+
+
+@receiver(pre_save, sender=models.Project)
+def remember_published_state(sender, instance, **kwargs):
+    was_published = False
+    if instance.pk:
+        was_published = sender.objects.filter(
+            pk=instance.pk, is_published=True
+        ).exists()
+    instance._was_published = was_published
+
+
+@receiver(post_save, sender=models.Project)
+def record_project_unpublished(sender, instance, **kwargs):
+    # 已发布 → 未发布：对客户端来说等同于删除
+    if getattr(instance, '_was_published', False) and not instance.is_published:
+        sync.record_tombstone(instance, Tombstone.Reason.UNPUBLISHED)
+
+
+@receiver(m2m_changed, sender=models.Project.tech_stack.through)
+def touch_on_tech_stack_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    sync.touch_m2m(instance, action, reverse, model, pk_set)
+
+
+# ======== 搜索联想索引（事务提交后更新） ========
+@receiver(post_save, sender=models.Project)
+def update_suggest_on_save(sender, instance, **kwargs):
+    if instance.is_published:
+        transaction.on_commit(
+            lambda: suggest_index.upsert('project', instance.pk, instance.title, instance.slug)
+        )
+    else:
+        transaction.on_commit(lambda: suggest_index.remove('project', instance.pk))
+
+
+@receiver(post_delete, sender=models.Project)
+def update_suggest_on_delete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: suggest_index.remove('project', pk))
+
+
+# ======== 详情页 slug 集合 ========
+@receiver(post_save, sender=models.Project)
+def update_slugs_on_save(sender, instance, **kwargs):
+    slug = instance.slug
+    if instance.is_published:
+        transaction.on_commit(lambda: project_slugs.add(slug))
+    else:
+        transaction.on_commit(lambda: project_slugs.discard(slug))
+
+
+@receiver(post_delete, sender=models.Project)
+def update_slugs_on_delete(sender, instance, **kwargs):
+    slug = instance.slug
+    transaction.on_commit(lambda: project_slugs.discard(slug))
+
+
+# ======== Nginx API 缓存刷新（见 core/purge.py） ========
+def _published_slugs(**filters):
+    return list(models.Project.objects.published().filter(**filters).values_list('slug', flat=True))
+
+
+@receiver(pre_save, sender=models.Project)
+def remember_proxy_cache_slug(sender, instance, **kwargs):
+    old_slug = None
+    if instance.pk and purge.is_enabled():
+        old_slug = sender.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+    instance._proxy_cache_old_slug = old_slug
+
+
+@receiver(post_save, sender=models.Project)
+def refresh_proxy_cache_on_project_save(sender, instance, **kwargs):
+    # 保存前后都未发布：没有公开内容发生变化
+    if not purge.is_enabled() or not (instance.is_published or getattr(instance, '_was_published', False)):
+        return
+    purge.refresh_after_commit(purge.project_urls(
+        {getattr(instance, '_proxy_cache_old_slug', None), instance.slug}
+    ))
+
+
+@receiver(post_delete, sender=models.Project)
+def refresh_proxy_cache_on_project_delete(sender, instance, **kwargs):
+    if purge.is_enabled() and instance.is_published:
+        purge.refresh_after_commit(purge.project_urls([instance.slug]))
+
+
+@receiver(m2m_changed, sender=models.Project.tech_stack.through)
+def refresh_proxy_cache_on_tech_stack_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not purge.is_enabled() or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        if instance.is_published:
+            purge.refresh_after_commit(purge.project_urls([instance.slug]))
+        return
+    # 从技术栈一侧修改：instance 是技术栈，pk_set 是项目（clear 时为 None，刷新所有项目列表即可）
+    slugs = _published_slugs(pk__in=pk_set) if pk_set else []
+    purge.refresh_after_commit(purge.tech_stack_urls(slugs))
+
+
+@receiver(pre_delete, sender=models.TechStack)
+def remember_projects_before_tech_stack_delete(sender, instance, **kwargs):
+    if purge.is_enabled():
+        instance._proxy_cache_project_slugs = _published_slugs(tech_stack=instance.pk)
+
+
+@receiver(post_save, sender=models.TechStack)
+@receiver(post_delete, sender=models.TechStack)
+def refresh_proxy_cache_on_tech_stack_save_or_delete(sender, instance, **kwargs):
+    if purge.is_enabled():
+        slugs = getattr(instance, '_proxy_cache_project_slugs', None)
+        if slugs is None:
+            slugs = _published_slugs(tech_stack=instance.pk)
+        purge.refresh_after_commit(purge.tech_stack_urls(slugs))
+
+
+# ======== 列表项 JSON（见 core/listjson.py） ========
+# 信号中只标记为过期，由调度进程重新生成（refresh_stale_list_json）
+# 放在文件末尾：技术栈变化时 touch_m2m 先更新 updated_at（列表中会显示），这里再标记
+def list_json_queryset():
+    return models.Project.objects.prefetch_related('tech_stack')
+
+
+def refresh_list_json(**filters):
+    """立即重新生成（rebuild_list_json 使用）"""
+    listjson.refresh(list_json_queryset().filter(**filters), serializers.ProjectListSerializer)
+
+
+def refresh_stale_list_json(batch_size=200):
+    """重新生成被标记为过期的行（调度进程使用），返回处理的行数"""
+    return listjson.refresh_stale(list_json_queryset(), serializers.ProjectListSerializer, batch_size)
+
+
+def mark_list_json_stale(**filters):
+    listjson.mark_stale(models.Project.objects.filter(**filters))
+
+
+@receiver(post_save, sender=models.Project)
+def mark_list_json_on_project_save(sender, instance, **kwargs):
+    mark_list_json_stale(pk=instance.pk)
+
+
+@receiver(m2m_changed, sender=models.Project.tech_stack.through)
+def mark_list_json_on_tech_stack_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._list_json_cleared = list(
+            sender.objects.filter(techstack_id=instance.pk).values_list('project_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        mark_list_json_stale(pk=instance.pk)
+    elif action == 'post_clear':
+        mark_list_json_stale(pk__in=getattr(instance, '_list_json_cleared', []))
+    else:
+        # 从技术栈一侧修改：instance 是技术栈，pk_set 是项目
+        mark_list_json_stale(pk__in=pk_set)
+
+
+@receiver(pre_delete, sender=models.TechStack)
+def remember_list_json_projects(sender, instance, **kwargs):
+    # 删除技术栈时中间表记录被直接删除，不会触发 m2m_changed
+    instance._list_json_project_ids = list(
+        models.Project.objects.filter(tech_stack=instance.pk).values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=models.TechStack)
+@receiver(post_delete, sender=models.TechStack)
+def mark_list_json_on_tech_stack_save_or_delete(sender, instance, **kwargs):
+    project_ids = getattr(instance, '_list_json_project_ids', None)
+    if project_ids is None:
+        mark_list_json_stale(tech_stack=instance.pk)
+    else:
+        mark_list_json_stale(pk__in=project_ids)
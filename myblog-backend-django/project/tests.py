@@ -1,3 +1,78 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import signals
+from .models import Project
+
+
+class ScheduledPublishTests(TestCase):
+    """定时发布：python manage.py publish_scheduled"""
+
+    def publish(self):
+        call_command('publish_scheduled', '--no-related', stdout=StringIO())
+
+    def test_unpublished_project_is_not_republished(self):
+        project = Project.objects.create(title='定时项目', slug='scheduled', description='', content='')
+        Project.objects.filter(pk=project.pk).update(publish_at=timezone.now() - timedelta(minutes=1))
+
+        self.publish()
+        project.refresh_from_db()
+        self.assertTrue(project.is_published)
+        self.assertIsNone(project.publish_at)
+
+        # 发布之后取消发布：调度进程不能再把它发布出去
+        project.is_published = False
+        project.save()
+        self.publish()
+        project.refresh_from_db()
+        self.assertFalse(project.is_published)
+
+
+class ListJSONTests(TestCase):
+    """项目列表的预先序列化 JSON：封面图片地址（core/listjson.py 的 absolutize）"""
+
+    def cover_urls(self, **params):
+        Project.objects.create(
+            title='项目', slug='project', description='', content='', is_published=True, cover_image='covers/a.jpg'
+        )
+        signals.refresh_stale_list_json()
+        materialized = self.client.get('/api/projects/', params).json()
+        # omit 一个不存在的字段：照常逐行序列化，作为对照
+        serialized = self.client.get('/api/projects/', {'omit': '-', **params}).json()
+        self.assertEqual(materialized, serialized)
+        return [item['cover_image_url'] for item in materialized]
+
+    def test_relative_url_gets_request_origin(self):
+        self.assertEqual(self.cover_urls(), ['http://testserver/media/covers/a.jpg'])
+
+    @override_settings(MEDIA_URL='https://cdn.example.com/media/')
+    def test_full_url_is_unchanged(self):
+        self.assertEqual(self.cover_urls(), ['https://cdn.example.com/media/covers/a.jpg'])
+
+    @override_settings(MEDIA_URL='//cdn.example.com/media/')
+    def test_protocol_relative_url_gets_request_scheme(self):
+        self.assertEqual(self.cover_urls(), ['http://cdn.example.com/media/covers/a.jpg'])
+
+
+class CoverPreviewTests(TestCase):
+    """后台列表页的封面预览：project/admin.py"""
+
+    def test_preview_does_not_call_storage(self):
+        project = Project(title='项目', slug='project', cover_image='covers/a b&"c.jpg')
+        model_admin = admin.site._registry[Project]
+        with mock.patch.object(FileSystemStorage, 'url', side_effect=AssertionError) as url:
+            html = model_admin.cover_preview(project)
+        url.assert_not_called()
+        # 文件名按 URL 转义，与存储后端生成的地址一致
+        self.assertIn(f'src="{project.cover_image.url}"', html)
+        self.assertIn('src="/media/covers/a%20b%26%22c.jpg"', html)
+
+    def test_no_cover(self):
+        self.assertEqual(admin.site._registry[Project].cover_preview(Project()), '-')
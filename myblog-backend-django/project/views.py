@@ -4,19 +4,42 @@
 # 提供项目列表和详情的 API 接口
 # ============================================================
 
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics
-from . import models, serializers
+from core.coalesce import CoalescedListMixin
+from core.counters import view_counter
+from core.warming import is_internal_request
+from core.facets import FacetViewMixin
+from core.listjson import MaterializedListMixin
+from core.pagination import EstimatedCountPagination
+from core.fieldsets import SparseFieldsetViewMixin
+from core.slugs import SlugFilterViewMixin, project_slugs
+from . import filters as project_filters, models, serializers
 
 
-class ProjectListView(generics.ListAPIView):
+class ProjectListView(CoalescedListMixin, FacetViewMixin, MaterializedListMixin, SparseFieldsetViewMixin,
+                      generics.ListAPIView):
     """
     项目列表视图
     GET /api/projects/ - 获取所有已发布的项目
     
     支持查询参数:
     - featured: 筛选精选项目（?featured=true）
+    - tech_stack / tech_stack_mode: 按技术栈筛选（?tech_stack=1,3&tech_stack_mode=all，见 project/filters.py）
+    - page_size / page: 可选分页（总数使用估算/缓存计数）
+    - fields / omit: 稀疏字段集（?fields=id,title,slug）
+    - facets: 分面计数（?facets=tech_stack,status），返回当前筛选结果中每个技术栈 / 状态的项目数
+
+    相同的并发请求合并执行（core/coalesce.py），按 IP 限流（范围 project-list）
+    结果直接拼接每个项目预先存好的 list_json（core/listjson.py），封面图片地址在返回前补上域名
     """
     serializer_class = serializers.ProjectListSerializer
+    pagination_class = EstimatedCountPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = project_filters.ProjectFilter
+    throttle_scope = 'project-list'
+    facet_fields = {'tech_stack': 'name', 'status': None}
+    absolute_url_fields = ('cover_image_url',)
     
     def get_queryset(self):
         """
@@ -25,7 +48,7 @@ class ProjectListView(generics.ListAPIView):
         """
         queryset = models.Project.objects.prefetch_related(
             'tech_stack'
-        ).filter(is_published=True)
+        ).published()
         
         # 精选筛选
         featured = self.request.query_params.get('featured')
@@ -35,7 +58,7 @@ class ProjectListView(generics.ListAPIView):
         return queryset
 
 
-class ProjectDetailView(generics.RetrieveAPIView):
+class ProjectDetailView(SlugFilterViewMixin, SparseFieldsetViewMixin, generics.RetrieveAPIView):
     """
     项目详情视图
     GET /api/projects/<slug>/ - 获取单个项目详情
@@ -43,17 +66,31 @@ class ProjectDetailView(generics.RetrieveAPIView):
     serializer_class = serializers.ProjectDetailSerializer
     # 使用 slug 作为查找字段（而非默认的 pk）
     lookup_field = 'slug'
+    # 不存在的 slug 直接 404，不查数据库（见 core/slugs.py）
+    slug_filter = project_slugs
     
     def get_queryset(self):
         """
-        返回已发布的项目
+        返回已发布的项目（不读取详情页用不到的列表项 JSON）
         """
         return models.Project.objects.prefetch_related(
             'tech_stack'
-        ).filter(is_published=True)
+        ).published().defer('list_json', 'list_json_version')
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        # 浏览量只在内存中 +1，由后台线程定期批量写库（见 core/counters.py）
+        # 缓存预热、Nginx 缓存刷新等内部请求不计数
+        if not is_internal_request(request):
+            view_counter.increment(self.object)
+        return response
+
+    def get_object(self):
+        self.object = super().get_object()
+        return self.object
 
 
-class TechStackListView(generics.ListAPIView):
+class TechStackListView(SparseFieldsetViewMixin, generics.ListAPIView):
     """
     技术栈列表视图
     GET /api/tech-stacks/ - 获取所有技术栈
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import { Link } from "react-router-dom";
-import type { Post, Project } from '../types';
+import type { HomeData, Post, Project } from '../types';
 import axios from 'axios';
 import { API_URL } from '../config/api';
 import { SOCIAL } from '../config/social';
@@ -32,32 +32,23 @@ export default function Home() {
     const projectsPerPage = 2;
 
     useEffect(() => {
-        const fetchPosts = async () => {
+        // 首页聚合接口：一次请求同时拿到最新文章和精选项目
+        // （原来分别请求 /posts/ 和 /projects/?featured=true）
+        const fetchHome = async () => {
             try {
-                const response = await axios.get<Post[]>(`${API_URL}/posts/`);
-                // 只显示最新的3篇文章
-                setPosts(response.data.slice(0, 3));
+                // 最新的3篇文章，最多6个精选项目
+                const response = await axios.get<HomeData>(`${API_URL}/home/?posts=3&projects=6`);
+                setPosts(response.data.posts);
+                setProjects(response.data.projects);
             } catch (error) {
-                console.error('获取文章列表失败:', error);
-            } finally {
-                setLoading(false)
-            }
-        };
-
-        const fetchProjects = async () => {
-            try {
-                // 获取精选项目，最多显示6个
-                const response = await axios.get<Project[]>(`${API_URL}/projects/?featured=true`);
-                setProjects(response.data.slice(0, 6));
-            } catch (error) {
-                console.error('获取项目列表失败:', error);
+                console.error('获取首页数据失败:', error);
             } finally {
+                setLoading(false);
                 setProjectsLoading(false);
             }
         };
 
-        fetchPosts();
-        fetchProjects();
+        fetchHome();
     }, []);
 
     // 打字机效果
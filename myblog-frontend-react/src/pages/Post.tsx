@@ -2,7 +2,7 @@
 // 博客文章详情页面
 
 import { useEffect, useState } from 'react';
-import type { Post } from '../types';
+import type { Post, PostNavigation, RelatedPost } from '../types';
 import axios from 'axios';
 import { useParams } from 'react-router-dom';
 import { API_URL } from '../config/api';
@@ -12,13 +12,15 @@ export default function Post() {
     const { slug } = useParams<{ slug: string }>();
     const [post, setPost] = useState<Post | null>(null);
     const [loading, setLoading] = useState(true);
+    const [related, setRelated] = useState<RelatedPost[]>([]);
 
     useEffect(() => {
         if (!slug) return;
 
         const fetchPost = async () => {
             try {
-                const response = await axios.get<Post>(`${API_URL}/posts/${slug}/`);
+                // neighbors=1：同时返回上一篇 / 下一篇（全站和同一分类内）
+                const response = await axios.get<Post>(`${API_URL}/posts/${slug}/?neighbors=1`);
                 setPost(response.data);
             } catch (error) {
                 console.error('获取文章详情失败:', error);
@@ -27,7 +29,19 @@ export default function Post() {
             }
         };
 
+        // 相关文章：后端预计算结果，获取失败不影响正文显示
+        const fetchRelated = async () => {
+            try {
+                const response = await axios.get<RelatedPost[]>(`${API_URL}/posts/${slug}/related/`);
+                setRelated(response.data);
+            } catch (error) {
+                console.error('获取相关文章失败:', error);
+                setRelated([]);
+            }
+        };
+
         fetchPost();
+        fetchRelated();
     }, [slug]);
 
     if (loading) return <div>加载中...</div>;
@@ -68,6 +82,58 @@ export default function Post() {
 
             {/* Post Detail - 使用统一的 Markdown 渲染组件 */}
             <MarkdownRenderer content={post.content || ''} className="mt-6" />
+
+            {/* Previous / Next - 上一篇 / 下一篇 */}
+            <NeighborLinks navigation={post.neighbors?.global} />
+            {post.category && post.neighbors?.category && (
+                <NeighborLinks navigation={post.neighbors.category} label={`「${post.category.name}」中的`} />
+            )}
+
+            {/* Related Posts - 相关文章 */}
+            {related.length > 0 && (
+                <section className="mt-12 border-t border-gray-200 dark:border-gray-800 pt-6">
+                    <h2 className="text-xl font-semibold mb-4">相关文章</h2>
+                    <ul className="space-y-3">
+                        {related.map(item => (
+                            <li key={item.id}>
+                                <a
+                                    href={`/post/${item.slug}`}
+                                    className="text-blue-600 dark:text-blue-400 hover:underline"
+                                >
+                                    {item.title}
+                                </a>
+                                {item.summary && (
+                                    <p className="text-sm text-gray-500 mt-1">{item.summary}</p>
+                                )}
+                            </li>
+                        ))}
+                    </ul>
+                </section>
+            )}
         </article>
     );
-}
\ No newline at end of file
+}
+
+// 上一篇 / 下一篇链接；两边都没有时不显示
+function NeighborLinks({ navigation, label = '' }: { navigation?: PostNavigation; label?: string }) {
+    if (!navigation || (!navigation.previous && !navigation.next)) return null;
+
+    return (
+        <nav className="mt-8 flex justify-between gap-4 text-sm">
+            <div>
+                {navigation.previous && (
+                    <a href={`/post/${navigation.previous.slug}`} className="text-blue-600 dark:text-blue-400 hover:underline">
+                        ← {label}上一篇：{navigation.previous.title}
+                    </a>
+                )}
+            </div>
+            <div className="text-right">
+                {navigation.next && (
+                    <a href={`/post/${navigation.next.slug}`} className="text-blue-600 dark:text-blue-400 hover:underline">
+                        {label}下一篇：{navigation.next.title} →
+                    </a>
+                )}
+            </div>
+        </nav>
+    );
+}
@@ -50,6 +50,40 @@ export interface Post {
     updated_at?: string;
     category: Category | null; // 分类可为空
     tags: Tag[]; // 标签可有多个
+    neighbors?: PostNeighbors; // 请求带 ?neighbors=1 时返回
+}
+
+/**
+ * 上一篇 / 下一篇（GET /api/posts/<slug>/?neighbors=1）
+ * previous 为更早发布的一篇，next 为更晚发布的一篇，没有时为 null
+ */
+export interface PostNeighbor {
+    id: number;
+    title: string;
+    slug: string;
+}
+
+export interface PostNavigation {
+    previous: PostNeighbor | null;
+    next: PostNeighbor | null;
+}
+
+export interface PostNeighbors {
+    global?: PostNavigation;
+    category?: PostNavigation | null; // 文章没有分类时为 null
+}
+
+/**
+ * 相关文章（GET /api/posts/<slug>/related/）
+ * score: 与当前文章的相似度（0~1），由后端预计算
+ */
+export interface RelatedPost {
+    id: number;
+    title: string;
+    slug: string;
+    summary: string;
+    created_at: string;
+    score: number;
 }
 
 // ============================================================
@@ -97,3 +131,14 @@ export interface Project {
     created_at: string;
     updated_at?: string;
 }
+
+/**
+ * 首页聚合接口（GET /api/home/）
+ * 一次请求返回首页需要的全部数据
+ */
+export interface HomeData {
+    posts: Post[];
+    projects: Project[];
+    categories: Category[];
+    tags: Tag[];
+}
@@ -89,6 +89,10 @@ sleep 15
 log_info "运行数据库迁移..."
 docker compose -f docker-compose.prod.yml exec -T backend python manage.py migrate --noinput
 
+# 按新版本的序列化器重新生成列表项 JSON（否则由部署后的第一批列表请求逐行补上）
+log_info "生成列表项 JSON..."
+docker compose -f docker-compose.prod.yml exec -T backend python manage.py rebuild_list_json
+
 # 收集静态文件（使用 root 用户以避免卷挂载权限问题）
 log_info "收集静态文件..."
 docker compose -f docker-compose.prod.yml exec -T --user root backend python manage.py collectstatic --noinput